@@ -1,16 +1,79 @@
-from colorama import init as init_colorama, Fore, Style
+from contextlib import nullcontext
 from pathlib import Path
 
-from classess_ab import AddressBook, Name, Record, Phone, Birthday, Email, AddressBookFileHandler
-from commands import COMMANDS, LOGO, PATH_TO_SAVE
+import json
+import sys
+
+from autosave import Autosaver
+from change_feed import ChangeFeed, CursorExpiredError
+from classess_ab import AddressBook, Record, Phone, Birthday, Email, AddressBookFileHandler
+from dispatcher import CommandDispatcher
+from commands import (AUTOSAVE_DELAY, AUTOSAVE_MAX_DELAY, CHANGE_FEED_SIZE, COMMANDS, LAZY_LOADING, LOGO,
+                      PATH_TO_CHANGES, PATH_TO_SAVE, PATH_TO_SNAPSHOT, PATH_TO_SQLITE, STORAGE_MODE, THREAD_SAFE)
 from handling_errors import input_error
-from user_interfaces import UserViewer, GuiUserViewer, ConsoleUserViewer
+from metrics import Metrics
+from user_interfaces import UserViewer
+from validators import is_valid_birthday, is_valid_email, is_valid_name, is_valid_phone
+
+
+def create_file_handler() -> AddressBookFileHandler:
+    """
+    Returns the file handler of the address book storage selected by STORAGE_MODE
+    and creates the directory the storage is kept in.
+    Only the module of the selected storage is imported.
+    """
+    PATH_TO_SAVE.parent.mkdir(parents=True, exist_ok=True)
+    if STORAGE_MODE == 'journal':
+        from journal import JournalFileHandler
+        return JournalFileHandler(str(PATH_TO_SAVE), lazy=LAZY_LOADING)
+    if STORAGE_MODE == 'sqlite':
+        from sqlite_ab import SqliteFileHandler
+        return SqliteFileHandler(str(PATH_TO_SQLITE))
+    if STORAGE_MODE == 'binary':
+        from binary_snapshot import BinarySnapshotFileHandler
+        return BinarySnapshotFileHandler(str(PATH_TO_SNAPSHOT), lazy=LAZY_LOADING)
+    if STORAGE_MODE == 'sharded':
+        from sharded import ShardedFileHandler
+        return ShardedFileHandler(str(PATH_TO_SAVE), lazy=LAZY_LOADING)
+    return AddressBookFileHandler(str(PATH_TO_SAVE), lazy=LAZY_LOADING)
+
+
+def create_address_book(thread_safe: bool = False) -> AddressBook:
+    """
+    Returns an empty in-memory address book, one that can be shared between
+    threads if THREAD_SAFE or 'thread_safe' is set, or, for the 'sqlite'
+    STORAGE_MODE, the address book kept in PATH_TO_SQLITE.
+    """
+    if STORAGE_MODE == 'sqlite':
+        from sqlite_ab import SqliteAddressBook
+        PATH_TO_SQLITE.parent.mkdir(parents=True, exist_ok=True)
+        return SqliteAddressBook(str(PATH_TO_SQLITE))
+    if THREAD_SAFE or thread_safe:
+        from concurrent_ab import ConcurrentAddressBook
+        return ConcurrentAddressBook()
+    return AddressBook()
+
+
+def create_change_feed() -> ChangeFeed | None:
+    """
+    Returns the change feed kept in PATH_TO_CHANGES, or None if CHANGE_FEED_SIZE turns it off.
+    """
+    if CHANGE_FEED_SIZE is None:
+        return None
+    PATH_TO_CHANGES.parent.mkdir(parents=True, exist_ok=True)
+    return ChangeFeed(str(PATH_TO_CHANGES), CHANGE_FEED_SIZE)
 
 
 class BotAdressBook:
-    def __init__(self, viewer: UserViewer, address_book: AddressBook):
+    def __init__(self, viewer: UserViewer, address_book: AddressBook, file_handler: AddressBookFileHandler = None,
+                 autosaver: Autosaver = None, change_feed: ChangeFeed = None, metrics: Metrics = None):
         self.viewer = viewer
         self.address_book = address_book
+        self.file_handler = file_handler if file_handler is not None else create_file_handler()
+        self.autosaver = autosaver
+        self.change_feed = change_feed
+        self.metrics = metrics
+        self.dispatcher = CommandDispatcher.from_commands(COMMANDS, self)
         self.arg = ''
 
     def command_parser(self, user_input: str) -> callable:
@@ -20,31 +83,34 @@ class BotAdressBook:
         execute and the associated data, if any.
         """
         if not user_input:
-            raise IndexError("Nothing was entered ...")
-        func = None
-        lower_input_end_spaced = user_input.lower() + ' '
-        for command, aliases in COMMANDS.items():
-            for alias in aliases:
-                if lower_input_end_spaced.startswith(alias + ' '):
-                    func = getattr(self, f'handle_{command}')
-                    # func = globals()[f'self.handle_{command}']
-                    self.arg = user_input[len(alias) + 1:].strip()
-                    break
-            if func:
-                break
-        if not func:
-            raise ValueError(f"There is no such command {user_input.split()[0]}")
-        return func
+            error = IndexError("Nothing was entered ...")
+        elif (resolved := self.dispatcher.resolve(user_input)) is None:
+            error = ValueError(f"There is no such command {user_input.split()[0]}")
+        else:
+            func, self.arg = resolved
+            return func
+        if self.metrics is not None:
+            self.metrics.record_error(error)
+        raise error
+
+    def run_handler(self, func: callable):
+        """
+        Runs a command handler and returns its result, recording its latency
+        and the exception it raises, if any, in the metrics.
+        """
+        if self.metrics is None:
+            return func()
+        return self.metrics.call(func.__name__.removeprefix('handle_'), func)
 
     def handle_add_record(self):
         """
         Command handler for 'add' command. Adds a new contact to the address book.
         """
         name = self.viewer.get_data_input("Enter name:")
-        if not Name(name).validate(name):
+        if not is_valid_name(name):
             self.viewer.display_error("Invalid name. Please use only letters and more than one.")
             return 'Was entered invalid name'
-        if name.lower().strip() in [record.name.value.lower().strip() for record in self.address_book.data.values()]:
+        if self.address_book.has_name(name):
             self.viewer.display_error("A contact with that name already exists!!!")
             return 'Already exists'
 
@@ -53,7 +119,7 @@ class BotAdressBook:
         phone = self.viewer.get_data_input("Enter the phone number (+380________):")
         if not phone:
             self.viewer.display_message('The phone was not entered')
-        elif Phone(phone).validate(phone):
+        elif is_valid_phone(phone):
             new_record.phones = [Phone(phone)]
         else:
             self.viewer.display_error("Invalid phone")
@@ -61,7 +127,7 @@ class BotAdressBook:
         email = self.viewer.get_data_input("Enter an email in an acceptable format:")
         if not email:
             self.viewer.display_message('The email was not entered')
-        elif Email(email).validate(email):
+        elif is_valid_email(email):
             new_record.email = Email(email)
         else:
             self.viewer.display_error("Invalid email")
@@ -69,17 +135,18 @@ class BotAdressBook:
         birthday = self.viewer.get_data_input("Enter birthday in the format(dd.mm.yyyy):")
         if not birthday:
             self.viewer.display_message('The birthday was not entered')
-        elif Birthday(birthday).validate(birthday):
+        elif is_valid_birthday(birthday):
             new_record.birthday = Birthday(birthday)
         else:
             self.viewer.display_error("Invalid birthday")
 
         if self.address_book.add_record(new_record):
-            self.viewer.display_contacts(self.address_book.get_all_records())
+            self.viewer.display_changes(added=[new_record])
             self.viewer.display_message(f"The contact {new_record.name} has been successfully added to address book.")
             return 'The process is finished'
         else:
-            self.viewer.display_message("The data is not valid")
+            errors = ' '.join(self.address_book.record_errors(new_record))
+            self.viewer.display_error(f"The data is not valid. {errors}".strip())
             return None
 
     def get_contact_by_name(self):
@@ -88,12 +155,12 @@ class BotAdressBook:
         Returns the contact found or False if the contact is not found or is invalid.
         """
         name = self.viewer.get_data_input("Enter name:")
-        if not Name(name).validate(name):
+        if not is_valid_name(name):
             self.viewer.display_error("Invalid name. Please use only letters and more than one.")
             return False
         contact = self.address_book.get_record_by_name(name)
         if contact is None:
-            self.viewer.display_message(f"The contact with the name {name} was not found in the address book.")
+            self.viewer.display_error(f"The contact with the name {name} was not found in the address book.")
             return None
         return contact
 
@@ -106,14 +173,14 @@ class BotAdressBook:
         if not contact:
             return 'The is no contact'
         new_phone = self.viewer.get_data_input("Enter phone in an acceptable format:")
-        if not Phone(new_phone).validate(new_phone):
+        if not is_valid_phone(new_phone):
             self.viewer.display_error("The phone is not valid.")
             return 'Was entered invalid phone'
-        if new_phone in [record.value for record in contact.phones]:
+        if contact.has_phone(new_phone):
             self.viewer.display_error(f"The phone {new_phone} has already existed.")
             return 'Was entered phone which existed'
         contact.add_phone_number(new_phone)
-        self.viewer.display_contacts(self.address_book.get_all_records())
+        self.viewer.display_changes(changed=[contact])
         self.viewer.display_message("Phone number successfully added.")
         return "Finished when added phone."
 
@@ -126,14 +193,14 @@ class BotAdressBook:
         if not contact:
             return 'The is no contact'
         if contact.email:
-            self.viewer.display_message(f"The contact already has email.")
+            self.viewer.display_error(f"The contact already has email.")
             return 'An email was entered, but the contact already has one.'
         email = self.viewer.get_data_input("Enter email in an acceptable format:")
-        if not Email(email).validate(email):
+        if not is_valid_email(email):
             self.viewer.display_error("The email is not valid.")
             return 'Was entered invalid email'
         contact.add_email(email)
-        self.viewer.display_contacts(self.address_book.get_all_records())
+        self.viewer.display_changes(changed=[contact])
         self.viewer.display_message(f"Email {email} added successfully")
         return f"Finished when added email"
 
@@ -145,27 +212,27 @@ class BotAdressBook:
         if not contact:
             return 'The is no contact'
         if not contact.phones:
-            self.viewer.display_message(f"The contact {contact.name.value} does not have phone.")
+            self.viewer.display_error(f"The contact {contact.name.value} does not have phone.")
             return 'Was entered phone, but contact have not phone number'
 
         old_phone = self.viewer.get_data_input("Enter old phone in an acceptable format:")
-        if not Phone(old_phone).validate(old_phone):
+        if not is_valid_phone(old_phone):
             self.viewer.display_error("The old_phone is not valid.")
             return 'Was entered old invalid phone'
-        if old_phone not in [record.value for record in contact.phones]:
+        if not contact.has_phone(old_phone):
             self.viewer.display_error(f"The phone {old_phone} does not exist in {contact.name.value}.")
             return 'Was entered phone, but contact have not it'
 
         new_phone = self.viewer.get_data_input("Enter new_phone in an acceptable format:")
-        if not Phone(new_phone).validate(new_phone):
+        if not is_valid_phone(new_phone):
             self.viewer.display_error("The new_phone was not entered or it is not valid.")
             return 'Was entered new invalid phone'
-        elif new_phone in [record.value for record in contact.phones]:
+        elif contact.has_phone(new_phone):
             self.viewer.display_error(f"The new_phone {new_phone} is already exist.")
             return 'Was entered phone, but the new phone matches the old one'
         else:
             contact.change_phone_number(old_phone, new_phone)
-            self.viewer.display_contacts(self.address_book.get_all_records())
+            self.viewer.display_changes(changed=[contact])
             self.viewer.display_message(f'The phone has been successfully changed from {old_phone} to {new_phone}.')
         return "Finished when changed phone"
 
@@ -177,11 +244,11 @@ class BotAdressBook:
         if not contact:
             return 'The is no contact'
         if not contact.email:
-            self.viewer.display_message(f"The contact {contact.name.value} does not have email.")
+            self.viewer.display_error(f"The contact {contact.name.value} does not have email.")
             return 'Was entered email, but contact have not phone email'
 
         old_email = self.viewer.get_data_input("Enter old email in an acceptable format:")
-        if not Email(old_email).validate(old_email):
+        if not is_valid_email(old_email):
             self.viewer.display_error("The old_email is not valid.")
             return 'Was entered old invalid email'
         elif old_email != contact.email.value:
@@ -189,11 +256,11 @@ class BotAdressBook:
             return 'Was entered old email, but it does not exist'
 
         new_email = self.viewer.get_data_input("Enter new email in an acceptable format:")
-        if not Email(new_email).validate(new_email):
+        if not is_valid_email(new_email):
             self.viewer.display_error("The new email is not valid.")
             return 'Was entered new invalid email'
         contact.change_email(old_email, new_email)
-        self.viewer.display_contacts(self.address_book.get_all_records())
+        self.viewer.display_changes(changed=[contact])
         self.viewer.display_message(f"The email has been successfully changed from {old_email} to {new_email}.")
         return "Finished when changed email"
 
@@ -206,18 +273,18 @@ class BotAdressBook:
         if not contact:
             return 'The is no contact'
         if not contact.phones:
-            self.viewer.display_message(f"The contact {contact.name.value} does not have phone.")
+            self.viewer.display_error(f"The contact {contact.name.value} does not have phone.")
             return 'Was entered phone, but contact have not phone number'
 
         phone_to_remove = self.viewer.get_data_input("Enter phone in an acceptable format:")
-        if not Phone(phone_to_remove).validate(phone_to_remove):
+        if not is_valid_phone(phone_to_remove):
             self.viewer.display_error("The phone is not valid.")
             return 'Was entered invalid phone'
-        if phone_to_remove not in [record.value for record in contact.phones]:
+        if not contact.has_phone(phone_to_remove):
             self.viewer.display_error(f"The phone {phone_to_remove} does not exist.")
             return 'Was entered phone, but it does not exist'
         contact.remove_phone_number(phone_to_remove)
-        self.viewer.display_contacts(self.address_book.get_all_records())
+        self.viewer.display_changes(changed=[contact])
         self.viewer.display_message(f"The phone number {phone_to_remove} has been successfully deleted.")
         return "Finished when removed phone"
 
@@ -230,11 +297,11 @@ class BotAdressBook:
         if not contact:
             return 'The is no contact'
         if not contact.email:
-            self.viewer.display_message(f"The contact {contact.name.value} does not have email.")
+            self.viewer.display_error(f"The contact {contact.name.value} does not have email.")
             return 'Was entered email, but contact have not email'
 
         email_to_remove = self.viewer.get_data_input("Enter email in an acceptable format:")
-        if not Email(email_to_remove).validate(email_to_remove):
+        if not is_valid_email(email_to_remove):
             self.viewer.display_error("The email is not valid.")
             return 'Was entered invalid email'
         elif email_to_remove != contact.email.value:
@@ -242,7 +309,7 @@ class BotAdressBook:
                                               f"in contact {contact.name.value}.")
             return 'Was entered email, but it does not exist'
         contact.remove_email(email_to_remove)
-        self.viewer.display_contacts(self.address_book.get_all_records())
+        self.viewer.display_changes(changed=[contact])
         self.viewer.display_message(f"The email {email_to_remove} has been successfully deleted.")
         return "Finished when removed email"
 
@@ -256,7 +323,7 @@ class BotAdressBook:
             return 'The is no contact'
         name = contact.name.value
         if self.address_book.remove_record(name):
-            self.viewer.display_contacts(self.address_book.get_all_records())
+            self.viewer.display_changes(removed=[contact])
             self.viewer.display_message(f"Contact {name} has been successfully removed from the address book.")
             return "Finished when removed contact"
 
@@ -268,8 +335,9 @@ class BotAdressBook:
         search_criteria = {}
         self.viewer.display_message("What criteria would you like to search by?\n"
                                     "1. Search by name\n"
-                                    "2. Search by phone number.")
-        search_option = self.viewer.get_data_input("Select an option (1 or 2): ")
+                                    "2. Search by phone number\n"
+                                    "3. Search by name allowing typos.")
+        search_option = self.viewer.get_data_input("Select an option (1, 2 or 3): ")
         if search_option == "1":
             search_name = self.viewer.get_data_input(
                 "Enter a name to search for (minimum 2 characters): ").strip().lower()
@@ -287,6 +355,8 @@ class BotAdressBook:
                 self.viewer.display_error(
                     "You entered too few characters for a phone number. Phone number search canceled.")
                 return 'Failed when entered characters for a phone number!!!'
+        elif search_option == "3":
+            return self.find_similar_names()
         else:
             self.viewer.display_error("Invalid option selected.")
             return 'Failed option selected!!!'
@@ -299,12 +369,34 @@ class BotAdressBook:
             self.viewer.display_error("The contact meeting the specified criteria was not found.")
             return 'Failed!!!'
 
+    def find_similar_names(self) -> str:
+        """
+        Asks for a name and the number of typos allowed in each of its words
+        and shows the contacts with names like it, closest first.
+        """
+        search_name = self.viewer.get_data_input("Enter a name to search for: ").strip()
+        if not search_name:
+            self.viewer.display_error("No name was entered. Name search canceled.")
+            return 'Failed when entered a name!!!'
+        typos = self.viewer.get_data_input("Enter the number of typos allowed per word (0, 1 or 2; 2 by default): ")
+        typos = typos.strip() or '2'
+        if typos not in ('0', '1', '2'):
+            self.viewer.display_error("The number of typos must be 0, 1 or 2. Name search canceled.")
+            return 'Failed when entered the number of typos!!!'
+        results = self.address_book.find_similar(search_name, int(typos))
+        if results:
+            find = ', '.join(f'{record.name.value} ({distance})' for record, distance in results)
+            self.viewer.display_message(f"Search results (typos in brackets): {find}")
+            return 'Finish!!!'
+        self.viewer.display_error("No contact with a similar name was found.")
+        return 'Failed!!!'
+
     def handle_get_all_records(self) -> str:
         """
         Command handler for 'all' command. Retrieves and
         returns None.
         """
-        self.viewer.display_contacts(self.address_book.get_all_records())
+        self.viewer.display_contacts(self.address_book)
         return 'Found!!!'
 
     def handle_days_to_birthday(self) -> str:
@@ -332,7 +424,8 @@ class BotAdressBook:
             num_days = int(num_str)
             birthdays_list = self.address_book.get_birthdays_per_week(num_days)
             if birthdays_list:
-                self.viewer.display_message("\n".join(birthdays_list))
+                self.viewer.display_message(f"List of birthday celebrants to greet in {num_days} day(s):\n"
+                                            + "\n".join(birthdays_list))
                 return 'Found'
             else:
                 self.viewer.display_message("No birthdays today.")
@@ -348,30 +441,89 @@ class BotAdressBook:
         """
         arg = self.arg.strip()
         if arg and (not Path(arg).exists() or not Path(arg).is_file()):
-            return self.viewer.display_message(f"The file path does not exist")
-        arg = arg if arg else str(PATH_TO_SAVE)
-        file_handler = AddressBookFileHandler(arg)
-        loaded_address_book = file_handler.load_from_file()
-        self.address_book.data.update(loaded_address_book.data)
+            return self.viewer.display_error(f"The file path does not exist")
+        file_handler = AddressBookFileHandler(arg, lazy=LAZY_LOADING) if arg else self.file_handler
+        if arg and self.metrics is not None:
+            self.metrics.watch(file_handler)
+        file_handler.load_from_file(self.address_book)
+        arg = arg if arg else self.file_handler.file_name
+        stats = file_handler.last_load_stats
+        if stats is not None and (stats.skipped or stats.aborted):
+            problems = '\n'.join(f'line {line}, offset {offset}: {message}'
+                                 for line, offset, message in stats.errors[:10])
+            self.viewer.display_error(f"{stats}\n{problems}")
         return self.viewer.display_message(f"The address book is loaded from a file {arg}")
 
+    def handle_import_contacts(self) -> str:
+        """
+        Command handler for 'import' command. Imports contacts from
+        a CSV or vCard file and reports the rows that were rejected.
+        """
+        arg = self.arg.strip()
+        if not arg or not Path(arg).is_file():
+            return self.viewer.display_error(f"The file path does not exist")
+        from importers import ContactImporter
+        stats = ContactImporter(self.address_book).import_file(arg)
+        return self.viewer.display_message(str(stats))
+
+    def handle_export_changes(self) -> str:
+        """
+        Command handler for 'changes' command. Shows the changes made since the
+        last export of a consumer, one JSON event per line, and moves the
+        consumer's cursor past them. The argument is the consumer name,
+        'default' if not given, optionally followed by the most changes to show.
+        """
+        if self.change_feed is None:
+            return self.viewer.display_error("The change feed is turned off")
+        consumer, _, limit = self.arg.strip().partition(' ')
+        consumer = consumer or 'default'
+        limit = int(limit) if limit.strip().isdigit() else 1000
+        try:
+            events = self.change_feed.read_for(consumer, limit)
+        except CursorExpiredError as e:
+            return self.viewer.display_error(str(e))
+        if not events:
+            self.viewer.display_message(f"No changes since the last export of {consumer}")
+            return 'No changes'
+        self.change_feed.commit(consumer, events[-1]['seq'])
+        self.viewer.display_message('\n'.join(json.dumps(event, ensure_ascii=False) for event in events))
+        return f'{len(events)} change(s)'
+
     def handle_save_to_file(self) -> str:
         """
         Command handler for 'save' command. Saves the address
-        book data to a file.
+        book data to a file, in the background when autosave is on.
         """
         PATH_TO_SAVE.parent.mkdir(parents=True, exist_ok=True)
-        file_handler = AddressBookFileHandler(str(PATH_TO_SAVE))
-        file_handler.save_to_file(self.address_book)
-        return self.viewer.display_message(f"The address book has been saved at the following path {str(PATH_TO_SAVE)}")
+        if self.autosaver is not None:
+            self.autosaver.save_soon()
+            return self.viewer.display_message(
+                f"The address book is being saved at the following path {self.file_handler.file_name}")
+        self.file_handler.save_to_file(self.address_book)
+        skipped = getattr(self.file_handler, 'last_save_skipped', None)
+        if skipped:
+            self.viewer.display_error(f"{len(skipped)} contact(s) could not be saved:\n"
+                                      + '\n'.join(f'{name}: {problem}' for name, problem in skipped[:10]))
+        return self.viewer.display_message(f"The address book has been saved at the following path {self.file_handler.file_name}")
 
     def handle_exit(self) -> bool:
         """
         Command handler for 'exit' command. Exits the address book application.
+        With autosave on, the changes are saved when the autosaver is stopped.
         """
-        self.handle_save_to_file()
+        if self.autosaver is None:
+            self.handle_save_to_file()
         return False
 
+    def handle_stats(self) -> str:
+        """
+        Command handler for 'stats' command. Shows the calls, latencies and
+        errors of every command run so far and the totals of loads and saves.
+        """
+        if self.metrics is None:
+            return self.viewer.display_error("The metrics are turned off")
+        return self.viewer.display_message(str(self.metrics))
+
     def handle_help(self) -> str:
         """Outputs the command menu"""
         self.viewer.display_commands()
@@ -384,15 +536,66 @@ class BotAdressBook:
         """
         user_input = self.viewer.get_user_input()
         func = self.command_parser(user_input)
-        result = func()
+        if self.autosaver is None:
+            return self.run_handler(func)
+        with self.autosaver.lock:
+            result = self.run_handler(func)
+        error = self.autosaver.take_error()
+        if error is not None:
+            self.viewer.display_error(f"The address book could not be saved: {error}")
         return result
 
+    def run_command(self, command: dict | None, error: str = None) -> dict:
+        """
+        Runs one command parsed by parse_batch_command with a BatchUserViewer
+        answering its prompts from its inputs, and returns its result: the id,
+        the command, the value the handler returned, the messages and errors,
+        the names of the contacts added, changed or removed and 'ok'.
+        'exit' is not run; its result has 'exit' set and the caller stops.
+        """
+        if command is None:
+            self.viewer.start_command([])
+            self.viewer.display_error(error)
+            result = {'id': None, 'command': None}
+        else:
+            self.viewer.start_command(command.get('inputs', []))
+            result = {'id': command.get('id'), 'command': command['command']}
+            try:
+                func = self.command_parser(command['command'].strip())
+                if func == self.handle_exit:
+                    result['exit'] = True
+                else:
+                    result['result'] = self.run_handler(func)
+            except Exception as e:
+                self.viewer.display_error(str(e))
+        result.update(self.viewer.result)
+        result['ok'] = not result['errors']
+        return result
+
+    def run_batch(self, commands, output) -> int:
+        """
+        Runs commands without a user, as read by read_batch_commands, and
+        writes the JSON result of every command, with its line, to 'output'.
+        The address book is saved once, after the last command; 'exit' stops the batch.
+        Returns the number of commands that failed.
+        """
+        failed = 0
+        for line_number, command, error in commands:
+            result = {'line': line_number, **self.run_command(command, error)}
+            failed += not result['ok']
+            output.write(json.dumps(result, ensure_ascii=False) + '\n')
+            if result.get('exit'):
+                break
+        self.handle_save_to_file()
+        return failed
+
 
 def choose_viewer() -> UserViewer:
     """
     Prints initial information to the user and returns
-    the chosen viewer mode.
+    the chosen viewer mode. The viewer's UI library is imported only once it is chosen.
     """
+    from colorama import init as init_colorama, Fore, Style
     init_colorama()
     print(Fore.BLUE + Style.BRIGHT + LOGO)
     print(Fore.CYAN + "Welcome to your ADDRESS BOOK!")
@@ -402,32 +605,96 @@ def choose_viewer() -> UserViewer:
     print("1 - Console")
     print("2 - Screen")
     mode = input("Enter your choice (1/2): ").strip()
-    if mode == '1':
-        viewer = ConsoleUserViewer()
-    elif mode == '2':
+    if mode == '2':
+        from gui_viewer import GuiUserViewer
         viewer = GuiUserViewer()
     else:
-        print("Invalid choice. Defaulting to Console mode.")
+        if mode != '1':
+            print("Invalid choice. Defaulting to Console mode.")
+        from console_viewer import ConsoleUserViewer
         viewer = ConsoleUserViewer()
     viewer.display_commands()
     return viewer
 
 
-def main():
+def main(argv: list = None) -> int:
     """
     Main entry point for the address book program.
     This function initializes the address book, prepares
     the environment, and enters the main program loop.
+    With '--batch FILE' ('-' for stdin) it runs the NDJSON commands of the file
+    without a user instead and returns 1 if any of them failed.
+    With '--metrics FILE' the metrics of the commands are written to FILE as JSON on exit.
     """
+    from argparse import ArgumentParser
+    parser = ArgumentParser(description="Address book")
+    parser.add_argument('--batch', metavar='FILE',
+                        help="run one JSON command per line from FILE, or from stdin for '-', and print the results")
+    parser.add_argument('--metrics', metavar='FILE', help="write the metrics of the commands to FILE on exit")
+    args = parser.parse_args(argv)
+    if args.batch:
+        return run_batch_file(args.batch, args.metrics)
+
     viewer = choose_viewer()
-    address_book = AddressBook()
-    bot = BotAdressBook(viewer, address_book)
+    address_book = create_address_book()
+    metrics = Metrics()
+    metrics.watch_input(viewer)
+    bot = BotAdressBook(viewer, address_book, change_feed=create_change_feed(), metrics=metrics)
+    metrics.watch(bot.file_handler)
     bot.handle_load_from_file()
-
-    while True:
-        if not bot.main_cycle():
-            break
+    if bot.change_feed is not None:
+        bot.change_feed.attach(address_book)
+    # A SQLite book commits every change as it is made
+    if AUTOSAVE_DELAY is not None and STORAGE_MODE != 'sqlite':
+        bot.autosaver = Autosaver(address_book, bot.file_handler, AUTOSAVE_DELAY, AUTOSAVE_MAX_DELAY)
+        bot.autosaver.watch_input(viewer)
+        bot.autosaver.start()
+
+    try:
+        while True:
+            if not bot.main_cycle():
+                break
+    finally:
+        if bot.change_feed is not None:
+            bot.change_feed.close()
+        if bot.autosaver is not None:
+            bot.autosaver.stop()
+            error = bot.autosaver.take_error()
+            if error is not None:
+                viewer.display_error(f"The address book could not be saved: {error}")
+        if args.metrics:
+            metrics.dump(args.metrics)
+    return 0
+
+
+def run_batch_file(file_name: str, metrics_file: str = None) -> int:
+    """
+    Loads the address book, runs the commands of an NDJSON file, or of stdin
+    for '-', printing a JSON result per command, and saves the book.
+    The metrics of the commands are written to 'metrics_file', if given.
+    Returns 1 if any command failed, 0 otherwise.
+    """
+    from batch_viewer import BatchUserViewer, read_batch_commands
+    viewer = BatchUserViewer()
+    address_book = create_address_book()
+    metrics = Metrics()
+    bot = BotAdressBook(viewer, address_book, change_feed=create_change_feed(), metrics=metrics)
+    metrics.watch(bot.file_handler)
+    bot.handle_load_from_file()
+    if viewer.result['errors']:
+        print('\n'.join(viewer.result['errors']), file=sys.stderr)
+    if bot.change_feed is not None:
+        bot.change_feed.attach(address_book)
+    try:
+        with (nullcontext(sys.stdin) if file_name == '-' else open(file_name, 'r', encoding='utf-8')) as file:
+            failed = bot.run_batch(read_batch_commands(file), sys.stdout)
+    finally:
+        if bot.change_feed is not None:
+            bot.change_feed.close()
+        if metrics_file:
+            metrics.dump(metrics_file)
+    return 1 if failed else 0
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
@@ -0,0 +1,146 @@
+import threading
+import time
+
+from classess_ab import AddressBook, AddressBookFileHandler
+
+
+class Autosaver:
+    """
+    Saves an address book in a background thread once its changes settle.
+    Every change marks the book dirty; it is saved when no change came for
+    'delay' seconds, or 'max_delay' seconds after the first unsaved change
+    while changes keep coming, so a burst of edits is written once.
+    Whoever changes the book holds 'lock' meanwhile; watch_input() makes the
+    prompts of a viewer release it while they wait for the user, so a
+    command does not hold up a save while the user types. The saving thread
+    holds it only while it copies the raw fields of the book and writes the
+    copy without it, so the command loop never waits for the disk. Handlers that
+    save state of their own along with the book (saves_copies is False) are
+    given the book itself under the lock instead.
+    A failed save is retried after 'delay' seconds; take_error() returns
+    the last error once.
+    Args:
+        address_book: The address book to save.
+        file_handler: The file handler to save it with.
+        delay: The seconds without changes after which the book is saved.
+        max_delay: The most seconds a change waits to be saved.
+    """
+
+    def __init__(self, address_book: AddressBook, file_handler: AddressBookFileHandler,
+                 delay: float = 2.0, max_delay: float = 30.0):
+        self.address_book = address_book
+        self.file_handler = file_handler
+        self.delay = delay
+        self.max_delay = max_delay
+        self.lock = threading.RLock()
+        self.saves = 0
+        self._condition = threading.Condition()
+        self._first_change = None
+        self._last_change = None
+        self._save_now = False
+        self._stopping = False
+        self._error = None
+        self._thread = None
+
+    def start(self) -> None:
+        """
+        Starts watching the book for changes and the saving thread.
+        """
+        self.address_book.subscribe(self.mark_dirty)
+        self._thread = threading.Thread(target=self._run, name='autosave', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops watching the book and waits for the unsaved changes to be saved.
+        """
+        self.address_book.unsubscribe(self.mark_dirty)
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    def mark_dirty(self, *change) -> None:
+        """
+        Records a change of the book; called by the book for every change.
+        """
+        with self._condition:
+            now = time.monotonic()
+            if self._first_change is None:
+                self._first_change = now
+            self._last_change = now
+            self._condition.notify()
+
+    def save_soon(self) -> None:
+        """
+        Asks for the book to be saved right away in the background, changed or not.
+        """
+        with self._condition:
+            if self._first_change is None:
+                self._first_change = self._last_change = time.monotonic()
+            self._save_now = True
+            self._condition.notify()
+
+    def watch_input(self, viewer):
+        """
+        Makes the prompts of a viewer release 'lock', if the asking thread
+        holds it once, while they wait for the user, and returns the viewer.
+        """
+        get_data_input = viewer.get_data_input
+        lock = self.lock
+
+        def unlocked_input(*args, **kwargs):
+            try:
+                lock.release()
+            except RuntimeError:
+                # The prompt was not shown while the lock was held
+                return get_data_input(*args, **kwargs)
+            try:
+                return get_data_input(*args, **kwargs)
+            finally:
+                lock.acquire()
+
+        viewer.get_data_input = unlocked_input
+        return viewer
+
+    def take_error(self) -> Exception | None:
+        """
+        Returns the error of the last failed save, once, or None.
+        """
+        error, self._error = self._error, None
+        return error
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._first_change is None and not self._stopping:
+                    self._condition.wait()
+                while self._first_change is not None and not (self._stopping or self._save_now):
+                    due = min(self._last_change + self.delay, self._first_change + self.max_delay)
+                    remaining = due - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if self._first_change is None:
+                    return
+                self._first_change = self._last_change = None
+                self._save_now = False
+            try:
+                self._save()
+            except Exception as e:
+                self._error = e
+                if not self._stopping:
+                    self.mark_dirty()
+
+    def _save(self) -> None:
+        if not getattr(self.file_handler, 'saves_copies', False):
+            with self.lock:
+                self.file_handler.save_to_file(self.address_book)
+        else:
+            with self.lock:
+                fields = dict(self.address_book.raw_items())
+            copy = AddressBook()
+            copy.add_raw_source(fields)
+            self.file_handler.save_to_file(copy)
+        self.saves += 1
@@ -0,0 +1,88 @@
+from collections import deque
+
+import json
+
+from classess_ab import record_fields
+from user_interfaces import UserViewer
+
+
+def parse_batch_command(line: str) -> tuple:
+    """
+    Parses one line of commands, a JSON object such as
+        {"command": "add_phone", "inputs": ["John", "+380501234567"], "id": 7}
+    where 'command' is the command line as it would be typed, alias and
+    argument, 'inputs' are the answers to the prompts of the command in order
+    and 'id', optional, is returned with the result. A line may also be just
+    a JSON string, a command without inputs.
+    Returns (command, None), or (None, error) for a line that is not a command.
+    """
+    try:
+        command = json.loads(line)
+    except ValueError as e:
+        return None, f"The line is not JSON: {e}"
+    if isinstance(command, str):
+        command = {'command': command}
+    if not isinstance(command, dict) or not isinstance(command.get('command'), str):
+        return None, "Expected an object with a 'command' string"
+    if not isinstance(command.get('inputs', []), list):
+        return None, "The 'inputs' must be a list"
+    return command, None
+
+
+def read_batch_commands(file):
+    """
+    Yields (line number, command, error) for every non-empty line of an NDJSON
+    file of commands, parsed by parse_batch_command.
+    """
+    for line_number, line in enumerate(file, 1):
+        if line.strip():
+            yield line_number, *parse_batch_command(line)
+
+
+class BatchUserViewer(UserViewer):
+    """
+    A viewer for running commands without a user: the prompts of a command
+    are answered from its inputs, and instead of being shown, the messages,
+    errors and changed contacts are collected into the result of the command.
+    A prompt left without an input is answered with an empty string, as if
+    nothing was entered.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.start_command([])
+
+    def start_command(self, inputs: list) -> None:
+        """
+        Prepares the answers to the prompts of the next command and clears the collected result.
+        """
+        self.inputs = deque('' if value is None else str(value) for value in inputs)
+        self.result = {'messages': [], 'errors': []}
+
+    def display_contacts(self, contacts):
+        items = contacts.raw_items() if hasattr(contacts, 'raw_items') else (
+            (record.name.value, record_fields(record)) for record in contacts)
+        self.result['contacts'] = [{'name': name, 'phones': list(phones), 'birthday': birthday, 'email': email}
+                                   for name, (phones, birthday, email) in items]
+
+    def display_changes(self, added=(), changed=(), removed=()):
+        for kind, records in (('added', added), ('changed', changed), ('removed', removed)):
+            if records:
+                self.result.setdefault(kind, []).extend(record.name.value for record in records)
+
+    def display_commands(self):
+        pass
+
+    def get_user_input(self):
+        return ''
+
+    def get_data_input(self, prompt):
+        return self.inputs.popleft() if self.inputs else ''
+
+    def display_message(self, message):
+        self.result['messages'].append(message)
+        return message
+
+    def display_error(self, message):
+        self.result['errors'].append(message)
+        return message
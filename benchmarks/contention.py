@@ -0,0 +1,132 @@
+"""
+Reports how the address book holds up when threads share it: operations
+per second, p99 latency and errors for 1 to '--max-threads' threads, for
+a plain AddressBook without locking and for ConcurrentAddressBook. A share
+'--writes' of the operations adds or removes a contact or adds a phone;
+the rest find a contact by name, list the birthdays in a few days or look
+a contact up by phone, and one in a hundred scans the whole book.
+Errors are the exceptions the operations raised, such as a dictionary
+changing size while it is scanned. Also reports the time of a snapshot.
+
+Usage: python -m benchmarks.contention [--contacts N] [--ops N] [--max-threads N] [--writes F] [--json]
+"""
+from argparse import ArgumentParser
+from contextlib import nullcontext, redirect_stdout
+
+import json
+import os
+import random
+import threading
+import time
+
+from benchmarks.datagen import generate_contacts
+from classess_ab import AddressBook, Record
+from concurrent_ab import ConcurrentAddressBook
+
+
+def worker(book: AddressBook, contacts: list, spare: list, ops: int, writes: float, seed: int,
+           latencies: list, errors: list) -> None:
+    """
+    Runs 'ops' random operations on the book, appending their latencies and the exceptions they raise.
+    """
+    rng = random.Random(seed)
+    writing = book.lock.writing if isinstance(book, ConcurrentAddressBook) else nullcontext
+    added = []
+    for _ in range(ops):
+        name, phone, birthday, email = rng.choice(contacts)
+        choice = rng.random()
+        started = time.perf_counter()
+        try:
+            if choice < writes / 2:
+                if added:
+                    book.remove_record(added.pop())
+                else:
+                    contact = spare.pop()
+                    book.add_record(Record(*contact))
+                    added.append(contact[0])
+            elif choice < writes:
+                with writing():
+                    record = book.get_record_by_name(name)
+                    if record is not None and len(record.phones) < 5:
+                        record.add_phone_number(f'+380{rng.randrange(10 ** 9):09d}')
+            elif choice < writes + 0.01:
+                sum(1 for _ in book.raw_items())
+            elif choice < writes + 0.5:
+                book.find_records(name=name)
+            elif choice < writes + 0.75:
+                book.get_birthdays_per_week(rng.randrange(7))
+            else:
+                book.get_records_by_phone(phone)
+        except Exception as e:
+            errors.append(e)
+        latencies.append(time.perf_counter() - started)
+
+
+def run(book_class: type, contacts: list, spare: list, threads: int, ops: int, writes: float) -> dict:
+    """
+    Fills a book of the given class and runs 'ops' operations split between 'threads' threads.
+    """
+    book = book_class()
+    for contact in contacts:
+        book.add_record(Record(*contact))
+    latencies, errors = [], []
+    spares = [spare[index::threads] for index in range(threads)]
+    workers = [threading.Thread(target=worker, args=(book, contacts, spares[index], ops // threads, writes,
+                                                     index, latencies, errors))
+               for index in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    seconds = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'threads': threads,
+        'ops_per_second': round(len(latencies) / seconds),
+        'p99_ms': round(latencies[int(len(latencies) * 0.99)] * 1000, 3),
+        'errors': len(errors),
+    }
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--contacts', type=int, default=10_000)
+    parser.add_argument('--ops', type=int, default=40_000, help='the operations of a run, split between its threads')
+    parser.add_argument('--max-threads', type=int, default=8)
+    parser.add_argument('--writes', type=float, default=0.2, help='the share of the operations that write')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    generated = list(generate_contacts(args.contacts * 2))
+    contacts, spare = generated[:args.contacts], generated[args.contacts:]
+    thread_counts = [1]
+    while thread_counts[-1] * 2 <= args.max_threads:
+        thread_counts.append(thread_counts[-1] * 2)
+
+    results = {'contacts': args.contacts, 'ops': args.ops, 'writes': args.writes}
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        for label, book_class in (('unlocked', AddressBook), ('locked', ConcurrentAddressBook)):
+            results[label] = [run(book_class, contacts, spare, threads, args.ops, args.writes)
+                              for threads in thread_counts]
+        book = ConcurrentAddressBook()
+        for contact in contacts:
+            book.add_record(Record(*contact))
+    started = time.perf_counter()
+    book.snapshot()
+    results['snapshot_ms'] = round((time.perf_counter() - started) * 1000, 2)
+
+    if args.json:
+        print(json.dumps(results))
+    else:
+        print(f"Contacts: {args.contacts}, operations per run: {args.ops}, {args.writes:.0%} writes")
+        print(f"{'book':<10}{'threads':>8}{'ops/s':>10}{'p99 ms':>10}{'errors':>8}")
+        for label in ('unlocked', 'locked'):
+            for result in results[label]:
+                print(f"{label:<10}{result['threads']:>8}{result['ops_per_second']:>10}"
+                      f"{result['p99_ms']:>10}{result['errors']:>8}")
+        print(f"Snapshot of {args.contacts} contacts: {results['snapshot_ms']} ms")
+
+
+if __name__ == '__main__':
+    main()
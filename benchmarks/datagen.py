@@ -0,0 +1,40 @@
+from datetime import date
+
+import random
+
+FIRST_NAMES = ['Oleksandr', 'Olena', 'Ivan', 'Maria', 'Petro', 'Anna', 'John', 'Emma',
+               'Andrii', 'Iryna', 'Taras', 'Sofia', 'Michael', 'Olivia', 'Dmytro', 'Kateryna']
+LAST_NAMES = ['Shevchenko', 'Kovalenko', 'Bondarenko', 'Tkachenko', 'Smith', 'Johnson',
+              'Melnyk', 'Kravchenko', 'Brown', 'Williams', 'Boyko', 'Lysenko', 'Taylor', 'Moroz']
+DOMAINS = ['gmail.com', 'ukr.net', 'example.com', 'outlook.com', 'i.ua', 'company.com.ua']
+COUNTRY_CODES = ['380', '1', '44', '48', '49']
+
+
+def letters_suffix(number: int) -> str:
+    """
+    Encodes a number with letters only, as names may not contain digits.
+    """
+    suffix = ''
+    while True:
+        number, rest = divmod(number, 26)
+        suffix = chr(ord('a') + rest) + suffix
+        if not number:
+            return suffix
+
+
+def generate_contacts(count: int, seed: int = 0):
+    """
+    Yields (name, phone, birthday, email) tuples of valid, unique contacts.
+    """
+    rnd = random.Random(seed)
+    first_day = date(1950, 1, 1).toordinal()
+    last_day = date(2010, 12, 31).toordinal()
+    for i in range(count):
+        first = rnd.choice(FIRST_NAMES)
+        last = rnd.choice(LAST_NAMES)
+        name = f'{first} {last} {letters_suffix(i).capitalize()}'
+        phone = f'+{rnd.choice(COUNTRY_CODES)}{rnd.randrange(10 ** 9):09d}'
+        birthday = date.fromordinal(rnd.randint(first_day, last_day)).strftime('%d.%m.%Y')
+        email = f'{first.lower()}.{last.lower()}{i}@{rnd.choice(DOMAINS)}'
+        yield name, phone, birthday, email
+
@@ -0,0 +1,111 @@
+"""
+Reports the latency of fuzzy name search: the time the first search takes
+to build the fuzzy index of a book of '--contacts' contacts, and the p50/p99
+latency of find_similar for names of the book with a typo put in every
+word, against comparing the query with every name in the book, and how
+often the misspelled contact was found. The generated names end with a
+unique short word, so the index holds about as many words as contacts,
+more than a real book would.
+
+Usage: python -m benchmarks.fuzzy [--contacts N] [--queries N] [--scans N] [--typos K] [--json]
+"""
+from argparse import ArgumentParser
+
+import json
+import random
+import time
+
+from benchmarks.datagen import generate_contacts
+from classess_ab import AddressBook, Record, fold_name
+from indexes import edit_distance
+
+
+def misspell(name: str, typos: int, rng: random.Random) -> str:
+    """
+    Returns the name with up to 'typos' random characters replaced in every word of three or more letters.
+    """
+    words = []
+    for word in name.split():
+        if len(word) >= 3:
+            for _ in range(typos):
+                index = rng.randrange(1, len(word))
+                word = word[:index] + rng.choice('aeiouklnrs') + word[index + 1:]
+        words.append(word)
+    return ' '.join(words)
+
+
+def scan(book: AddressBook, query: str, max_distance: int) -> list:
+    """
+    Finds the same names as find_similar by comparing the query with every name in the book.
+    """
+    query_words = fold_name(query).split()
+    found = []
+    for name in book.data:
+        name_words = fold_name(name).split()
+        distances = [min(edit_distance(word, other, max_distance) for other in name_words) for word in query_words]
+        if max(distances) <= max_distance:
+            found.append((sum(distances), name))
+    return sorted(found)
+
+
+def percentile(values: list, share: float) -> float:
+    """
+    Returns the value below which 'share' of the sorted 'values' lie.
+    """
+    return values[min(int(len(values) * share), len(values) - 1)]
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--contacts', type=int, default=300_000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--scans', type=int, default=3, help='the queries also answered by scanning the whole book')
+    parser.add_argument('--typos', type=int, default=1, help='the typos put in every word and searched for')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    book = AddressBook()
+    book.add_records({contact[0]: Record(*contact) for contact in generate_contacts(args.contacts)})
+    # Builds the deferred indexes, so the first search only builds the fuzzy one
+    book.has_name('')
+    rng = random.Random(1)
+    names = rng.sample(list(book.data), args.queries)
+    queries = [misspell(name, args.typos, rng) for name in names]
+
+    started = time.perf_counter()
+    book.find_similar(queries[0], args.typos)
+    build_seconds = time.perf_counter() - started
+    latencies, found = [], 0
+    for name, query in zip(names, queries):
+        started = time.perf_counter()
+        result = book.find_similar(query, args.typos)
+        latencies.append(time.perf_counter() - started)
+        found += any(record.name.value == name for record, _ in result)
+    latencies.sort()
+    started = time.perf_counter()
+    for query in queries[:args.scans]:
+        scan(book, query, args.typos)
+    scan_ms = (time.perf_counter() - started) * 1000 / max(1, min(args.scans, len(queries)))
+
+    results = {
+        'contacts': args.contacts,
+        'typos': args.typos,
+        'queries': len(queries),
+        'build_seconds': round(build_seconds, 2),
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'scan_ms': round(scan_ms, 1),
+        'found_percent': round(100 * found / len(queries), 1),
+    }
+    if args.json:
+        print(json.dumps(results))
+    else:
+        print(f"Contacts: {results['contacts']}, {results['typos']} typo(s) per word, {results['queries']} queries")
+        print(f"Index built on the first search: {results['build_seconds']} s")
+        print(f"Indexed search p50 / p99:        {results['p50_ms']} / {results['p99_ms']} ms")
+        print(f"Scanning the whole book:         {results['scan_ms']} ms per query")
+        print(f"Misspelled contact found:        {results['found_percent']} %")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Reports how many bytes a contact takes in memory in an address book of
+'--count' generated contacts, against the baseline, where the book was a
+plain dict of records and every Field and Record kept its attributes in
+an instance __dict__. The current book is measured with the indexes it
+keeps up to date on every change, then again once a substring and a
+fuzzy search built the indexes made on first use; the records alone are
+measured too, to tell the cost of the records from that of the indexes.
+
+Usage: python -m benchmarks.memory [--count N] [--json]
+"""
+from argparse import ArgumentParser
+
+import json
+import tracemalloc
+
+from benchmarks.datagen import generate_contacts
+from classess_ab import AddressBook, Record
+
+
+class LegacyField:
+    """
+    A replica of the previous Field layout: the value lives in an instance __dict__.
+    """
+
+    def __init__(self, value: str):
+        self._Field__value = value
+
+
+class LegacyRecord:
+    """
+    A replica of the previous Record layout.
+    """
+
+    def __init__(self, name: str, phone: str, birthday: str, email: str):
+        self.birthday = LegacyField(birthday)
+        self.email = LegacyField(email)
+        self.name = LegacyField(name)
+        self.phones = [LegacyField(phone)]
+
+
+def legacy_book(contacts) -> dict:
+    """
+    Builds a replica of the baseline book: a dict of legacy records by name.
+    """
+    return {contact[0]: LegacyRecord(*contact) for contact in contacts}
+
+
+def records(contacts) -> list:
+    """
+    Builds the current records alone, without a book.
+    """
+    return [Record(*contact) for contact in contacts]
+
+
+def book(contacts) -> AddressBook:
+    """
+    Builds a current address book, which keeps its indexes up to date on every added record.
+    """
+    address_book = AddressBook()
+    for contact in contacts:
+        address_book.add_record(Record(*contact))
+    return address_book
+
+
+def searched_book(contacts) -> AddressBook:
+    """
+    Builds a current address book and runs a substring and a fuzzy search,
+    which build the indexes made on first use.
+    """
+    address_book = book(contacts)
+    address_book.find_records(name='anna')
+    address_book.find_similar('Ivan', 1)
+    return address_book
+
+
+def bytes_per_contact(build: callable, count: int) -> float:
+    """
+    Builds 'build(contacts)' from the generated contacts and returns the
+    traced memory it takes divided by the number of contacts. The contacts
+    are generated while tracing, so the value strings a representation
+    keeps alive are counted and the ones it drops are not.
+    """
+    tracemalloc.start()
+    built = build(generate_contacts(count))
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del built
+    return size / count
+
+
+MEASURED = {
+    'baseline': legacy_book,
+    'records': records,
+    'book': book,
+    'searched_book': searched_book,
+}
+LABELS = {
+    'baseline': 'Baseline book',
+    'records': 'Records alone',
+    'book': 'Book with indexes',
+    'searched_book': 'Book after searches',
+}
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=100_000)
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    sizes = {label: bytes_per_contact(build, args.count) for label, build in MEASURED.items()}
+    results = {'contacts': args.count,
+               'bytes_per_contact': {label: round(size, 1) for label, size in sizes.items()},
+               'vs_baseline': {label: round(size / sizes['baseline'], 2) for label, size in sizes.items()}}
+    if args.json:
+        print(json.dumps(results))
+    else:
+        print(f"Contacts: {results['contacts']}, bytes per contact and ratio to the baseline book")
+        for label, size in results['bytes_per_contact'].items():
+            print(f"{LABELS[label]:<22}{size:>10}{results['vs_baseline'][label]:>8}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""
+Times the address book operations on books of generated contacts, one
+size after another: add_record, get_record_by_name, find_records by name,
+get_birthdays_per_week, days_to_birthday, iterating over the book,
+iterator(n), save_to_file and load_from_file, lazily and eagerly.
+For every operation it reports the calls made, calls and records per
+second, the p50/p95/p99/max latency of a call and the peak memory the
+calls allocated, traced in a separate, untimed run of the same calls.
+Queries are timed call by call on '--samples' random contacts; the
+operations over the whole book are timed '--repeats' times.
+'--output' writes the results as JSON, with the commit they were measured
+at, and '--compare' prints how they changed since an earlier such file.
+
+Usage: python -m benchmarks.operations [--sizes N,N,...] [--samples N] [--repeats N] [--chunk N]
+                                       [--no-memory] [--output FILE] [--compare FILE] [--json]
+"""
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.datagen import generate_contacts
+from classess_ab import AddressBook, AddressBookFileHandler, Record
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def percentile(values: list, share: float) -> float:
+    """
+    Returns the value below which 'share' of the sorted 'values' lie.
+    """
+    return values[min(int(len(values) * share), len(values) - 1)]
+
+
+def time_calls(calls: list, records: int, trace_memory: bool) -> dict:
+    """
+    Runs every callable of 'calls' once, timing each, and summarizes them.
+    'records' is the number of records all the calls handle together. With
+    'trace_memory', the calls are run once more under tracemalloc for their peak.
+    """
+    latencies = []
+    for call in calls:
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+    seconds = sum(latencies)
+    latencies.sort()
+    result = {
+        'calls': len(calls),
+        'calls_per_second': round(len(calls) / seconds, 1),
+        'records_per_second': round(records / seconds),
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 4),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 4),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 4),
+        'max_ms': round(latencies[-1] * 1000, 4),
+        'peak_kib': None,
+    }
+    if trace_memory:
+        tracemalloc.start()
+        for call in calls:
+            call()
+        result['peak_kib'] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+    return result
+
+
+def peak_kib_of_adding(records: list) -> float:
+    """
+    Returns the peak memory, in KiB, of adding the records to a new, empty book.
+    """
+    book = AddressBook()
+    tracemalloc.start()
+    for record in records:
+        book.add_record(record)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+def measure_size(size: int, args) -> dict:
+    """
+    Times every operation on a book of 'size' generated contacts.
+    """
+    contacts = list(generate_contacts(size))
+    records = [Record(*contact) for contact in contacts]
+    rng = random.Random(size)
+    samples = [rng.choice(contacts) for _ in range(args.samples)]
+    trace = not args.no_memory
+    results = {}
+
+    book = AddressBook()
+    results['add_record'] = time_calls([partial(book.add_record, record) for record in records], size, False)
+    if trace:
+        results['add_record']['peak_kib'] = peak_kib_of_adding(records)
+
+    results['get_record_by_name'] = time_calls(
+        [lambda name=name: book.get_record_by_name(name) for name, *_ in samples], args.samples, trace)
+    results['find_records'] = time_calls(
+        [lambda name=name: book.find_records(name=name) for name, *_ in samples], args.samples, trace)
+    weeks = [lambda days=days: book.get_birthdays_per_week(days) for days in range(7)] * max(1, args.samples // 7)
+    results['get_birthdays_per_week'] = time_calls(weeks, len(weeks), trace)
+    sampled_records = [book.get_record_by_name(name) for name, *_ in samples]
+    results['days_to_birthday'] = time_calls(
+        [record.days_to_birthday for record in sampled_records], args.samples, trace)
+    results['iteration'] = time_calls(
+        [lambda: sum(1 for _ in book)] * args.repeats, size * args.repeats, trace)
+    results['iterator'] = time_calls(
+        [lambda: sum(len(chunk) for chunk in book.iterator(args.chunk))] * args.repeats, size * args.repeats, trace)
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, 'address_book.json')
+        handler = AddressBookFileHandler(file_name)
+        results['save_to_file'] = time_calls(
+            [lambda: handler.save_to_file(book)] * args.repeats, size * args.repeats, trace)
+        for label, lazy in (('load_from_file', True), ('load_from_file_eager', False)):
+            loader = AddressBookFileHandler(file_name, lazy)
+            results[label] = time_calls(
+                [lambda: loader.load_from_file(AddressBook())] * args.repeats, size * args.repeats, trace)
+        results['file_bytes'] = os.path.getsize(file_name)
+    return results
+
+
+def git_commit() -> str | None:
+    """
+    Returns the commit the working tree is at, or None outside a git checkout.
+    """
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def compare(old: dict, new: dict, output=None) -> None:
+    """
+    Prints how the calls per second and the p99 latency of every operation
+    changed between two results, for the sizes measured in both, to 'output' or stdout.
+    """
+    print(f"Compared with {old.get('commit')} ({old.get('time')}): calls per second and p99 latency, new / old",
+          file=output)
+    for size, operations in new['sizes'].items():
+        before = old['sizes'].get(size)
+        if before is None:
+            continue
+        print(f"{size} contacts", file=output)
+        for operation, result in operations.items():
+            if not isinstance(result, dict) or operation not in before:
+                continue
+            speed = result['calls_per_second'] / before[operation]['calls_per_second']
+            p99 = result['p99_ms'] / before[operation]['p99_ms'] if before[operation]['p99_ms'] else float('nan')
+            print(f"  {operation:<24}{speed:>8.2f}x{p99:>8.2f}x", file=output)
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1000,10000,100000',
+                        help='comma-separated book sizes, up to 10000000 given the memory')
+    parser.add_argument('--samples', type=int, default=1000, help='the calls of every query')
+    parser.add_argument('--repeats', type=int, default=3, help='the runs of every operation over the whole book')
+    parser.add_argument('--chunk', type=int, default=100, help='the n of iterator(n)')
+    parser.add_argument('--no-memory', action='store_true', help='skip tracing the peak memory')
+    parser.add_argument('--output', metavar='FILE', help='write the results as JSON to FILE')
+    parser.add_argument('--compare', metavar='FILE', help='compare with the results in FILE')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    results = {
+        'commit': git_commit(),
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'samples': args.samples,
+        'repeats': args.repeats,
+        'sizes': {},
+    }
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        for size in (int(size) for size in args.sizes.split(',')):
+            results['sizes'][str(size)] = measure_size(size, args)
+    # ru_maxrss is in kibibytes on Linux and in bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results['max_rss_mib'] = round(max_rss / (2 ** 20 if platform.system() == 'Darwin' else 2 ** 10), 1)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    if args.json:
+        print(json.dumps(results))
+    else:
+        print(f"Commit {results['commit']}, Python {results['python']}, peak RSS {results['max_rss_mib']} MiB")
+        for size, operations in results['sizes'].items():
+            print(f"{size} contacts, {operations['file_bytes']} bytes saved")
+            print(f"  {'operation':<24}{'calls/s':>12}{'records/s':>12}{'p50 ms':>10}{'p95 ms':>10}"
+                  f"{'p99 ms':>10}{'peak KiB':>10}")
+            for operation, result in operations.items():
+                if isinstance(result, dict):
+                    print(f"  {operation:<24}{result['calls_per_second']:>12}{result['records_per_second']:>12}"
+                          f"{result['p50_ms']:>10}{result['p95_ms']:>10}{result['p99_ms']:>10}"
+                          f"{result['peak_kib'] if result['peak_kib'] is not None else '-':>10}")
+    if args.compare:
+        with open(args.compare) as file:
+            compare(json.load(file), results, sys.stderr if args.json else sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
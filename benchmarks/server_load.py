@@ -0,0 +1,159 @@
+"""
+Generates load on the address book server and reports the requests per
+second and the latency percentiles. Every client keeps up to '--pipeline'
+requests in flight on its connection; a share '--writes' of the requests
+adds a phone to a contact, the rest find a contact by its name and ask
+for days to a birthday. The book is first filled with '--contacts' contacts.
+Without '--connect', a server is started on a free port with HOME pointing
+to an empty temporary directory and stopped at the end.
+
+Usage: python -m benchmarks.server_load [--connect HOST:PORT] [--clients N] [--requests N]
+                                        [--pipeline N] [--writes F] [--contacts N] [--json]
+"""
+from argparse import ArgumentParser
+from pathlib import Path
+
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.datagen import generate_contacts
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def percentile(values: list, share: float) -> float:
+    """
+    Returns the value below which 'share' of the sorted 'values' lie.
+    """
+    return values[min(int(len(values) * share), len(values) - 1)]
+
+
+def make_request(names: list, writes: float, rng: random.Random) -> dict:
+    name = rng.choice(names)
+    if rng.random() < writes:
+        return {'command': 'add_phone', 'inputs': [name, f'+380{rng.randrange(10 ** 9):09d}']}
+    if rng.random() < 0.5:
+        return {'command': 'find', 'inputs': ['1', name]}
+    return {'command': 'when_birthday', 'inputs': [name]}
+
+
+async def run_client(host: str, port: int, requests: list, pipeline: int, latencies: list) -> int:
+    """
+    Sends the requests over one connection with up to 'pipeline' of them in
+    flight, appends the latency of every response to 'latencies' and returns
+    the number of failed requests.
+    """
+    reader, writer = await asyncio.open_connection(host, port, limit=2 ** 24)
+    in_flight = asyncio.Semaphore(pipeline)
+    sent = []
+
+    async def send():
+        for request in requests:
+            await in_flight.acquire()
+            sent.append(time.perf_counter())
+            writer.write(json.dumps(request).encode() + b'\n')
+            await writer.drain()
+
+    sender = asyncio.create_task(send())
+    failed = 0
+    for index in range(len(requests)):
+        line = await reader.readline()
+        latencies.append(time.perf_counter() - sent[index])
+        in_flight.release()
+        failed += not json.loads(line)['ok']
+    await sender
+    writer.close()
+    await writer.wait_closed()
+    return failed
+
+
+async def fill(host: str, port: int, contacts: list) -> None:
+    """
+    Adds the contacts to the book through one pipelined connection.
+    """
+    requests = [{'command': 'add', 'inputs': [name, phone, email, birthday]}
+                for name, phone, birthday, email in contacts]
+    await run_client(host, port, requests, 256, [])
+
+
+async def measure(host: str, port: int, args) -> dict:
+    contacts = list(generate_contacts(args.contacts))
+    await fill(host, port, contacts)
+    names = [contact[0] for contact in contacts]
+    rng = random.Random(1)
+    workloads = [[make_request(names, args.writes, rng) for _ in range(args.requests)] for _ in range(args.clients)]
+    latencies = []
+    started = time.perf_counter()
+    failed = await asyncio.gather(*(run_client(host, port, workload, args.pipeline, latencies)
+                                    for workload in workloads))
+    seconds = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'clients': args.clients,
+        'pipeline': args.pipeline,
+        'writes': args.writes,
+        'contacts': args.contacts,
+        'requests': len(latencies),
+        'failed': sum(failed),
+        'requests_per_second': round(len(latencies) / seconds),
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'max_ms': round(latencies[-1] * 1000, 3),
+    }
+
+
+def start_server(home: str) -> tuple:
+    """
+    Starts a server on a free port and returns (process, host, port).
+    """
+    process = subprocess.Popen([sys.executable, 'server.py', '--port', '0'], cwd=ROOT,
+                               env=dict(os.environ, HOME=home, USERPROFILE=home),
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    line = process.stdout.readline().decode()
+    if not line.startswith('Serving on '):
+        process.kill()
+        raise RuntimeError("The server did not start")
+    host, port = line.removeprefix('Serving on ').strip().rsplit(':', 1)
+    return process, host, int(port)
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--connect', metavar='HOST:PORT', help='load a running server instead of starting one')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=2000, help='the requests every client sends')
+    parser.add_argument('--pipeline', type=int, default=8, help='the requests a client keeps in flight')
+    parser.add_argument('--writes', type=float, default=0.1, help='the share of the requests that write')
+    parser.add_argument('--contacts', type=int, default=10_000)
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    if args.connect:
+        host, port = args.connect.rsplit(':', 1)
+        results = asyncio.run(measure(host, int(port), args))
+    else:
+        with tempfile.TemporaryDirectory() as home:
+            process, host, port = start_server(home)
+            try:
+                results = asyncio.run(measure(host, port, args))
+            finally:
+                process.terminate()
+                process.wait()
+    if args.json:
+        print(json.dumps(results))
+    else:
+        print(f"Clients x pipeline:  {results['clients']} x {results['pipeline']}, "
+              f"{results['writes']:.0%} writes, {results['contacts']} contacts")
+        print(f"Requests:            {results['requests']} ({results['failed']} failed)")
+        print(f"Requests per second: {results['requests_per_second']}")
+        print(f"Latency p50 / p99:   {results['p50_ms']} / {results['p99_ms']} ms (max {results['max_ms']} ms)")
+
+
+if __name__ == '__main__':
+    main()
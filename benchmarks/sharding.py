@@ -0,0 +1,70 @@
+"""
+Reports how loading a book of '--contacts' generated contacts scales with
+the number of shards it is saved as: for each number of '--shards', the
+seconds the sharded handler takes to load it eagerly and lazily, with as
+many worker processes as shards up to the CPU cores, against loading the
+same book from one JSON file with the regular handler. Every load is
+timed '--repeats' times and the fastest one is reported.
+
+Usage: python -m benchmarks.sharding [--contacts N] [--shards N,N,...] [--repeats N] [--json]
+"""
+from argparse import ArgumentParser
+
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.datagen import generate_contacts
+from classess_ab import AddressBook, AddressBookFileHandler, Record
+from sharded import ShardedFileHandler
+
+
+def fastest_load(handler: AddressBookFileHandler, repeats: int) -> float:
+    """
+    Returns the fewest seconds a load into a new book took, out of 'repeats' loads.
+    """
+    best = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        handler.load_from_file(AddressBook())
+        seconds = time.perf_counter() - started
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--contacts', type=int, default=200_000)
+    parser.add_argument('--shards', default='1,2,4,8', help='comma-separated numbers of shards')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    book = AddressBook()
+    book.add_records({contact[0]: Record(*contact) for contact in generate_contacts(args.contacts)})
+    results = {'contacts': args.contacts, 'cpus': os.cpu_count(), 'single': {}, 'sharded': {}}
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, 'address_book.json')
+        AddressBookFileHandler(file_name).save_to_file(book)
+        for mode, lazy in (('eager', False), ('lazy', True)):
+            results['single'][mode] = round(fastest_load(AddressBookFileHandler(file_name, lazy), args.repeats), 3)
+        for shards in (int(shards) for shards in args.shards.split(',')):
+            sharded_name = os.path.join(directory, f'sharded{shards}.json')
+            ShardedFileHandler(sharded_name, shards).save_to_file(book)
+            results['sharded'][str(shards)] = {
+                mode: round(fastest_load(ShardedFileHandler(sharded_name, shards, lazy=lazy), args.repeats), 3)
+                for mode, lazy in (('eager', False), ('lazy', True))}
+
+    if args.json:
+        print(json.dumps(results))
+    else:
+        print(f"Contacts: {results['contacts']}, CPU cores: {results['cpus']}, seconds to load, fastest run")
+        print(f"{'file':<14}{'eager':>10}{'lazy':>10}")
+        print(f"{'one file':<14}{results['single']['eager']:>10}{results['single']['lazy']:>10}")
+        for shards, seconds in results['sharded'].items():
+            print(f"{shards + ' shard(s)':<14}{seconds['eager']:>10}{seconds['lazy']:>10}")
+
+
+if __name__ == '__main__':
+    main()
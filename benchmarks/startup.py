@@ -0,0 +1,98 @@
+"""
+Reports the cold-start latency of the address book: the time 'import
+address_book' takes according to 'python -X importtime', with the modules
+that take the longest, and the time from starting 'address_book.main()' in
+a new interpreter to its first prompt. Every run starts a fresh process with
+HOME pointing to an empty temporary directory, so no saved book is loaded.
+
+Usage: python -m benchmarks.startup [--runs N] [--top N] [--json]
+"""
+from argparse import ArgumentParser
+from pathlib import Path
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+FIRST_PROMPT = b'Enter your choice'
+
+
+def import_times(environment: dict) -> dict:
+    """
+    Imports address_book in a new interpreter with '-X importtime' and returns
+    {module: (self microseconds, cumulative microseconds)}.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import address_book'],
+                            cwd=ROOT, env=environment, capture_output=True, check=True)
+    times = {}
+    for line in result.stderr.decode().splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, module = line[len('import time:'):].split('|')
+        times[module.strip()] = int(own), int(cumulative)
+    return times
+
+
+def seconds_to_prompt(environment: dict, code: str = 'import address_book; address_book.main()') -> float:
+    """
+    Runs 'code' in a new interpreter and returns the seconds until it prints the first prompt.
+    """
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-u', '-c', code], cwd=ROOT, env=environment,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        output = b''
+        while FIRST_PROMPT not in output:
+            chunk = process.stdout.read1(4096)
+            if not chunk:
+                raise RuntimeError("The program exited before its first prompt")
+            output += chunk
+        return time.perf_counter() - started
+    finally:
+        process.kill()
+        process.wait()
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--top', type=int, default=10, help='the number of slowest modules to list')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        environment = dict(os.environ, HOME=home, USERPROFILE=home)
+        import_runs = [import_times(environment) for _ in range(args.runs)]
+        prompt_runs = [seconds_to_prompt(environment) for _ in range(args.runs)]
+        interpreter_runs = [seconds_to_prompt(environment, f'input({FIRST_PROMPT.decode()!r})')
+                            for _ in range(args.runs)]
+
+    own = {module: statistics.median(run.get(module, (0, 0))[0] for run in import_runs) for module in import_runs[0]}
+    cumulative = statistics.median(run['address_book'][1] for run in import_runs)
+    slowest = sorted((module for module in own if module != 'address_book'), key=own.get, reverse=True)
+    results = {
+        'runs': args.runs,
+        'import_ms': round(cumulative / 1000, 2),
+        'main_to_prompt_ms': round(statistics.median(prompt_runs) * 1000, 2),
+        'interpreter_to_prompt_ms': round(statistics.median(interpreter_runs) * 1000, 2),
+        'slowest_modules': {module: round(own[module] / 1000, 2) for module in slowest[:args.top]},
+    }
+    if args.json:
+        print(json.dumps(results))
+    else:
+        print(f"Runs:                        {results['runs']} (medians)")
+        print(f"import address_book:         {results['import_ms']} ms")
+        print(f"main() to first prompt:      {results['main_to_prompt_ms']} ms")
+        print(f"Bare interpreter to prompt:  {results['interpreter_to_prompt_ms']} ms")
+        print("Slowest modules by own import time:")
+        for module, milliseconds in results['slowest_modules'].items():
+            print(f"  {module:<40}{milliseconds:>8} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Reports how many values per second each field validator checks: the previous
+validators, which passed pattern strings to re.match and parsed birthdays
+with datetime.strptime on every call, the precompiled validators called one
+value at a time, and validate_many called with a whole column.
+
+Usage: python -m benchmarks.validation [--count N] [--json]
+"""
+from argparse import ArgumentParser
+from datetime import datetime
+
+import json
+import re
+import time
+
+from benchmarks.datagen import generate_contacts
+from validators import VALIDATORS, validate_many
+
+
+def legacy_phone(number: str) -> bool:
+    if number is None:
+        return False
+    phone_format = r'^\+\d{1,3}\d{9}$'
+    return bool(re.match(phone_format, number))
+
+
+def legacy_email(email: str) -> bool:
+    if email is None:
+        return False
+    email_format = (r'\b(?![A-Za-z0-9._%+-]*a@t[A-Za-z0-9._%+-]*)\b'
+                    r'(?![0-9]{2})[A-Za-z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b')
+    return bool(re.match(email_format, email))
+
+
+def legacy_name(name: str) -> bool:
+    if name is None or not re.match(r'^[A-Za-zА-Яа-я\s]+$', name) or len(name) <= 1:
+        return False
+    return True
+
+
+def legacy_birthday(new_value: str) -> bool:
+    try:
+        parsed_date = datetime.strptime(new_value, '%d.%m.%Y').date()
+        today = datetime.now().date()
+        if parsed_date > today:
+            return False
+        return True
+    except ValueError:
+        return False
+    except TypeError:
+        return False
+
+
+LEGACY_VALIDATORS = {
+    'phone': legacy_phone,
+    'email': legacy_email,
+    'name': legacy_name,
+    'birthday': legacy_birthday,
+}
+
+
+def per_second(function: callable, values: list) -> float:
+    """
+    Returns how many values per second 'function(values)' checks.
+    """
+    started = time.perf_counter()
+    function(values)
+    return len(values) / (time.perf_counter() - started)
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=200_000)
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    columns = {'name': [], 'phone': [], 'birthday': [], 'email': []}
+    for name, phone, birthday, email in generate_contacts(args.count):
+        columns['name'].append(name)
+        columns['phone'].append(phone)
+        columns['birthday'].append(birthday)
+        columns['email'].append(email)
+
+    results = {}
+    for field, values in columns.items():
+        legacy, validator = LEGACY_VALIDATORS[field], VALIDATORS[field]
+        results[field] = {
+            'legacy_per_second': round(per_second(lambda column: [legacy(value) for value in column], values)),
+            'single_per_second': round(per_second(lambda column: [validator(value) for value in column], values)),
+            'many_per_second': round(per_second(lambda column: validate_many(field, column), values)),
+        }
+    if args.json:
+        print(json.dumps({'values': args.count, 'fields': results}))
+    else:
+        print(f"Values per field: {args.count}")
+        print(f"{'field':<10}{'legacy/s':>14}{'precompiled/s':>16}{'validate_many/s':>18}{'speedup':>10}")
+        for field, result in results.items():
+            speedup = result['many_per_second'] / result['legacy_per_second']
+            print(f"{field:<10}{result['legacy_per_second']:>14}{result['single_per_second']:>16}"
+                  f"{result['many_per_second']:>18}{speedup:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,311 @@
+from collections.abc import Mapping
+from datetime import date
+
+import mmap
+import os
+import struct
+
+from classess_ab import AddressBook, AddressBookFileHandler, LoadStats, build_record, fold_name
+from indexes import birthday_keys, birthday_month_day
+
+MAGIC = b'ABSNAP\r\n'
+VERSION = 2
+# magic, version, reserved, record count, offsets of the name, folded name and birthday tables, birthday count
+HEADER = struct.Struct('<8sHHIQQQI')
+NAME_ENTRY = struct.Struct('<QI')
+FOLDED_ENTRY = struct.Struct('<I')
+BIRTHDAY_ENTRY = struct.Struct('<HI')
+LENGTH = struct.Struct('<I')
+COUNT = struct.Struct('<I')
+ORDINAL = struct.Struct('<I')
+PHONE = struct.Struct('<Q')
+
+
+def pack_record(name: str, fields: tuple) -> bytes:
+    """
+    Packs a record as: name length and UTF-8 bytes, email length and bytes
+    (0 for no email), birthday ordinal (0 for no birthday), phone count and phones.
+    Lengths and the count are 32-bit, so no valid record is too large to pack.
+    A phone is stored as the int of its digits prefixed with 1, so leading zeros survive.
+    """
+    phones, birthday, email = fields
+    name_bytes = name.encode('utf-8')
+    email_bytes = email.encode('utf-8') if email else b''
+    ordinal = 0
+    if birthday:
+        day, month, year = birthday.split('.')
+        ordinal = date(int(year), int(month), int(day)).toordinal()
+    parts = [LENGTH.pack(len(name_bytes)), name_bytes, LENGTH.pack(len(email_bytes)), email_bytes,
+             ORDINAL.pack(ordinal), COUNT.pack(len(phones))]
+    parts.extend(PHONE.pack(int('1' + phone[1:])) for phone in phones)
+    return b''.join(parts)
+
+
+def write_snapshot(address_book: AddressBook, file_name: str) -> list:
+    """
+    Writes the address book as a binary snapshot. The records are packed from
+    their raw fields, sorted by name, followed by the lookup tables.
+    A record that cannot be packed is left out, and the list of (name, problem)
+    of the records left out is returned, so a bad record does not stop the save.
+    The file is written under a temporary name which then replaces the old one.
+    A snapshot of the book mapped from that file is closed for the replace,
+    which Windows does not allow over a mapped file, and mapped again after it.
+    """
+    items = sorted(address_book.raw_items(), key=lambda item: item[0].encode('utf-8'))
+    temp_name = f'{file_name}.tmp'
+    with open(temp_name, 'wb') as file:
+        file.write(b'\0' * HEADER.size)
+        name_entries = []
+        packed = []
+        skipped = []
+        offset = HEADER.size
+        for name, fields in items:
+            try:
+                payload = pack_record(name, fields)
+            except (ValueError, struct.error) as e:
+                skipped.append((name, str(e)))
+                continue
+            packed.append((name, fields))
+            file.write(payload)
+            name_entries.append(NAME_ENTRY.pack(offset, len(payload)))
+            offset += len(payload)
+        items = packed
+        names_offset = offset
+        file.write(b''.join(name_entries))
+        folded_offset = file.tell()
+        folded_order = sorted(range(len(items)), key=lambda index: fold_name(items[index][0]).encode('utf-8'))
+        file.write(b''.join(FOLDED_ENTRY.pack(index) for index in folded_order))
+        birthdays_offset = file.tell()
+        birthdays = []
+        for index, (_, (_, birthday, _)) in enumerate(items):
+            if birthday:
+                month, day = birthday_month_day(birthday)
+                birthdays.append((month * 100 + day, index))
+        birthdays.sort()
+        file.write(b''.join(BIRTHDAY_ENTRY.pack(key, index) for key, index in birthdays))
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, VERSION, 0, len(items), names_offset, folded_offset,
+                               birthdays_offset, len(birthdays)))
+        file.flush()
+        os.fsync(file.fileno())
+    mapped = mapped_from(address_book, file_name)
+    if mapped is not None:
+        mapped.close()
+    try:
+        os.replace(temp_name, file_name)
+    finally:
+        if mapped is not None:
+            mapped.open()
+    return skipped
+
+
+def mapped_from(address_book: AddressBook, file_name: str) -> 'MappedSnapshot | None':
+    """
+    Returns the snapshot the records of the book are read from if it is mapped from the given file.
+    """
+    mapped = getattr(address_book.data, 'base', None)
+    if isinstance(mapped, MappedSnapshot) and os.path.exists(file_name) and os.path.samefile(mapped.file_name,
+                                                                                             file_name):
+        return mapped
+    return None
+
+
+class MappedSnapshot(Mapping):
+    """
+    A read-only name -> (phones, birthday, email) mapping over a memory-mapped
+    binary snapshot. Opening it reads only the header; a record is decoded
+    when it is looked up by name (a binary search over the name table) or
+    reached by a scan, so opening does not depend on the size of the book.
+    Names are iterated in the order of their UTF-8 bytes.
+    Args:
+        file_name (str): The name of the snapshot file.
+    """
+
+    def __init__(self, file_name: str):
+        self.file_name = file_name
+        self.open()
+
+    def open(self) -> None:
+        """
+        Maps the file and reads its header; after close(), maps the file again,
+        such as once write_snapshot replaced it with a snapshot of the same records.
+        """
+        with open(self.file_name, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _, self._count, self._names_offset, self._folded_offset,
+         self._birthdays_offset, self._birthdays_count) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f'{self.file_name} is not an address book snapshot of version {VERSION}')
+
+    def close(self) -> None:
+        self._map.close()
+
+    def _payload_offset(self, index: int) -> int:
+        return NAME_ENTRY.unpack_from(self._map, self._names_offset + index * NAME_ENTRY.size)[0]
+
+    def _name_bytes(self, index: int) -> bytes:
+        offset = self._payload_offset(index)
+        (length,) = LENGTH.unpack_from(self._map, offset)
+        return self._map[offset + LENGTH.size:offset + LENGTH.size + length]
+
+    def _decode(self, index: int) -> tuple:
+        """
+        Decodes the record at the given position of the name table into (name, fields).
+        """
+        offset = self._payload_offset(index)
+        (length,) = LENGTH.unpack_from(self._map, offset)
+        offset += LENGTH.size
+        name = self._map[offset:offset + length].decode('utf-8')
+        offset += length
+        (length,) = LENGTH.unpack_from(self._map, offset)
+        offset += LENGTH.size
+        email = self._map[offset:offset + length].decode('utf-8') if length else None
+        offset += length
+        (ordinal,) = ORDINAL.unpack_from(self._map, offset)
+        offset += ORDINAL.size
+        birthday = None
+        if ordinal:
+            day = date.fromordinal(ordinal)
+            birthday = f'{day.day:02}.{day.month:02}.{day.year:04}'
+        (phone_count,) = COUNT.unpack_from(self._map, offset)
+        offset += COUNT.size
+        phones = tuple(f'+{str(PHONE.unpack_from(self._map, offset + i * PHONE.size)[0])[1:]}'
+                       for i in range(phone_count))
+        return name, (phones, birthday, email)
+
+    def _find(self, name: str) -> int | None:
+        """
+        Returns the position of the name in the name table, or None.
+        """
+        target = name.encode('utf-8')
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._name_bytes(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count and self._name_bytes(low) == target:
+            return low
+        return None
+
+    def get(self, name: str, default=None):
+        index = self._find(name) if isinstance(name, str) else None
+        return default if index is None else self._decode(index)[1]
+
+    def __getitem__(self, name: str) -> tuple:
+        fields = self.get(name)
+        if fields is None:
+            raise KeyError(name)
+        return fields
+
+    def __contains__(self, name) -> bool:
+        return isinstance(name, str) and self._find(name) is not None
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self._name_bytes(index).decode('utf-8')
+
+    def __len__(self) -> int:
+        return self._count
+
+    def items(self):
+        for index in range(self._count):
+            yield self._decode(index)
+
+    def names_with_folded_name(self, folded: str) -> list:
+        """
+        Returns the names whose folded form equals the given one.
+        """
+        target = folded.encode('utf-8')
+
+        def folded_at(position: int) -> bytes:
+            (index,) = FOLDED_ENTRY.unpack_from(self._map, self._folded_offset + position * FOLDED_ENTRY.size)
+            return fold_name(self._name_bytes(index).decode('utf-8')).encode('utf-8')
+
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if folded_at(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        names = []
+        while low < self._count and folded_at(low) == target:
+            (index,) = FOLDED_ENTRY.unpack_from(self._map, self._folded_offset + low * FOLDED_ENTRY.size)
+            names.append(self._name_bytes(index).decode('utf-8'))
+            low += 1
+        return names
+
+    def names_with_birthday(self, day: date) -> list:
+        """
+        Returns the names celebrating their birthday on the given date.
+        """
+        names = []
+        for month, month_day in birthday_keys(day):
+            key = month * 100 + month_day
+            low, high = 0, self._birthdays_count
+            while low < high:
+                middle = (low + high) // 2
+                if BIRTHDAY_ENTRY.unpack_from(self._map, self._birthdays_offset + middle * BIRTHDAY_ENTRY.size)[0] < key:
+                    low = middle + 1
+                else:
+                    high = middle
+            while low < self._birthdays_count:
+                entry_key, index = BIRTHDAY_ENTRY.unpack_from(self._map,
+                                                              self._birthdays_offset + low * BIRTHDAY_ENTRY.size)
+                if entry_key != key:
+                    break
+                names.append(self._name_bytes(index).decode('utf-8'))
+                low += 1
+        return names
+
+
+class BinarySnapshotFileHandler(AddressBookFileHandler):
+    """
+    A file handler for the memory-mapped binary snapshot format.
+    Loading maps the file and lets the address book build records on first
+    access, so a large book is usable right away and only the records in use
+    take memory. Name lookups and birthday queries are answered from the
+    snapshot's tables; substring search builds the in-memory indexes on first use.
+    Args:
+        file_name (str): The name of the snapshot file.
+    """
+
+    def save_to_file(self, address_book: AddressBook) -> None:
+        """
+        Writes the snapshot; the (name, problem) of the records that could not
+        be written are kept in 'last_save_skipped'.
+        """
+        self.last_save_skipped = write_snapshot(address_book, self.file_name)
+
+    def load_from_file(self, address_book: AddressBook = None, on_error: str = 'skip',
+                       progress: callable = None) -> AddressBook:
+        """
+        Adds the snapshot to the address book as a lazy source. A book that cannot
+        take one, or a handler that is not lazy, gets the records built and added
+        right away instead.
+        """
+        addressbook = address_book if address_book is not None else AddressBook()
+        stats = LoadStats()
+        self.last_load_stats = stats
+        try:
+            snapshot = MappedSnapshot(self.file_name)
+        except FileNotFoundError:
+            return addressbook
+        stats.bytes_read = HEADER.size
+        if self.lazy and addressbook.add_raw_source(snapshot):
+            stats.loaded = len(snapshot)
+        else:
+            for name, fields in snapshot.items():
+                record = build_record(name, fields)
+                if record is None:
+                    stats.skipped += 1
+                else:
+                    addressbook.add_record(record)
+                    stats.loaded += 1
+            snapshot.close()
+        if progress is not None:
+            progress(stats)
+        return addressbook
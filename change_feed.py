@@ -0,0 +1,195 @@
+from pathlib import Path
+
+import json
+import os
+import threading
+import time
+
+from classess_ab import AddressBook, AddressBookFileHandler
+
+
+class CursorExpiredError(Exception):
+    """
+    Raised when a consumer asks for changes older than the oldest one the feed
+    still keeps; the consumer has to resync from a full export of the book.
+    """
+
+
+class ChangeFeed:
+    """
+    A bounded, sequence-numbered feed of the changes of an address book, for
+    downstream systems that sync the contacts that changed.
+    Every change of an attached book becomes one event, in the format of the
+    journal entries plus the time of the change:
+        {"seq": 7, "time": 1700000000.0, "op": "add", "record": {...}}
+        {"seq": 8, "time": ..., "op": "change", "name": "...", "field": "phones", "old": null, "new": "+380..."}
+        {"seq": 9, "time": ..., "op": "remove", "name": "..."}
+    The events are appended to 'file_name', so sequence numbers go on and
+    consumers can resume after a restart. Only the last 'max_events' events
+    are kept; the file is rewritten with them once it holds twice as many.
+    A consumer reads the events after a sequence number, or after its
+    cursor, which commit() moves and keeps in '<file_name>.cursors'. Reading
+    costs as much as the events read, whatever the size of the book.
+    Args:
+        file_name: The NDJSON file the events are kept in.
+        max_events: The number of most recent events kept.
+    """
+
+    def __init__(self, file_name: str, max_events: int = 100_000):
+        self.file_name = Path(file_name)
+        self.cursors_path = Path(f'{file_name}.cursors')
+        self.max_events = max_events
+        self._events = []
+        self._lines_on_disk = 0
+        self._first_seq = 1
+        self.last_seq = 0
+        self._file = None
+        self._lock = threading.Lock()
+        self._address_book = None
+        self._cursors = {}
+        self._load()
+
+    def _load(self) -> None:
+        """
+        Reads the kept events and the consumer cursors. A torn last line,
+        left by a crash in the middle of an append, ends the file and is cut
+        off, so that the next append starts on a line of its own.
+        Sequence numbers go on after the highest committed cursor even if
+        the events up to it were lost, and the kept events are dropped then,
+        so that no sequence number is given twice and consumers behind the
+        lost events resync.
+        """
+        if self.cursors_path.exists():
+            with open(self.cursors_path, 'r') as file:
+                self._cursors = json.load(file)
+        if self.file_name.exists():
+            with open(self.file_name, 'rb+') as file:
+                offset = 0
+                for line in file:
+                    try:
+                        event = json.loads(line) if line.endswith(b'\n') else None
+                    except ValueError:
+                        event = None
+                    if event is None:
+                        file.truncate(offset)
+                        break
+                    self._events.append(event)
+                    offset += len(line)
+            self._lines_on_disk = len(self._events)
+            del self._events[:-self.max_events]
+            if self._events:
+                self.last_seq = self._events[-1]['seq']
+        committed = max(self._cursors.values(), default=0)
+        if committed > self.last_seq:
+            self.last_seq = committed
+            if self._events:
+                self._events.clear()
+                self._rewrite()
+        self._first_seq = self._events[0]['seq'] if self._events else self.last_seq + 1
+
+    def attach(self, address_book: AddressBook) -> None:
+        """
+        Starts recording the changes of the given address book.
+        """
+        if self._address_book is not None:
+            self._address_book.unsubscribe(self._on_change)
+        self._address_book = address_book
+        address_book.subscribe(self._on_change)
+
+    def close(self) -> None:
+        """
+        Stops recording changes and closes the feed file.
+        """
+        if self._address_book is not None:
+            self._address_book.unsubscribe(self._on_change)
+            self._address_book = None
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _on_change(self, action: str, name: str, field: str | None, old_value, new_value) -> None:
+        """
+        Turns a change of the attached book into an event.
+        """
+        if action == 'add':
+            event = {'op': 'add', 'record': AddressBookFileHandler._serialize_record(new_value)}
+        elif action == 'remove':
+            event = {'op': 'remove', 'name': name}
+        else:
+            event = {'op': 'change', 'name': name, 'field': field, 'old': old_value, 'new': new_value}
+        self.append(event)
+
+    def append(self, event: dict) -> int:
+        """
+        Adds an event to the feed and returns its sequence number.
+        """
+        with self._lock:
+            self.last_seq += 1
+            event = {'seq': self.last_seq, 'time': round(time.time(), 3), **event}
+            self._events.append(event)
+            if len(self._events) > 2 * self.max_events:
+                del self._events[:-self.max_events]
+            self._first_seq = self._events[0]['seq']
+            if self._lines_on_disk >= 2 * self.max_events:
+                self._rewrite()
+            else:
+                if self._file is None:
+                    self._file = open(self.file_name, 'a')
+                self._file.write(json.dumps(event, ensure_ascii=False) + '\n')
+                self._file.flush()
+                self._lines_on_disk += 1
+            return self.last_seq
+
+    def _rewrite(self) -> None:
+        """
+        Replaces the feed file with the last 'max_events' events.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        kept = self._events[-self.max_events:]
+        temp_path = f'{self.file_name}.tmp'
+        with open(temp_path, 'w') as file:
+            file.writelines(json.dumps(event, ensure_ascii=False) + '\n' for event in kept)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.file_name)
+        self._lines_on_disk = len(kept)
+
+    def read(self, after: int = 0, limit: int = 1000) -> list:
+        """
+        Returns up to 'limit' events with sequence numbers above 'after', oldest first.
+        Raises CursorExpiredError if events after 'after' were already dropped.
+        """
+        with self._lock:
+            if after < self._first_seq - 1:
+                raise CursorExpiredError(f"The changes after {after} are no longer kept; "
+                                         f"the oldest kept change is {self._first_seq}")
+            start = after - self._first_seq + 1
+            return self._events[start:start + limit]
+
+    def cursor(self, consumer: str) -> int:
+        """
+        Returns the sequence number of the last event the consumer committed, 0 for a new consumer.
+        """
+        return self._cursors.get(consumer, 0)
+
+    def read_for(self, consumer: str, limit: int = 1000) -> list:
+        """
+        Returns up to 'limit' events after the cursor of a consumer.
+        """
+        return self.read(self.cursor(consumer), limit)
+
+    def commit(self, consumer: str, seq: int) -> None:
+        """
+        Moves the cursor of a consumer to 'seq' and saves the cursors.
+        """
+        with self._lock:
+            self._cursors[consumer] = seq
+            temp_path = f'{self.cursors_path}.tmp'
+            with open(temp_path, 'w') as file:
+                json.dump(self._cursors, file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.cursors_path)
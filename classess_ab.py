@@ -1,23 +1,51 @@
 from collections import UserDict
-from datetime import datetime, timedelta
+from collections.abc import Mapping, MutableMapping
+from contextlib import ExitStack
+from functools import partial, wraps
+from itertools import islice
+from datetime import date, datetime, timedelta
 from abc import ABC, abstractmethod
 
-import calendar
-import re
 import json
+import os
+import sys
+import time
+
+from json_stream import JsonObjectStream, JsonStreamError
+from indexes import BirthdayIndex, DeleteIndex, NgramIndex, birthday_keys, birthday_month_day, celebration_date
+from validators import is_valid_birthday, is_valid_email, is_valid_name, is_valid_phone, parse_birthday
 
 
 class Field(ABC):
     """
     A base class for representing fields with validation.
+    Fields use __slots__ to keep millions of them small; subclasses may keep
+    a compact encoding of the value in the slot and decode it in the getter.
     Args:
         value: The initial value of the field.
     """
 
+    __slots__ = ('__value',)
+
     def __init__(self, value: str):
         self.__value = None
         self.value = value
 
+    @classmethod
+    def from_valid(cls, value: str) -> 'Field':
+        """
+        Creates a field from a value that was already validated, without validating it again.
+        """
+        field = cls.__new__(cls)
+        field._store(value)
+        return field
+
+    def _store(self, value: str) -> None:
+        """
+        Keeps a validated value in the slot.
+        """
+        Field.value.fset(self, value)
+
     @abstractmethod
     def validate(self, new_value: str) -> bool:
         """
@@ -53,26 +81,37 @@ class Phone(Field):
         value: The initial value of the phone number.
     """
 
+    __slots__ = ()
+
     def __init__(self, value: str = None):
         super().__init__(value)
 
-    @Field.value.setter
+    @property
+    def value(self) -> str:
+        """
+        The phone number is kept as an int of its digits prefixed with 1,
+        so leading zeros survive.
+        """
+        encoded = Field.value.fget(self)
+        return None if encoded is None else f'+{str(encoded)[1:]}'
+
+    @value.setter
     def value(self, new_value: str):
         """
         Setter method for the phone number field.
          """
         if not self.validate(new_value):
             return f'The phone number {new_value} cannot be assigned as it is not valid.'
-        Field.value.fset(self, new_value)
+        self._store(new_value)
+
+    def _store(self, value: str) -> None:
+        Field.value.fset(self, int('1' + value[1:]))
 
     def validate(self, number: str) -> bool:
         """
         Validates a new phone number value.
         """
-        if number is None:
-            return False
-        phone_format = r'^\+\d{1,3}\d{9}$'
-        return bool(re.match(phone_format, number))
+        return is_valid_phone(number)
 
 
 class Email(Field):
@@ -82,27 +121,40 @@ class Email(Field):
         value: The initial value of the email address.
     """
 
+    __slots__ = ('_domain',)
+
     def __init__(self, value: str = None):
+        self._domain = None
         super().__init__(value)
 
-    @Field.value.setter
+    @property
+    def value(self) -> str:
+        """
+        The email is kept as its local part and an interned domain,
+        which is shared by all emails with the same domain.
+        """
+        local = Field.value.fget(self)
+        return None if local is None else f'{local}@{self._domain}'
+
+    @value.setter
     def value(self, new_value: str):
         """
         Setter method for the email field.
         """
         if not self.validate(new_value):
             return f'The email {new_value} cannot be assigned as it is not valid.'
-        Field.value.fset(self, new_value)
+        self._store(new_value)
+
+    def _store(self, value: str) -> None:
+        local, _, domain = value.partition('@')
+        self._domain = sys.intern(domain)
+        Field.value.fset(self, local)
 
     def validate(self, email: str) -> bool:
         """
         Validates a email value.
         """
-        if email is None:
-            return False
-        email_format = (r'\b(?![A-Za-z0-9._%+-]*a@t[A-Za-z0-9._%+-]*)\b'
-                        r'(?![0-9]{2})[A-Za-z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b')
-        return bool(re.match(email_format, email))
+        return is_valid_email(email)
 
 
 class Name(Field):
@@ -112,6 +164,8 @@ class Name(Field):
         value: The initial value of the name.
     """
 
+    __slots__ = ()
+
     def __init__(self, value: str):
         super().__init__(value)
 
@@ -122,15 +176,13 @@ class Name(Field):
         """
         if not self.validate(new_value):
             return f'The name {new_value} cannot be assigned as it is not valid.'
-        Field.value.fset(self, new_value)
+        self._store(new_value)
 
     def validate(self, name: str) -> bool:
         """
         Validates a new name value.
         """
-        if name is None or not re.match(r'^[A-Za-zА-Яа-я\s]+$', name) or len(name) <= 1:
-            return False
-        return True
+        return is_valid_name(name)
 
 
 class Birthday(Field):
@@ -140,32 +192,65 @@ class Birthday(Field):
         value: The initial value of the birthday.
     """
 
+    __slots__ = ()
+
+    _ordinals = {}
+
     def __init__(self, value: str = None):
         super().__init__(value)
 
-    @Field.value.setter
+    @property
+    def value(self) -> str:
+        """
+        The birthday is kept as the date's ordinal; equal ordinals share one int object.
+        """
+        ordinal = Field.value.fget(self)
+        if ordinal is None:
+            return None
+        day = date.fromordinal(ordinal)
+        # strftime does not zero-pad years below 1000
+        return f'{day.day:02}.{day.month:02}.{day.year:04}'
+
+    @value.setter
     def value(self, new_value: str) -> str:
         """
         Setter method for the new birthday value.
         """
-        if not self.validate(new_value):
+        parsed = parse_birthday(new_value)
+        if parsed is None:
             return f'The date of birth {new_value} cannot be assigned as it is not valid.'
-        Field.value.fset(self, new_value)
+        self._store_ordinal(date(*parsed).toordinal())
+
+    def _store(self, value: str) -> None:
+        day, month, year = value.split('.')
+        self._store_ordinal(date(int(year), int(month), int(day)).toordinal())
+
+    def _store_ordinal(self, ordinal: int) -> None:
+        Field.value.fset(self, self._ordinals.setdefault(ordinal, ordinal))
 
     def validate(self, new_value: str) -> bool:
         """
         Validates a new birthday value.
         """
-        try:
-            parsed_date = datetime.strptime(new_value, '%d.%m.%Y').date()
-            today = datetime.now().date()
-            if parsed_date > today:
-                return False
-            return True
-        except ValueError:
-            return False
-        except TypeError:
-            return False
+        return is_valid_birthday(new_value)
+
+
+def guarded_change(method: callable) -> callable:
+    """
+    Wraps a Record mutator to run inside the guard() contexts of the
+    record's listeners that have one, such as the lock of a shared book,
+    so the record does not change while the book is read.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        guards = [listener.guard for listener in self._listeners if hasattr(listener, 'guard')]
+        if not guards:
+            return method(self, *args, **kwargs)
+        with ExitStack() as stack:
+            for guard in guards:
+                stack.enter_context(guard())
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class Record:
@@ -179,21 +264,59 @@ class Record:
         email: The email address of the contact. Default is None.
     """
 
+    # __weakref__ lets a SqliteAddressBook know the records still in use after they leave its cache
+    __slots__ = ('birthday', 'email', 'name', 'phones', '_listeners', '__weakref__')
+
     def __init__(self, name: str, phone: str = None, birthday: str = None, email: str = None):
         self.birthday = Birthday(birthday) if birthday is not None else None
         self.email = Email(email) if email is not None else None
         self.name = Name(name)
         self.phones = [Phone(phone)] if phone is not None else []
+        self._listeners = ()
+
+    def subscribe(self, listener: callable) -> None:
+        """
+        Registers a callable that is notified about every change made
+        through the record's mutators as listener(record, field, old_value, new_value).
+        """
+        if listener not in self._listeners:
+            self._listeners += (listener,)
+
+    def unsubscribe(self, listener: callable) -> None:
+        """
+        Removes a previously registered change listener.
+        """
+        if listener in self._listeners:
+            self._listeners = tuple(item for item in self._listeners if item != listener)
+
+    def __getstate__(self) -> tuple:
+        """
+        Pickles the fields without the listeners, which belong to the book
+        and the process the record is used in.
+        """
+        return None, {'birthday': self.birthday, 'email': self.email, 'name': self.name,
+                      'phones': self.phones, '_listeners': ()}
 
+    def _notify(self, field: str, old_value: str | None, new_value: str | None) -> None:
+        """
+        Informs all listeners that a field of the record has been changed.
+        """
+        for listener in self._listeners:
+            listener(self, field, old_value, new_value)
+
+    @guarded_change
     def add_email(self, email_value: str) -> bool:
         """
         Adds an email address to the contact's record.
         """
         if email_value:
+            old_value = self.email.value if self.email else None
             self.email = Email(email_value)
+            self._notify('email', old_value, self.email.value)
             return True
         return False
 
+    @guarded_change
     def change_email(self, email: str, new_email_value: str) -> bool:
         """
         Changes the email address of the contact.
@@ -201,39 +324,62 @@ class Record:
         if self.email is not None and self.email.value == email:
             if self.email.validate(new_email_value):
                 self.email = Email(new_email_value)
+                self._notify('email', email, new_email_value)
                 return True
         return False
 
+    @guarded_change
     def remove_email(self, del_email: str) -> bool:
         """
         Removes the email address from the contact's record.
         """
         if self.email and self.email.value == del_email:
             self.email = None
+            self._notify('email', del_email, None)
             return True
         return False
 
+    @guarded_change
+    def set_birthday(self, birthday: str | None) -> bool:
+        """
+        Sets or, when None is given, removes the contact's birthday.
+        """
+        new_birthday = Birthday(birthday) if birthday is not None else None
+        if new_birthday is not None and new_birthday.value is None:
+            return False
+        old_value = self.birthday.value if self.birthday else None
+        self.birthday = new_birthday
+        self._notify('birthday', old_value, birthday)
+        return True
+
+    @guarded_change
     def add_phone_number(self, number: str) -> bool:
         """
         Adds a phone number to the contact's record.
         """
-        phone = Phone(number)
-        if phone.validate(number) and number not in self.phones:
-            self.phones.append(phone)
+        if is_valid_phone(number) and not self.has_phone(number):
+            self.phones.append(Phone(number))
+            self._notify('phones', None, number)
             return True
         else:
             return False
 
+    @guarded_change
     def change_phone_number(self, number: str, new_number: str) -> bool:
         """
          Changes a phone number in the contact's record.
+         The new number must be valid and not one the contact already has.
         """
+        if not is_valid_phone(new_number) or (new_number != number and self.has_phone(new_number)):
+            return False
         for index, phone in enumerate(self.phones):
             if phone.value == number:
                 self.phones[index] = Phone(new_number)
+                self._notify('phones', number, self.phones[index].value)
                 return True
         return False
 
+    @guarded_change
     def remove_phone_number(self, number: str) -> bool:
         """
         Removes a phone number from the contact's record.
@@ -241,28 +387,27 @@ class Record:
         if any(phone.value == number for phone in self.phones):
             new_phones = [phone for phone in self.phones if phone.value != number]
             self.phones = new_phones
+            self._notify('phones', number, None)
             return True
         return False
 
+    def has_phone(self, number: str) -> bool:
+        """
+        Checks whether the contact already has the given phone number.
+        """
+        return any(phone.value == number for phone in self.phones)
+
     def days_to_birthday(self) -> int | None:
         """
          Calculates the number of days remaining until the contact's next birthday.
         """
         if self.birthday and self.birthday.validate(self.birthday.value):
-            parsed_date = datetime.strptime(self.birthday.value, '%d.%m.%Y').date()
+            month, day = birthday_month_day(self.birthday.value)
             date_now = datetime.now().date()
-            date_now_year = date_now.year
-            next_year = date_now.year + 1
-            parsed_date = parsed_date.replace(year=date_now_year)
-
-            if parsed_date <= date_now:
-                if calendar.isleap(next_year):
-                    time_delta = (parsed_date - date_now + timedelta(days=366)).days
-                else:
-                    time_delta = (parsed_date - date_now + timedelta(days=365)).days
-            else:
-                time_delta = (parsed_date - date_now).days
-            return time_delta
+            next_birthday = celebration_date(month, day, date_now.year)
+            if next_birthday <= date_now:
+                next_birthday = celebration_date(month, day, date_now.year + 1)
+            return (next_birthday - date_now).days
         else:
             return None
 
@@ -284,12 +429,473 @@ class Record:
         return f"Name: {self.name.value}, Phones: {phones_str}, Email: {email_str}, Birthday: {birthday_str}"
 
 
+def normalize_phone(number: str) -> str:
+    """
+    Brings a phone number to the canonical '+<digits>' form used by the indexes.
+    """
+    digits = ''.join(char for char in number if char.isdigit())
+    return f'+{digits}' if digits else ''
+
+
+def fold_name(name: str) -> str:
+    """
+    Brings a name to the case- and space-insensitive form used by the indexes.
+    """
+    return name.strip().casefold()
+
+
+def record_fields(record: Record) -> tuple:
+    """
+    Returns the raw (phones, birthday, email) fields of a record.
+    """
+    return (tuple(phone.value for phone in record.phones),
+            record.birthday.value if record.birthday else None,
+            record.email.value if record.email else None)
+
+
+def record_is_valid(record: Record) -> bool:
+    """
+    Checks a record whose fields were set through their setters, which
+    validate the values and leave a rejected one as None, without validating
+    the values a second time as AddressBook.record_errors does.
+    """
+    return (Field.value.fget(record.name) is not None
+            and all(Field.value.fget(phone) is not None for phone in record.phones)
+            and (record.birthday is None or Field.value.fget(record.birthday) is not None)
+            and (record.email is None or Field.value.fget(record.email) is not None))
+
+
+def build_record(name: str, fields: tuple) -> Record | None:
+    """
+    Builds a record from its raw (phones, birthday, email) fields.
+    Returns None if the record is not valid.
+    """
+    phones, birthday, email = fields
+    record = Record(name, None, birthday, email)
+    for phone in phones:
+        record.add_phone_number(phone)
+    return record if record_is_valid(record) else None
+
+
+def build_valid_record(name: str, fields: tuple) -> Record:
+    """
+    Builds a record from raw (phones, birthday, email) fields that were
+    already validated, such as in a worker process, without validating them again.
+    """
+    phones, birthday, email = fields
+    record = Record.__new__(Record)
+    record.name = Name.from_valid(name)
+    record.phones = [Phone.from_valid(phone) for phone in phones]
+    record.birthday = Birthday.from_valid(birthday) if birthday is not None else None
+    record.email = Email.from_valid(email) if email is not None else None
+    record._listeners = ()
+    return record
+
+
+def raw_fields_are_valid(name: str, fields: tuple) -> bool:
+    """
+    Checks whether build_record would build a record from the raw
+    (phones, birthday, email) fields, without building it.
+    """
+    _, birthday, email = fields
+    return (is_valid_name(name)
+            and (birthday is None or parse_birthday(birthday) is not None)
+            and (email is None or is_valid_email(email)))
+
+
+class LazyRecordMap(MutableMapping):
+    """
+    A name -> Record mapping over a base mapping of raw (phones, birthday, email)
+    tuples, which builds every record on first access.
+    Built, added and replaced records are kept in an overlay dict, and removed
+    base entries are remembered, so the base itself is never changed.
+    Iterating and len() check the entries not built yet with 'check' and drop
+    the invalid ones, so the mapping never yields a name it cannot return.
+    A base may also provide names_with_folded_name(folded) and
+    names_with_birthday(day) to answer these queries without building the records.
+    Args:
+        base: The mapping of raw fields by name.
+        build: Builds a record from a name and raw fields, returns None for invalid ones.
+        check: Checks whether build would build a record from a name and raw fields,
+            or None when the base holds only valid entries.
+        records: The initial overlay of records.
+        on_build: Called with every record built from the base.
+        on_drop: Called with the name and raw fields of every base entry found invalid.
+    """
+
+    def __init__(self, base: Mapping, build: callable, check: callable, records: dict = None,
+                 on_build: callable = None, on_drop: callable = None):
+        self.base = base
+        self._build = build
+        self._check = check
+        self._checked = check is None
+        self._records = records if records is not None else {}
+        self._removed = set()
+        self._on_build = on_build
+        self._on_drop = on_drop
+        self._size = len(base) + sum(1 for name in self._records if name not in base)
+
+    def __getitem__(self, name: str) -> Record:
+        record = self._records.get(name)
+        if record is not None:
+            return record
+        fields = None if name in self._removed else self.base.get(name)
+        if fields is None:
+            raise KeyError(name)
+        record = self._build(name, fields)
+        if record is None:
+            self._drop(name, fields)
+            raise KeyError(name)
+        self._records[name] = record
+        if self._on_build is not None:
+            self._on_build(record)
+        return record
+
+    def _drop(self, name: str, fields: tuple) -> None:
+        """
+        Forgets a base entry found invalid.
+        """
+        self._removed.add(name)
+        self._size -= 1
+        if self._on_drop is not None:
+            self._on_drop(name, fields)
+
+    def _valid_base_items(self):
+        """
+        Yields (name, fields) of the base entries that are not removed,
+        dropping the entries not built yet that do not pass the check.
+        Once all the entries were checked, they are not checked again.
+        """
+        checked = self._checked
+        for name, fields in self.base.items():
+            if name in self._removed:
+                continue
+            if not checked and name not in self._records and not self._check(name, fields):
+                self._drop(name, fields)
+                continue
+            yield name, fields
+        self._checked = True
+
+    def __contains__(self, name) -> bool:
+        return name in self._records or (name not in self._removed and name in self.base)
+
+    def __setitem__(self, name: str, record: Record):
+        if name not in self:
+            self._size += 1
+        self._records[name] = record
+        self._removed.discard(name)
+
+    def __delitem__(self, name: str):
+        if name not in self:
+            raise KeyError(name)
+        self._records.pop(name, None)
+        if name in self.base:
+            self._removed.add(name)
+        self._size -= 1
+
+    def __iter__(self):
+        """
+        Yields the names of the valid base entries in the base's order, then
+        the names only in the overlay.
+        Unlike a dict, the mapping does not detect changes made during the iteration.
+        """
+        for name, _ in self._valid_base_items():
+            yield name
+        for name in list(self._records):
+            if name not in self.base:
+                yield name
+
+    def __len__(self) -> int:
+        if not self._checked:
+            for _ in self._valid_base_items():
+                pass
+        return self._size
+
+    def raw_items(self):
+        """
+        Yields (name, (phones, birthday, email)) of the valid entries without building any records.
+        """
+        for name, fields in self._valid_base_items():
+            record = self._records.get(name)
+            yield name, (record_fields(record) if record is not None else fields)
+        for name, record in list(self._records.items()):
+            if name not in self.base:
+                yield name, record_fields(record)
+
+    def has_folded_name(self, folded: str) -> bool | None:
+        """
+        Checks whether a name with the given folded form exists,
+        or returns None when the base cannot tell without a scan.
+        """
+        lookup = getattr(self.base, 'names_with_folded_name', None)
+        if lookup is None:
+            return None
+        if any(fold_name(name) == folded for name in self._records):
+            return True
+        return any(name not in self._removed for name in lookup(folded))
+
+    def names_with_birthday(self, day: date) -> set | None:
+        """
+        Returns the names celebrating their birthday on the given date,
+        or None when the base cannot tell without a scan.
+        """
+        lookup = getattr(self.base, 'names_with_birthday', None)
+        if lookup is None:
+            return None
+        names = {name for name in lookup(day) if name not in self._removed and name not in self._records}
+        month_days = birthday_keys(day)
+        for name, record in self._records.items():
+            if record.birthday and record.birthday.value and birthday_month_day(record.birthday.value) in month_days:
+                names.add(name)
+        return names
+
+
 class AddressBook(UserDict):
     """
     A class representing an address book that stores and
     manages contact records.
+
+    Besides the records keyed by name, the book maintains secondary
+    indexes (case-folded names, normalized phones and emails, n-grams of
+    names and phones for substring search, birthdays by day of year) that
+    are updated on every insert and removal and on every change made
+    through the Record mutators. The n-gram indexes are built on the first
+    substring search and the fuzzy index of the words of names on the first
+    fuzzy search, and they are kept up to date from then on.
     """
 
+    def __init__(self, *args, **kwargs):
+        self._names = {}
+        self._phones = {}
+        self._emails = {}
+        self._name_grams = None
+        self._phone_grams = None
+        self._birthdays = BirthdayIndex()
+        self._fuzzy_names = None
+        self._record_listener = self._make_record_listener()
+        self._listeners = []
+        self._indexed = True
+        super().__init__(*args, **kwargs)
+
+    def _make_record_listener(self) -> callable:
+        """
+        Returns the listener the book subscribes to the Record mutators of its records.
+        """
+        return self._on_record_changed
+
+    def __setitem__(self, key: str, record: Record):
+        if key in self.data:
+            self._unindex_record(key, self.data[key])
+        self.data[key] = record
+        self._index_record(key, record)
+        self._notify('add', key, None, None, record)
+
+    def __delitem__(self, key: str):
+        record = self.data.pop(key)
+        self._unindex_record(key, record)
+        self._notify('remove', key, None, record, None)
+
+    def subscribe(self, listener: callable) -> None:
+        """
+        Registers a callable that is notified about every change of the book as
+        listener(action, name, field, old_value, new_value), where action is
+        'add' (new_value is the added record), 'remove' (old_value is the removed
+        record) or 'change' (a field of the record changed through its mutators).
+        """
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener: callable) -> None:
+        """
+        Removes a previously registered change listener.
+        """
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, action: str, name: str, field: str | None, old_value, new_value) -> None:
+        """
+        Informs all listeners about a change of the book.
+        """
+        for listener in self._listeners:
+            listener(action, name, field, old_value, new_value)
+
+    def _index_record(self, key: str, record: Record) -> None:
+        """
+        Adds the record to the secondary indexes and starts tracking its changes.
+        """
+        if self._indexed:
+            self._index_fields(key, record_fields(record))
+        record.subscribe(self._record_listener)
+
+    def _unindex_record(self, key: str, record: Record) -> None:
+        """
+        Removes the record from the secondary indexes and stops tracking its changes.
+        """
+        record.unsubscribe(self._record_listener)
+        if self._indexed:
+            self._unindex_fields(key, record_fields(record))
+
+    def _index_fields(self, key: str, fields: tuple) -> None:
+        """
+        Adds the (phones, birthday, email) fields of a record to the secondary indexes.
+        """
+        phones, birthday, email = fields
+        self._add_to_index(self._names, fold_name(key), key)
+        if self._fuzzy_names is not None:
+            self._fuzzy_names.add(key, fold_name(key))
+        for phone in phones:
+            self._add_to_index(self._phones, normalize_phone(phone), key)
+        if self._name_grams is not None:
+            self._name_grams.add(key, key.casefold())
+            for phone in phones:
+                self._phone_grams.add(key, phone)
+        if email:
+            self._add_to_index(self._emails, email.casefold(), key)
+        if birthday:
+            self._birthdays.add(key, birthday)
+
+    def _unindex_fields(self, key: str, fields: tuple) -> None:
+        """
+        Removes the (phones, birthday, email) fields of a record from the secondary indexes.
+        """
+        phones, birthday, email = fields
+        self._remove_from_index(self._names, fold_name(key), key)
+        if self._fuzzy_names is not None:
+            self._fuzzy_names.remove(key, fold_name(key))
+        for phone in phones:
+            self._remove_from_index(self._phones, normalize_phone(phone), key)
+        if self._name_grams is not None:
+            self._name_grams.remove(key, key.casefold())
+            for phone in phones:
+                self._phone_grams.remove(key, phone)
+        if email:
+            self._remove_from_index(self._emails, email.casefold(), key)
+        if birthday:
+            self._birthdays.remove(key, birthday)
+
+    def _ensure_indexes(self) -> None:
+        """
+        Builds the secondary indexes from the raw fields of the records when
+        they are not built yet, which is the case after a lazy load or defer_indexes.
+        """
+        if self._indexed:
+            return
+        for key, fields in self.raw_items():
+            self._index_fields(key, fields)
+        self._indexed = True
+
+    def defer_indexes(self) -> None:
+        """
+        Drops the secondary indexes, which are then rebuilt on first use.
+        Adding many records at once is cheaper this way than updating the
+        indexes record by record.
+        """
+        if self._indexed:
+            self._indexed = False
+            self._names.clear()
+            self._phones.clear()
+            self._emails.clear()
+            self._name_grams = None
+            self._phone_grams = None
+            self._birthdays = BirthdayIndex()
+            self._fuzzy_names = None
+
+    def raw_items(self):
+        """
+        Yields (name, (phones, birthday, email)) for every record, without
+        building the records that were not accessed yet.
+        """
+        if isinstance(self.data, LazyRecordMap):
+            yield from self.data.raw_items()
+        else:
+            for key, record in self.data.items():
+                yield key, record_fields(record)
+
+    def accepts_raw_source(self) -> bool:
+        """
+        Checks whether add_raw_source can add records to the book. A book that
+        already has a raw source cannot take another one, and a book with
+        listeners cannot take one, as they expect every added record to be announced.
+        """
+        return not isinstance(self.data, LazyRecordMap) and not self._listeners
+
+    def add_raw_source(self, base: Mapping, validated: bool = False) -> bool:
+        """
+        Adds the records of 'base', a name -> (phones, birthday, email) mapping,
+        to the book without building them: each record is built and validated
+        on first access, and one that turns out to be invalid is dropped then.
+        With 'validated', the fields are known to be valid and are not validated again.
+        The indexes are rebuilt on first use. Records already in the book with
+        the same names are replaced.
+        Returns False, adding nothing, when the book does not accept a raw source.
+        """
+        if not self.accepts_raw_source():
+            return False
+        records = self.data
+        for key in [key for key in records if key in base]:
+            records.pop(key).unsubscribe(self._record_listener)
+        if validated:
+            build, check = build_valid_record, None
+        else:
+            build, check = build_record, raw_fields_are_valid
+        self.data = LazyRecordMap(base, build, check, records=records,
+                                  on_build=self._on_record_built, on_drop=self._on_record_dropped)
+        self.defer_indexes()
+        return True
+
+    def _on_record_built(self, record: Record) -> None:
+        record.subscribe(self._record_listener)
+
+    def _on_record_dropped(self, key: str, fields: tuple) -> None:
+        if self._indexed:
+            self._unindex_fields(key, fields)
+
+    def _on_record_changed(self, record: Record, field: str, old_value: str | None, new_value: str | None) -> None:
+        """
+        Keeps the indexes in sync with the record mutators and passes the change on to the book's listeners.
+        """
+        key = record.name.value
+        if self._indexed:
+            self._reindex_field(key, field, old_value, new_value)
+        self._notify('change', key, field, old_value, new_value)
+
+    def _reindex_field(self, key: str, field: str, old_value: str | None, new_value: str | None) -> None:
+        """
+        Replaces the old value of a record's field with the new one in the indexes.
+        """
+        if field == 'birthday':
+            if old_value is not None:
+                self._birthdays.remove(key, old_value)
+            if new_value is not None:
+                self._birthdays.add(key, new_value)
+            return
+        if field == 'phones':
+            index, normalize = self._phones, normalize_phone
+        elif field == 'email':
+            index, normalize = self._emails, str.casefold
+        else:
+            return
+        if old_value is not None:
+            self._remove_from_index(index, normalize(old_value), key)
+            if field == 'phones' and self._phone_grams is not None:
+                self._phone_grams.remove(key, old_value, self._phones_of(key))
+        if new_value is not None:
+            self._add_to_index(index, normalize(new_value), key)
+            if field == 'phones' and self._phone_grams is not None:
+                self._phone_grams.add(key, new_value)
+
+    @staticmethod
+    def _add_to_index(index: dict, value: str, key: str) -> None:
+        index.setdefault(value, set()).add(key)
+
+    @staticmethod
+    def _remove_from_index(index: dict, value: str, key: str) -> None:
+        keys = index.get(value)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del index[value]
+
     def add_record(self, record: Record) -> bool:
         """
         Adds a contact record to the address book
@@ -297,31 +903,123 @@ class AddressBook(UserDict):
         """
         if self.validate_record(record):
             key = record.name.value
-            self.data[key] = record
+            self[key] = record
             return True
         else:
             return False
 
+    def add_records(self, records: Mapping) -> None:
+        """
+        Adds records that are already validated, by name, replacing the ones
+        with the same names, without validating them again.
+        When at least as many records are added as the book holds, the indexes
+        are deferred and rebuilt on first use instead of updated record by record.
+        """
+        if len(records) >= len(self.data):
+            self.defer_indexes()
+        for key, record in records.items():
+            self[key] = record
+
+    def has_name(self, name: str) -> bool:
+        """
+        Checks whether a contact with the given name exists, ignoring case
+        and surrounding spaces.
+        """
+        if not self._indexed and isinstance(self.data, LazyRecordMap):
+            found = self.data.has_folded_name(fold_name(name))
+            if found is not None:
+                return found
+        self._ensure_indexes()
+        return fold_name(name) in self._names
+
+    def get_records_by_phone(self, number: str) -> list:
+        """
+        Returns the contact records that own the given phone number.
+        """
+        self._ensure_indexes()
+        return self._records_by_keys(self._phones.get(normalize_phone(number), ()))
+
+    def get_records_by_email(self, email: str) -> list:
+        """
+        Returns the contact records that own the given email address.
+        """
+        self._ensure_indexes()
+        return self._records_by_keys(self._emails.get(email.casefold(), ()))
+
+    def _records_by_keys(self, keys) -> list:
+        """
+        Returns the records with the given names sorted by name, leaving out
+        the ones dropped as invalid on first access.
+        """
+        records = (self.data.get(key) for key in sorted(keys))
+        return [record for record in records if record is not None]
+
     def find_records(self, **search_criteria: dict) -> list:
         """
         Finds and returns a list of contact records that
         match the given search criteria.
-        """
+        Names are matched case-insensitively, phones by their digits.
+        Records are returned sorted by name.
+        """
+        name_grams, phone_grams = self._gram_indexes()
+        keys = set()
+        if 'name' in search_criteria and len(search_criteria['name']) >= 2:
+            keys |= name_grams.search(search_criteria['name'].casefold(), lambda key: (key.casefold(),))
+        if 'phones' in search_criteria and len(search_criteria['phones']) >= 5:
+            query = ''.join(char for char in search_criteria['phones'] if char.isdigit() or char == '+')
+            keys |= phone_grams.search(query, self._phones_of)
+        return self._records_by_keys(keys)
+
+    def _phones_of(self, key: str) -> list:
+        """
+        Returns the phone numbers of the record with the given name, none if there is no such record.
+        """
+        record = self.data.get(key)
+        return [phone.value for phone in record.phones] if record is not None else []
+
+    def _gram_indexes(self) -> tuple:
+        """
+        Returns the n-gram indexes of the names and of the phones, building
+        them from the name and phone indexes on first use.
+        """
+        self._ensure_indexes()
+        if self._name_grams is None:
+            name_grams, phone_grams = NgramIndex(), NgramIndex()
+            for keys in self._names.values():
+                for key in keys:
+                    name_grams.add(key, key.casefold())
+            for phone, keys in self._phones.items():
+                for key in keys:
+                    phone_grams.add(key, phone)
+            self._name_grams, self._phone_grams = name_grams, phone_grams
+        return self._name_grams, self._phone_grams
+
+    def _fuzzy_index(self) -> DeleteIndex:
+        """
+        Returns the fuzzy index of the names, building it from the name index on first use.
+        """
+        self._ensure_indexes()
+        if self._fuzzy_names is None:
+            fuzzy_names = DeleteIndex()
+            for folded, keys in self._names.items():
+                for key in keys:
+                    fuzzy_names.add(key, folded)
+            self._fuzzy_names = fuzzy_names
+        return self._fuzzy_names
+
+    def find_similar(self, name: str, max_distance: int = 2) -> list:
+        """
+        Finds the contacts whose names are like the given one despite typos:
+        every word of it is within 'max_distance' edits (0 to 2) of a word of
+        the name, case-insensitively. Returns (record, distance) pairs ranked
+        by the sum of the distances of the words, then by name.
+        """
+        found = self._fuzzy_index().search(fold_name(name), max_distance)
         result = []
-        found = False
-        for record in self.data.values():
-            if ('name' in search_criteria and len(search_criteria['name']) >= 2
-                    and search_criteria['name'] in record.name.value):
-                result.append(record)
-                found = True
-            if 'phones' in search_criteria and len(search_criteria['phones']) >= 5:
-                for phone in record.phones:
-                    if search_criteria['phones'] in phone.value:
-                        result.append(record)
-                        found = True
-                        break
-        if not found:
-            print("There is no contact that matches the specified search criteria.")
+        for key, distance in sorted(found.items(), key=lambda item: (item[1], item[0])):
+            record = self.data.get(key)
+            if record is not None:
+                result.append((record, distance))
         return result
 
     def get_all_records(self) -> list:
@@ -344,31 +1042,49 @@ class AddressBook(UserDict):
         to_day = datetime.now().date()
         new_date = to_day + timedelta(days=num)
 
-        happy_birthday = []
-        for record in self.data.values():
-            if record.birthday:
-                birthdate = datetime.strptime(record.birthday.value, '%d.%m.%Y').date()
-                if birthdate.day == new_date.day and birthdate.month == new_date.month:
-                    happy_birthday.append(record.name.value)
+        return sorted(self._celebrants(new_date))
 
-        print(f'List of birthday celebrants to greet in {num} day(s): {happy_birthday}')
-        return happy_birthday
+    def get_upcoming_birthdays(self, days: int) -> dict:
+        """
+        Returns the names of contacts celebrating their birthday in the next
+        'days' days, starting today, grouped by date in chronological order.
+        """
+        if not self._indexed and isinstance(self.data, LazyRecordMap):
+            today = datetime.now().date()
+            upcoming = {}
+            for offset in range(days):
+                day = today + timedelta(days=offset)
+                keys = self._celebrants(day)
+                if keys:
+                    upcoming[day] = keys
+        else:
+            self._ensure_indexes()
+            upcoming = self._birthdays.upcoming(datetime.now().date(), days)
+        return {day: sorted(keys) for day, keys in upcoming.items()}
+
+    def _celebrants(self, day: date) -> set:
+        """
+        Returns the names of contacts celebrating their birthday on the given date.
+        """
+        if not self._indexed and isinstance(self.data, LazyRecordMap):
+            keys = self.data.names_with_birthday(day)
+            if keys is not None:
+                return keys
+        self._ensure_indexes()
+        return self._birthdays.on_date(day)
 
     def get_record_by_name(self, name: str) -> Record | None:
         """
         Retrieves a contact record by searching for a name.
         """
-        for record in self.data.values():
-            if record.name.value == name:
-                return record
-        return None
+        return self.data.get(name)
 
     def remove_record(self, name: str) -> bool:
         """
         Removes a contact record by name.
         """
         if name in self.data:
-            del self.data[name]
+            del self[name]
             return True
         else:
             return False
@@ -378,9 +1094,18 @@ class AddressBook(UserDict):
         """
         Validates a contact record, including name,
         phone numbers, birthday, and email.
+        The problems found are returned by record_errors.
+        """
+        return not AddressBook.record_errors(record)
+
+    @staticmethod
+    def record_errors(record: Record) -> list:
+        """
+        Validates a contact record and returns the list of
+        problems found.
         """
         valid_phones = all(isinstance(phone, Phone) and phone.validate(phone.value) for phone in record.phones)
-        valid_name = isinstance(record.name, Name)
+        valid_name = isinstance(record.name, Name) and record.name.value is not None
 
         if record.birthday:
             valid_birthday = isinstance(record.birthday, Birthday) and record.birthday.validate(record.birthday.value)
@@ -392,40 +1117,41 @@ class AddressBook(UserDict):
         else:
             valid_email = True
 
+        errors = []
         if not valid_phones:
-            print("Phone numbers are not valid.")
+            errors.append("Phone numbers are not valid.")
         if not valid_name:
-            print("Name is not valid.")
+            errors.append("Name is not valid.")
         if not valid_birthday:
-            print("Date of birth is not valid.")
+            errors.append("Date of birth is not valid.")
         if not valid_email:
-            print("Email is not valid.")
-        return valid_phones and valid_name and valid_birthday and valid_email
+            errors.append("Email is not valid.")
+        return errors
 
     def iterator(self, n: int):
         """
-        Splits the address book into iterators with 'n'
-        records per iteration.
+        Splits the address book into lists of 'n' records, produced lazily
+        one chunk at a time. The same mutation rules as for iterating over
+        the book apply. Raises ValueError when 'n' is less than 1.
         """
-        return (list(self.data.values())[i:i + n] for i in range(0, len(self.data), n))
+        if n < 1:
+            raise ValueError(f"The chunk size must be at least 1, got {n}")
+        records = iter(self.data.values())
+        return iter(lambda: list(islice(records, n)), [])
 
     def __iter__(self):
         """
-        Initializes the iterator for the address book.
+        Returns a new iterator over the records of the address book.
+        Every call gets an independent iterator, so nested or concurrent loops
+        over the same book do not affect each other.
+        Records must not be added or removed while an iterator is in use: a
+        book keeping its records in a dict makes the next step raise
+        RuntimeError, but a lazily loaded or SQLite-backed book does not
+        detect it, and its iterator may skip or repeat records. Changes made
+        to the records themselves, and records replaced under an existing
+        name, are seen by the iterator.
         """
-        self.index = 0
-        return self
-
-    def __next__(self) -> 'Record':
-        """
-        Iterates through the address book, returning one record at a time.
-        """
-        if self.index < len(self.data):
-            record = list(self.data.values())[self.index]
-            self.index += 1
-            return record
-        else:
-            raise StopIteration
+        return iter(self.data.values())
 
     def __str__(self) -> str:
         """
@@ -435,22 +1161,105 @@ class AddressBook(UserDict):
         return book_str
 
 
+class LoadStats:
+    """
+    Statistics of loading an address book from a file.
+    At most 'max_errors' error descriptions are kept; 'skipped' counts all of them.
+    After a lazy load only the structure of the records is checked, so 'loaded'
+    may include records that are dropped as invalid on first access.
+    'duplicates' counts the names loaded more than once from different files.
+    """
+
+    max_errors = 1000
+
+    def __init__(self):
+        self.loaded = 0
+        self.skipped = 0
+        self.bytes_read = 0
+        self.seconds = 0.0
+        self.aborted = False
+        self.lazy = False
+        self.duplicates = 0
+        self.errors = []
+
+    def add_error(self, line: int, offset: int, message: str) -> None:
+        """
+        Records a problem found at the given position of the file.
+        """
+        if len(self.errors) < self.max_errors:
+            self.errors.append((line, offset, message))
+
+    def __str__(self) -> str:
+        status = 'aborted' if self.aborted else 'done'
+        if self.lazy:
+            status += ', contacts are validated on first use'
+        if self.duplicates:
+            status += f', {self.duplicates} duplicate name(s) replaced'
+        return (f"Loaded {self.loaded} contact(s), skipped {self.skipped}, "
+                f"read {self.bytes_read} bytes in {self.seconds:.2f} s ({status})")
+
+
+class AddressBookLoadError(Exception):
+    """
+    Raised when loading is aborted because of an invalid record or document.
+    Args:
+        message: The description of the problem.
+        stats: The statistics of the load up to the problem.
+    """
+
+    def __init__(self, message: str, stats: LoadStats):
+        super().__init__(message)
+        self.stats = stats
+
+    def __reduce__(self) -> tuple:
+        return AddressBookLoadError, (str(self), self.stats)
+
+
 class AddressBookFileHandler:
     """
     A class for handling the serialization and deserialization of an AddressBook to/from a file.
     Args:
         file_name (str): The name of the file to read from or write to.
+        lazy (bool): Whether loading keeps the raw fields of the records and lets
+            the address book build and validate every record on first access,
+            instead of building and validating all of them while loading.
     """
 
-    def __init__(self, file_name: str):
+    progress_every = 10000
+    # save_to_file only reads the raw fields of the book, so a copy of the book may be saved instead
+    saves_copies = True
+
+    def __init__(self, file_name: str, lazy: bool = True):
         self.file_name = file_name
+        self.lazy = lazy
+        self.last_load_stats = None
 
     def save_to_file(self, address_book: AddressBook) -> None:
         """
         Serializes and saves an AddressBook to a file.
-        """
-        with open(self.file_name, 'w') as file:
-            json.dump(address_book.data, file, default=self._serialize_record, indent=4)
+        The records are written one at a time from their raw fields,
+        so records not built yet after a lazy load are not built for saving.
+        The file is written under a temporary name, synced to disk and then
+        replaces the old one, so a crash while saving leaves the old file whole.
+        """
+        temp_name = f'{self.file_name}.tmp'
+        with open(temp_name, 'w') as file:
+            self._write_json(file, address_book.raw_items())
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_name, self.file_name)
+
+    @classmethod
+    def _write_json(cls, file, items) -> None:
+        """
+        Writes (name, (phones, birthday, email)) items to a text file as a JSON object of records.
+        """
+        separator = '{\n'
+        for name, fields in items:
+            record_json = json.dumps(cls._serialize_fields(name, fields), indent=4).replace('\n', '\n    ')
+            file.write(f'{separator}    {json.dumps(name)}: {record_json}')
+            separator = ',\n'
+        file.write('{}' if separator == '{\n' else '\n}')
 
     @staticmethod
     def _deserialize_record(contact_data: dict) -> Record | None:
@@ -468,21 +1277,167 @@ class AddressBookFileHandler:
             record.add_phone_number(phone)
         return record
 
-    def load_from_file(self) -> AddressBook:
+    def load_from_file(self, address_book: AddressBook = None, on_error: str = 'skip',
+                       progress: callable = None) -> AddressBook:
         """
         Loads and deserializes an AddressBook from a file.
+        The records are added to the given address book or to a new one.
+        The statistics of the load are kept in 'last_load_stats'.
         """
-        addressbook = AddressBook()
+        addressbook = address_book if address_book is not None else AddressBook()
+        self.load_stream(addressbook, on_error, progress)
+        return addressbook
+
+    def load_stream(self, address_book: AddressBook, on_error: str = 'skip', progress: callable = None) -> LoadStats:
+        """
+        Parses the file one record at a time, so memory use does not depend
+        on the size of the file, and adds the valid records to the address book.
+        Invalid records are skipped and reported in the returned statistics when
+        'on_error' is 'skip'; with 'abort' the first of them raises AddressBookLoadError.
+        A file that is not valid JSON stops the load at the broken place: the
+        records read before it are kept and the statistics are marked as aborted,
+        or AddressBookLoadError is raised with 'abort'.
+        'progress', if given, is called with the statistics every 'progress_every'
+        records and at the end. A missing file loads nothing.
+        A lazy handler skipping invalid records only checks the structure of
+        every record and adds the raw fields to the address book as a raw source,
+        if the book accepts one; the values are validated when a record is first used.
+        """
+        raw = {} if self.lazy and on_error == 'skip' and address_book.accepts_raw_source() else None
+        if raw is None:
+            # The indexes are built once, on first use, instead of updated record by record
+            address_book.defer_indexes()
+            stats = self._read(partial(self._load_record, address_book), on_error, progress)
+        else:
+            stats = self._read(partial(self._load_raw, raw), on_error, progress)
+            stats.lazy = True
+            if raw:
+                address_book.add_raw_source(raw)
+        if progress is not None:
+            progress(stats)
+        return stats
+
+    def load_fields(self, on_error: str = 'skip', progress: callable = None) -> dict:
+        """
+        Parses and validates the file like load_stream without building the
+        records, and returns the raw (phones, birthday, email) fields of the
+        valid records by name, with only their valid phone numbers.
+        The statistics of the load are kept in 'last_load_stats'.
+        """
+        fields = {}
+        stats = self._read(partial(self._load_valid_fields, fields), on_error, progress)
+        if progress is not None:
+            progress(stats)
+        return fields
+
+    def _read(self, load: callable, on_error: str, progress: callable) -> LoadStats:
+        """
+        Passes every record of the file to 'load', which returns the list of
+        problems found with it, and returns the statistics of the load, which
+        are also kept in 'last_load_stats'. See load_stream for the handling of errors.
+        """
+        stats = LoadStats()
+        self.last_load_stats = stats
+        started = time.perf_counter()
         try:
-            with open(self.file_name, 'r') as file:
-                records_data = json.load(file)
-                for contact_data in records_data.values():
-                    addressbook.add_record(self._deserialize_record(contact_data))
+            with open(self.file_name, 'rb') as file:
+                stream = JsonObjectStream(file)
+                try:
+                    for _, contact_data, line, offset in stream:
+                        stats.bytes_read = stream.bytes_read
+                        errors = load(contact_data)
+                        if errors:
+                            stats.skipped += 1
+                            stats.add_error(line, offset, ' '.join(errors))
+                            if on_error == 'abort':
+                                stats.aborted = True
+                                raise AddressBookLoadError(
+                                    f"Invalid record at line {line}, offset {offset}: {' '.join(errors)}", stats)
+                        else:
+                            stats.loaded += 1
+                        if progress is not None and (stats.loaded + stats.skipped) % self.progress_every == 0:
+                            progress(stats)
+                except JsonStreamError as error:
+                    stats.aborted = True
+                    stats.add_error(error.line, error.offset, str(error))
+                    if on_error == 'abort':
+                        raise AddressBookLoadError(str(error), stats) from error
+                stats.bytes_read = stream.bytes_read
         except FileNotFoundError:
             pass
-        except Exception:
-            pass
-        return addressbook
+        finally:
+            stats.seconds = time.perf_counter() - started
+        return stats
+
+    def _load_record(self, address_book: AddressBook, contact_data) -> list:
+        """
+        Deserializes one record and adds it to the address book.
+        Returns the list of problems that prevented adding it.
+        """
+        if not isinstance(contact_data, dict):
+            return ["The record is not an object."]
+        try:
+            record = self._deserialize_record(contact_data)
+        except (TypeError, AttributeError, ValueError) as error:
+            return [f"The record cannot be read: {error}."]
+        if not record_is_valid(record):
+            return address_book.record_errors(record)
+        address_book[record.name.value] = record
+        return []
+
+    @staticmethod
+    def _load_raw(raw: dict, contact_data) -> list:
+        """
+        Checks the structure of one record and keeps its raw fields in 'raw'.
+        The birthday is checked like the Birthday setter does and kept in the
+        'dd.mm.yyyy' form, and invalid and repeated phone numbers are left
+        out, as Record.add_phone_number leaves them out of a built record, so
+        the indexes list only the values the built record has.
+        Returns the list of problems that prevented keeping it.
+        """
+        if not isinstance(contact_data, dict):
+            return ["The record is not an object."]
+        name = contact_data.get('name')
+        phones = contact_data.get('phones', [])
+        birthday = contact_data.get('birthday')
+        email = contact_data.get('email')
+        errors = []
+        if not isinstance(phones, list) or not all(isinstance(phone, str) for phone in phones):
+            errors.append("Phone numbers are not valid.")
+        if not isinstance(name, str):
+            errors.append("Name is not valid.")
+        if birthday is not None:
+            parsed = parse_birthday(birthday)
+            if parsed is None:
+                errors.append("Date of birth is not valid.")
+            else:
+                year, month, day = parsed
+                birthday = f'{day:02}.{month:02}.{year:04}'
+        if email is not None and not isinstance(email, str):
+            errors.append("Email is not valid.")
+        if not errors:
+            raw[name] = (tuple(dict.fromkeys(phone for phone in phones if is_valid_phone(phone))), birthday, email)
+        return errors
+
+    @staticmethod
+    def _load_valid_fields(fields: dict, contact_data) -> list:
+        """
+        Checks the structure and the values of one record without building it
+        and keeps its raw fields, as _load_raw does, in 'fields'.
+        Returns the list of problems that prevented keeping it.
+        """
+        checked = {}
+        errors = AddressBookFileHandler._load_raw(checked, contact_data)
+        if errors:
+            return errors
+        [(name, (_, _, email))] = checked.items()
+        if not is_valid_name(name):
+            errors.append("Name is not valid.")
+        if email is not None and not is_valid_email(email):
+            errors.append("Email is not valid.")
+        if not errors:
+            fields.update(checked)
+        return errors
 
     @staticmethod
     def _serialize_record(record: Record) -> dict:
@@ -495,3 +1450,16 @@ class AddressBookFileHandler:
             'birthday': record.birthday.value if record.birthday else None,
             'email': record.email.value if record.email else None
         }
+
+    @staticmethod
+    def _serialize_fields(name: str, fields: tuple) -> dict:
+        """
+        Serializes the raw (phones, birthday, email) fields of a record to a dictionary.
+        """
+        phones, birthday, email = fields
+        return {
+            'name': name,
+            'phones': list(phones),
+            'birthday': birthday,
+            'email': email
+        }
@@ -21,7 +21,29 @@ d8(  888  888   888  888   888   888     888    .o o.  )88b o.  )88b
 """
 
 PATH_TO_SAVE = Path.home() / "orgApp" / "address_book.json"  # for working on different filesystems
-PATH_TO_SAVE.parent.mkdir(parents=True, exist_ok=True)
+PATH_TO_SQLITE = PATH_TO_SAVE.with_suffix('.sqlite3')
+PATH_TO_SNAPSHOT = PATH_TO_SAVE.with_suffix('.absnap')
+# The feed of changes for downstream systems and the cursors of its consumers (PATH_TO_CHANGES.cursors)
+PATH_TO_CHANGES = PATH_TO_SAVE.with_suffix('.changes')
+# 'json' rewrites the whole file on every save,
+# 'journal' appends only the changes to PATH_TO_SAVE.journal and compacts them in the background,
+# 'sqlite' keeps the contacts in PATH_TO_SQLITE and commits every change as it is made,
+# 'binary' memory-maps the snapshot PATH_TO_SNAPSHOT and decodes contacts when they are used
+# 'sharded' splits PATH_TO_SAVE into shards that are loaded in parallel by all CPU cores
+STORAGE_MODE = 'json'
+# True builds and validates a contact when it is first used instead of every contact while loading
+LAZY_LOADING = True
+# Changes are saved in the background once no change came for AUTOSAVE_DELAY seconds,
+# or AUTOSAVE_MAX_DELAY seconds after the first unsaved one; None saves only on 'save' and 'exit'
+AUTOSAVE_DELAY = 2.0
+AUTOSAVE_MAX_DELAY = 30.0
+# True makes the in-memory address book safe to share between threads (see ConcurrentAddressBook)
+THREAD_SAFE = False
+# The number of most recent changes the change feed keeps; None turns the feed off
+CHANGE_FEED_SIZE = 100_000
+# The address the server sharing one address book between local clients listens on
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8765
 
 
 COMMANDS = {
@@ -30,16 +52,19 @@ COMMANDS = {
     'add_record': ['add'],
     'change_email': ['change_email'],
     'change_phone_number': ['change_phone'],
+    'export_changes': ['changes'],
     'days_to_birthday': ['when_birthday'],
     'exit': ['exit'],
     'find_records': ['find'],
     'get_all_records': ['all'],
     'get_birthdays_per_week': ['get_list'],
+    'import_contacts': ['import'],
     'load_from_file': ['load'],
     'remove_email': ['remove_email'],
     'remove_phone_number': ['remove_phone'],
     'remove_record': ['remove'],
     'save_to_file': ['save'],
+    'stats': ['stats'],
     'help': ['help']
 }
 
@@ -49,16 +74,19 @@ COMMAND_DESCRIPTIONS = {
     'add contact to AdressBook ': ['add'],
     'change an email ': ['change_email'],
     'change phone number': ['change_phone'],
+    'show contact changes since the last export': ['changes'],
     'return days until birthday': ['when_birthday'],
     'exit from AdressBook ': ['exit'],
     'find contact in AdressBook': ['find'],
     'display all contacts': ['all'],
     'return list of birthdays': ['get_list'],
+    'import contacts from a CSV or vCard file': ['import'],
     'load information about contacts from file': ['load'],
     'remove an email': ['remove_email'],
     'remove phone number': ['remove_phone'],
     'remove contact from AdressBook': ['remove'],
     'save information about contacts to file': ['save'],
+    'show command latencies and errors': ['stats'],
     'display help': ['help']
 }
 
@@ -0,0 +1,237 @@
+from contextlib import contextmanager
+from functools import wraps
+
+import threading
+
+from classess_ab import AddressBook
+
+
+class ReadWriteLock:
+    """
+    A reader/writer lock: any number of threads may read at once, while a
+    thread that writes excludes all others. Writers are preferred: once a
+    writer waits, new readers wait for it, so a stream of readers cannot
+    starve it. Both sides are reentrant and the writing thread may also
+    read, but a thread that reads cannot start writing, as two such threads
+    would wait for each other forever; it gets a RuntimeError instead.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    def acquire_read(self) -> None:
+        local = self._local
+        if getattr(local, 'reads', 0):
+            local.reads += 1
+            return
+        with self._condition:
+            if self._writer == threading.get_ident():
+                local.counted = False
+            else:
+                while self._writer is not None or self._waiting_writers:
+                    self._condition.wait()
+                self._readers += 1
+                local.counted = True
+        local.reads = 1
+
+    def release_read(self) -> None:
+        local = self._local
+        local.reads -= 1
+        if local.reads or not local.counted:
+            return
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            if getattr(self._local, 'reads', 0):
+                raise RuntimeError("A thread that holds the lock for reading cannot start writing")
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._condition.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._writer_depth = 1
+
+    def release_write(self) -> None:
+        with self._condition:
+            self._writer_depth -= 1
+            if not self._writer_depth:
+                self._writer = None
+                self._condition.notify_all()
+
+    @contextmanager
+    def reading(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def writing(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+def _reader(method: callable) -> callable:
+    """
+    Wraps an AddressBook method to run while holding the book's lock for reading.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        lock = self.lock
+        lock.acquire_read()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            lock.release_read()
+    return wrapper
+
+
+def _writer(method: callable) -> callable:
+    """
+    Wraps an AddressBook method to run while holding the book's lock for writing.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        lock = self.lock
+        lock.acquire_write()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            lock.release_write()
+    return wrapper
+
+
+class GuardedListener:
+    """
+    A record listener that also gives the Record mutators, as guard(), the
+    context they change the record in; see guarded_change.
+    """
+
+    def __init__(self, listener: callable, guard: callable):
+        self.listener = listener
+        self.guard = guard
+
+    def __call__(self, *args) -> None:
+        self.listener(*args)
+
+
+class ConcurrentAddressBook(AddressBook):
+    """
+    An address book that may be shared between threads. Queries hold its
+    reader/writer lock for reading, so they run at the same time, and
+    changes hold it for writing, so they run alone and queries never see a
+    half-made change. Iterating over the book and raw_items iterate over a
+    copy taken under the lock.
+    The Record mutators of the records in the book change the record and
+    update the indexes while holding the lock for writing, but a change
+    spanning several calls, such as reading a record and then changing it,
+    should hold the lock itself:
+        with book.lock.writing():
+            record = book.get_record_by_name(name)
+            record.add_phone_number(phone)
+    snapshot() returns a private copy for long reads, such as reports and
+    exports, that do not hold the lock while they run.
+    Records are built when they are added instead of on first access, as
+    building them would change the book while it is being read.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.lock = ReadWriteLock()
+        self._index_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def _make_record_listener(self) -> GuardedListener:
+        # The Record mutators take the lock for writing before they change the record
+        return GuardedListener(self._on_record_changed, self.lock.writing)
+
+    def snapshot(self) -> AddressBook:
+        """
+        Returns a plain, unshared AddressBook with copies of the records as
+        they are now. Its records are built from the copied fields when they
+        are first used, so taking a snapshot only copies the raw fields.
+        """
+        with self.lock.reading():
+            fields = dict(AddressBook.raw_items(self))
+        snapshot = AddressBook()
+        snapshot.add_raw_source(fields)
+        return snapshot
+
+    def _ensure_indexes(self) -> None:
+        # Deferred indexes are built by the first reader that needs them while the others wait
+        if not self._indexed:
+            with self._index_lock:
+                super()._ensure_indexes()
+
+    def _fuzzy_index(self):
+        # Built by the first reader that needs it while the others wait, like the deferred indexes
+        self._ensure_indexes()
+        if self._fuzzy_names is None:
+            with self._index_lock:
+                return super()._fuzzy_index()
+        return self._fuzzy_names
+
+    def _gram_indexes(self) -> tuple:
+        # Built by the first reader that needs them while the others wait, like the fuzzy index
+        self._ensure_indexes()
+        if self._name_grams is None:
+            with self._index_lock:
+                return super()._gram_indexes()
+        return self._name_grams, self._phone_grams
+
+    def accepts_raw_source(self) -> bool:
+        return False
+
+    def raw_items(self):
+        with self.lock.reading():
+            return iter(list(super().raw_items()))
+
+    def __iter__(self):
+        with self.lock.reading():
+            return iter(list(self.data.values()))
+
+    def iterator(self, n: int):
+        if n < 1:
+            raise ValueError(f"The chunk size must be at least 1, got {n}")
+        with self.lock.reading():
+            records = list(self.data.values())
+        return (records[start:start + n] for start in range(0, len(records), n))
+
+    __setitem__ = _writer(AddressBook.__setitem__)
+    __delitem__ = _writer(AddressBook.__delitem__)
+    __getitem__ = _reader(AddressBook.__getitem__)
+    __contains__ = _reader(AddressBook.__contains__)
+    __len__ = _reader(AddressBook.__len__)
+    __str__ = _reader(AddressBook.__str__)
+    add_record = _writer(AddressBook.add_record)
+    add_records = _writer(AddressBook.add_records)
+    remove_record = _writer(AddressBook.remove_record)
+    defer_indexes = _writer(AddressBook.defer_indexes)
+    _on_record_changed = _writer(AddressBook._on_record_changed)
+    has_name = _reader(AddressBook.has_name)
+    get_record_by_name = _reader(AddressBook.get_record_by_name)
+    get_records_by_phone = _reader(AddressBook.get_records_by_phone)
+    get_records_by_email = _reader(AddressBook.get_records_by_email)
+    find_records = _reader(AddressBook.find_records)
+    find_similar = _reader(AddressBook.find_similar)
+    get_all_records = _reader(AddressBook.get_all_records)
+    get_birthdays_per_week = _reader(AddressBook.get_birthdays_per_week)
+    get_upcoming_birthdays = _reader(AddressBook.get_upcoming_birthdays)
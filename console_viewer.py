@@ -0,0 +1,110 @@
+import shutil
+import sys
+
+from colorama import Fore
+from prompt_toolkit.completion import NestedCompleter
+from prompt_toolkit import prompt
+
+from commands import COMMANDS, COMMAND_DESCRIPTIONS
+from user_interfaces import RowCache, UserViewer
+
+
+class ConsoleUserViewer(UserViewer):
+    row_format = '{:<20} {:<30} {:<20} {:<20}'
+
+    def __init__(self, page_size: int = None):
+        super().__init__()
+        self.page_size = page_size
+        self.rows = RowCache(self.format_row)
+        # Built once; prompt_toolkit completes from it on every keystroke
+        self.completer = NestedCompleter.from_nested_dict({command[0]: None for command in COMMANDS.values()})
+
+    def display_contacts(self, contacts):
+        """
+        Prints the contacts page by page; the rows are formatted as they are printed.
+        """
+        self.page(self.iter_contact_lines(contacts))
+
+    def display_changes(self, added=(), changed=(), removed=()):
+        """
+        Prints only the rows of the contacts a command added, changed or removed,
+        marked with '+', '~' and '-' like a diff.
+        """
+        lines = [f'  {self.format_header()}']
+        lines.extend(f'+ {self.rows.row(record)}' for record in added)
+        lines.extend(f'~ {self.rows.row(record)}' for record in changed)
+        lines.extend(f'- {self.format_row(record)}' for record in removed)
+        print('\n'.join(lines))
+
+    def format_header(self):
+        return self.row_format.format('Name', 'Phone', 'Birthday', 'Email')
+
+    def format_row(self, record):
+        phones = ', '.join([f'{phone.value}' for phone in record.phones])
+        birthday_str = record.birthday.value if record.birthday else '-'
+        email_str = record.email.value if record.email else '-'
+        return self.row_format.format(record.name.value, phones, birthday_str, email_str)
+
+    def iter_contact_lines(self, contacts):
+        """
+        Yields the header and the rows of the contacts one at a time,
+        taking the rows of unchanged contacts from the row cache.
+        """
+        header = self.format_header()
+        yield header
+        yield '-' * len(header)
+        empty = True
+        for record in contacts:
+            empty = False
+            yield self.rows.row(record)
+        if empty:
+            yield "The address book is empty."
+
+    def format_contacts(self, contacts):
+        return '\n'.join(self.iter_contact_lines(contacts))
+
+    def page(self, lines):
+        """
+        Prints lines one screen at a time, asking before every next screen.
+        Output that does not go to a terminal is printed without stopping.
+        """
+        lines = iter(lines)
+        if not sys.stdout.isatty():
+            for line in lines:
+                print(line)
+            return
+        page_size = self.page_size or max(shutil.get_terminal_size().lines - 2, 1)
+        line = next(lines, None)
+        printed = 0
+        while line is not None:
+            print(line)
+            printed += 1
+            line = next(lines, None)
+            if line is not None and printed % page_size == 0:
+                if self.get_data_input('-- More -- (Enter: next page, q: quit) ').strip().lower() == 'q':
+                    return
+
+    def display_commands(self):
+        print(Fore.GREEN, "Available commands:")
+        separator = '|----------------------|--------------------------------------------|'
+        print(separator, f'\n|  Commands            |  Description {" ":30}|\n', separator, sep='')
+        for description, commands in COMMAND_DESCRIPTIONS.items():
+            print(f"| {Fore.WHITE} {', '.join(commands):<20}{Fore.GREEN}| {description:<43}|")
+        print(separator, '\n')
+
+    def get_user_input(self):
+        """
+        Returns the entered line with its command lowercased; the argument is
+        passed through as typed, as file paths are case-sensitive.
+        """
+        command, _, argument = prompt('>>>', completer=self.completer, lexer=None).strip().partition(' ')
+        return f'{command.lower()} {argument}'.rstrip()
+
+    def get_data_input(self, prompt):
+        return input(prompt)
+
+    def display_message(self, message):
+        print(message)
+
+    def display_error(self, message):
+        print(message)
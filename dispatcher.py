@@ -0,0 +1,59 @@
+class CommandDispatcher:
+    """
+    Resolves user input to a command handler through a prefix trie over the
+    command aliases, built once. One walk over the input finds the longest
+    alias followed by a space or by the end of the input, so resolving does
+    not depend on the number of aliases, and gives the argument after it.
+    Aliases are matched ignoring case and may contain spaces.
+    """
+
+    def __init__(self):
+        self._root = {}
+        self.aliases = []
+
+    @classmethod
+    def from_commands(cls, commands: dict, target) -> 'CommandDispatcher':
+        """
+        Builds a dispatcher that resolves the aliases of every command
+        in 'commands' to the method 'handle_<command>' of 'target'.
+        """
+        dispatcher = cls()
+        for command, aliases in commands.items():
+            handler = getattr(target, f'handle_{command}')
+            for alias in aliases:
+                dispatcher.add(alias, handler)
+        return dispatcher
+
+    def add(self, alias: str, handler: callable) -> None:
+        """
+        Registers a handler under an alias, replacing the handler registered before under the same alias.
+        """
+        node = self._root
+        for char in alias.lower():
+            node = node.setdefault(char, {})
+        if None not in node:
+            self.aliases.append(alias)
+        node[None] = handler
+
+    def resolve(self, user_input: str) -> tuple | None:
+        """
+        Returns (handler, argument) for the longest alias the input starts with,
+        or None if it starts with none of them. The argument is the rest of the
+        input after the alias and a space, stripped.
+        """
+        node = self._root
+        match = None
+        lowered = user_input.lower()
+        for index, char in enumerate(lowered):
+            if char == ' ' and None in node:
+                match = index, node[None]
+            node = node.get(char)
+            if node is None:
+                break
+        else:
+            if None in node:
+                match = len(lowered), node[None]
+        if match is None:
+            return None
+        end, handler = match
+        return handler, user_input[end + 1:].strip()
@@ -0,0 +1,187 @@
+import tkinter as tk
+from tkinter import simpledialog, ttk
+
+from commands import COMMAND_DESCRIPTIONS
+from user_interfaces import ContactListModel, RowCache, UserViewer
+
+
+class GuiUserViewer(UserViewer):
+    def __init__(self):
+        super().__init__()
+        self.window = tk.Tk()
+        screen_width = self.window.winfo_screenwidth()
+        screen_height = self.window.winfo_screenheight()
+        self.window.title("Address Book")
+        self.window.geometry(f"{screen_width // 2}x{screen_height // 2}+0+0")
+        self.command_text = tk.Text(self.window, wrap=tk.WORD, width=65, height=22)
+        self.command_text.pack()
+
+        self.contacts_window = tk.Toplevel(self.window)
+        self.contacts_window.title("Contacts Window")
+        self.contacts_window.geometry(f"{screen_width // 2}x{screen_height // 2}+{screen_width - screen_width // 2}+0")
+        self.contacts_model = ContactListModel(self.row_values)
+        self.rows = RowCache(self.format_values)
+        self._contacts_offset = 0
+        self._hide_contacts_job = None
+        self.contacts_filter = tk.StringVar()
+        self.contacts_filter.trace_add('write', lambda *_: self._filter_contacts())
+        tk.Entry(self.contacts_window, textvariable=self.contacts_filter).pack(fill=tk.X)
+        self.contacts_tree = ttk.Treeview(self.contacts_window, columns=ContactListModel.columns,
+                                          show='headings', height=30, selectmode='none')
+        for column, title, width in zip(ContactListModel.columns, ('Name', 'Phone', 'Birthday', 'Email'),
+                                        (160, 240, 100, 200)):
+            self.contacts_tree.heading(column, text=title, command=lambda column=column: self._sort_contacts(column))
+            self.contacts_tree.column(column, width=width)
+        self.contacts_tree.tag_configure('+', background='#dff0d8')
+        self.contacts_tree.tag_configure('~', background='#fcf8e3')
+        self.contacts_tree.tag_configure('-', background='#f2dede')
+        self.contacts_scrollbar = ttk.Scrollbar(self.contacts_window, orient=tk.VERTICAL, command=self._scroll_contacts)
+        self.contacts_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.contacts_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.contacts_tree.bind('<MouseWheel>', lambda event: self._scroll_contacts(
+            'scroll', -1 if event.delta > 0 else 1, 'units'))
+        self.contacts_tree.bind('<Button-4>', lambda event: self._scroll_contacts('scroll', -1, 'units'))
+        self.contacts_tree.bind('<Button-5>', lambda event: self._scroll_contacts('scroll', 1, 'units'))
+        self.contacts_window.withdraw()
+
+        self.message_window = tk.Toplevel(self.window)
+        self.message_window.geometry(
+            f"{screen_width // 3}x{screen_height // 10}+{(screen_width - screen_width // 3) // 2}"
+            f"+{(screen_height + screen_height // 10) // 2}")
+        custom_font = ("Helvetica", 13)
+        self.message_label = tk.Label(self.message_window, text="", width=50, height=5, font=custom_font,
+                                      wraplength=380)
+        self.message_label.pack()
+        self.message_window.withdraw()
+
+    def display_contacts(self, contacts):
+        """
+        Shows the contacts in the list view. Only the rows in the visible
+        window are put into the widget, which is reused by every call.
+        """
+        self.contacts_model.set_records(contacts)
+        self._show_contacts()
+
+    def display_changes(self, added=(), changed=(), removed=()):
+        """
+        Shows only the contacts a command added, changed or removed, with their rows highlighted.
+        """
+        marks = {id(record): mark for mark, records in (('+', added), ('~', changed), ('-', removed))
+                 for record in records}
+        self.contacts_model.set_records([*added, *changed, *removed], marks)
+        self._show_contacts()
+
+    def format_values(self, record):
+        phones = ', '.join([f'{phone.value}' for phone in record.phones])
+        birthday_str = record.birthday.value if record.birthday else '-'
+        email_str = record.email.value if record.email else '-'
+        return record.name.value, phones, birthday_str, email_str
+
+    def row_values(self, record):
+        """
+        Returns the column values of a record; the ones of unchanged records come from the row cache.
+        """
+        return self.rows.row(record)
+
+    def _show_contacts(self):
+        self._contacts_offset = 0
+        self._render_contacts()
+        self.contacts_window.deiconify()
+        self._schedule_contacts_hiding()
+
+    def _schedule_contacts_hiding(self):
+        """
+        Hides the contacts window 10 seconds after it was last shown or used,
+        replacing the hiding scheduled before.
+        """
+        if self._hide_contacts_job is not None:
+            self.window.after_cancel(self._hide_contacts_job)
+        self._hide_contacts_job = self.window.after(10000, self._hide_contacts)
+
+    def _hide_contacts(self):
+        self._hide_contacts_job = None
+        self.contacts_window.withdraw()
+
+    def _render_contacts(self):
+        """
+        Fills the rows of the visible window, reusing the existing tree items,
+        and moves the scrollbar to match.
+        """
+        total = len(self.contacts_model)
+        height = int(self.contacts_tree.cget('height'))
+        self._contacts_offset = max(0, min(self._contacts_offset, total - height))
+        rows = self.contacts_model.rows(self._contacts_offset, height)
+        if not rows:
+            empty = "No contacts match the filter." if self.contacts_model.query else "The address book is empty."
+            rows = [((empty, '', '', ''), '')]
+        items = self.contacts_tree.get_children()
+        for item in items[len(rows):]:
+            self.contacts_tree.delete(item)
+        for index, (values, mark) in enumerate(rows):
+            tags = (mark,) if mark else ()
+            if index < len(items):
+                self.contacts_tree.item(items[index], values=values, tags=tags)
+            else:
+                self.contacts_tree.insert('', tk.END, values=values, tags=tags)
+        if total:
+            self.contacts_scrollbar.set(self._contacts_offset / total, min(1.0, (self._contacts_offset + height) / total))
+        else:
+            self.contacts_scrollbar.set(0.0, 1.0)
+
+    def _scroll_contacts(self, action, amount, unit=None):
+        """
+        Moves the visible window for the scrollbar and the mouse wheel.
+        """
+        height = int(self.contacts_tree.cget('height'))
+        if action == 'moveto':
+            self._contacts_offset = int(float(amount) * len(self.contacts_model))
+        elif action == 'scroll':
+            self._contacts_offset += int(amount) * (height if unit == 'pages' else 1)
+        self._render_contacts()
+        self._schedule_contacts_hiding()
+
+    def _filter_contacts(self):
+        self.contacts_model.filter(self.contacts_filter.get())
+        self._contacts_offset = 0
+        self._render_contacts()
+        self._schedule_contacts_hiding()
+
+    def _sort_contacts(self, column):
+        self.contacts_model.sort(column)
+        self._contacts_offset = 0
+        self._render_contacts()
+        self._schedule_contacts_hiding()
+
+    def display_commands(self):
+        self.command_text.delete(1.0, tk.END)
+        separator = '|------------------|--------------------------------------------|\n'
+        self.command_text.insert(tk.END, separator)
+        self.command_text.insert(tk.END, f'\n|  Commands        |  Description {" ":30}|\n')
+        self.command_text.insert(tk.END, separator)
+        for description, commands in COMMAND_DESCRIPTIONS.items():
+            self.command_text.insert(tk.END, f"| {', '.join(commands):<17}| {description:<43}|\n")
+        self.command_text.insert(tk.END, separator)
+
+    def get_user_input(self):
+        self.window.deiconify()
+        self.command_text.pack()
+        user_input = tk.simpledialog.askstring("User Input", "Enter a command:")
+        return user_input
+
+    def get_data_input(self, prompt):
+        self.command_text.forget()
+        self.window.withdraw()
+        data_input = simpledialog.askstring("Data Input", prompt)
+        return data_input
+
+    def display_message(self, message):
+        self.message_window.deiconify()
+        self.message_label.config(text=message)
+        self.window.after(7000, self.message_window.withdraw)
+        return message
+
+    def display_error(self, message):
+        self.message_window.deiconify()
+        self.message_label.config(text=message)
+        self.window.after(7000, self.message_window.withdraw)
+        return message
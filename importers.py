@@ -0,0 +1,258 @@
+from itertools import islice
+from pathlib import Path
+
+import csv
+import re
+import time
+
+from classess_ab import AddressBook, Phone, Record, fold_name
+from validators import validate_many
+
+CSV_COLUMNS = {
+    'name': 'name', 'fullname': 'name', 'contact': 'name', 'contactname': 'name',
+    'firstname': 'first_name', 'givenname': 'first_name',
+    'lastname': 'last_name', 'surname': 'last_name', 'familyname': 'last_name',
+    'phone': 'phones', 'phones': 'phones', 'phonenumber': 'phones', 'mobile': 'phones',
+    'mobilephone': 'phones', 'tel': 'phones', 'telephone': 'phones',
+    'email': 'email', 'emailaddress': 'email', 'mail': 'email',
+    'birthday': 'birthday', 'birthdate': 'birthday', 'dateofbirth': 'birthday', 'dob': 'birthday', 'bday': 'birthday',
+}
+REJECTED_COLUMNS = ['row', 'name', 'phones', 'email', 'birthday', 'errors']
+PHONE_SEPARATORS = re.compile(r'[;,]')
+PHONE_PUNCTUATION = re.compile(r'[\s().-]')
+ISO_DATE = re.compile(r'(\d{4})-?(\d{2})-?(\d{2})')
+
+
+def normalize_import_phone(phone: str) -> str:
+    """
+    Removes the spaces, dots, dashes and brackets exports put into phone numbers.
+    """
+    return PHONE_PUNCTUATION.sub('', phone)
+
+
+def normalize_import_birthday(birthday: str) -> str | None:
+    """
+    Brings an ISO date (yyyy-mm-dd or yyyymmdd), which exports and vCards use,
+    to the 'dd.mm.yyyy' format. Other values are returned as they are.
+    """
+    birthday = birthday.strip()
+    if not birthday:
+        return None
+    match = ISO_DATE.fullmatch(birthday)
+    if match:
+        year, month, day = match.groups()
+        return f'{day}.{month}.{year}'
+    return birthday
+
+
+def read_csv_contacts(file):
+    """
+    Yields (row number, name, phones, email, birthday) for every row of a CSV
+    file with a header. Columns are recognized by common header names in any
+    case and spacing; a name may also be split into first and last name
+    columns, and several phones may share one column separated by ';' or ','.
+    """
+    reader = csv.reader(file)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = [CSV_COLUMNS.get(re.sub(r'[\s_-]', '', column.lower())) for column in header]
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        fields = {}
+        for column, cell in zip(columns, row):
+            if column is not None and cell.strip():
+                fields[column] = cell.strip()
+        name = fields.get('name') or ' '.join(
+            part for part in (fields.get('first_name'), fields.get('last_name')) if part) or None
+        phones = [normalize_import_phone(phone) for phone in PHONE_SEPARATORS.split(fields.get('phones', ''))
+                  if phone.strip()]
+        yield (reader.line_num, name, phones, fields.get('email'),
+               normalize_import_birthday(fields.get('birthday', '')))
+
+
+def _vcard_lines(file):
+    """
+    Yields the logical lines of a vCard file with their line numbers,
+    joining the folded continuation lines.
+    """
+    line_number, current = 0, None
+    for number, line in enumerate(file, 1):
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield line_number, current
+        line_number, current = number, line
+    if current is not None:
+        yield line_number, current
+
+
+def _vcard_value(value: str) -> str:
+    return value.replace('\\,', ',').replace('\\;', ';').replace('\\n', ' ').replace('\\\\', '\\').strip()
+
+
+def read_vcards(file):
+    """
+    Yields (line number, name, phones, email, birthday) for every card of a
+    vCard file. The name is taken from FN or, without it, from N; every TEL is
+    a phone, the first EMAIL is the email and BDAY is the birthday.
+    """
+    card = None
+    for line_number, line in _vcard_lines(file):
+        key, _, value = line.partition(':')
+        prop = key.split(';')[0].split('.')[-1].upper()
+        if prop == 'BEGIN' and value.strip().upper() == 'VCARD':
+            card = {'line': line_number, 'phones': []}
+        elif card is None:
+            continue
+        elif prop == 'END':
+            name = card.get('fn')
+            if not name and card.get('n'):
+                last, first = (card['n'].split(';') + ['', ''])[:2]
+                name = ' '.join(_vcard_value(part) for part in (first, last) if part.strip()) or None
+            yield card['line'], name, card['phones'], card.get('email'), normalize_import_birthday(
+                card.get('bday', ''))
+            card = None
+        elif prop == 'FN':
+            card['fn'] = _vcard_value(value) or None
+        elif prop == 'N':
+            card['n'] = value
+        elif prop == 'TEL':
+            phone = normalize_import_phone(_vcard_value(value).removeprefix('tel:'))
+            if phone:
+                card['phones'].append(phone)
+        elif prop == 'EMAIL' and 'email' not in card:
+            card['email'] = _vcard_value(value) or None
+        elif prop == 'BDAY':
+            card['bday'] = _vcard_value(value)
+
+
+class ImportStats:
+    """
+    Statistics of importing contacts from a file.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.rejected = 0
+        self.seconds = 0.0
+        self.rejected_path = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        result = (f"Imported {self.imported} of {self.rows} row(s) in {self.seconds:.2f} s "
+                  f"({self.rows_per_second:.0f} rows/s)")
+        if self.rejected:
+            result += f", {self.rejected} rejected row(s) written to {self.rejected_path}"
+        return result
+
+
+class ContactImporter:
+    """
+    Imports contacts from CSV and vCard files into an address book.
+    The file is read in batches of 'batch_size' rows; every batch is validated
+    in one pass and its valid records are added at once through
+    AddressBook.add_records, without printing anything per record.
+    Rows that cannot be imported are written, with the reasons, to a CSV file
+    next to the imported one, which can be fixed and imported again; an
+    import that rejects nothing removes the file left by an earlier one.
+    A row whose name is already in the book, ignoring case, is rejected.
+    Args:
+        address_book: The address book to import the contacts into.
+        batch_size: The number of rows validated and added at once.
+    """
+
+    readers = {'.csv': read_csv_contacts, '.vcf': read_vcards, '.vcard': read_vcards}
+
+    def __init__(self, address_book: AddressBook, batch_size: int = 10000):
+        self.address_book = address_book
+        self.batch_size = batch_size
+
+    def import_file(self, file_name: str) -> ImportStats:
+        """
+        Imports the contacts of a file, choosing the format by its extension.
+        Returns the statistics of the import.
+        """
+        path = Path(file_name)
+        reader = self.readers.get(path.suffix.lower())
+        if reader is None:
+            raise ValueError(f"Unsupported file format {path.suffix}, expected one of {', '.join(self.readers)}")
+        stats = ImportStats()
+        stats.rejected_path = path.with_name(f'{path.stem}.rejected.csv')
+        started = time.perf_counter()
+        names = {fold_name(name) for name, _ in self.address_book.raw_items()}
+        rejected_file = None
+        try:
+            with open(path, 'r', encoding='utf-8-sig', newline='') as file:
+                rows = reader(file)
+                while True:
+                    batch = list(islice(rows, self.batch_size))
+                    if not batch:
+                        break
+                    records, rejected = self._validate_batch(batch, names)
+                    self.address_book.add_records(records)
+                    stats.rows += len(batch)
+                    stats.imported += len(records)
+                    stats.rejected += len(rejected)
+                    if rejected:
+                        if rejected_file is None:
+                            rejected_file = open(stats.rejected_path, 'w', encoding='utf-8', newline='')
+                            rejected_writer = csv.writer(rejected_file)
+                            rejected_writer.writerow(REJECTED_COLUMNS)
+                        rejected_writer.writerows(rejected)
+        finally:
+            if rejected_file is not None:
+                rejected_file.close()
+            stats.seconds = time.perf_counter() - started
+        if not stats.rejected:
+            # The rejected rows of an earlier import of the file no longer apply
+            stats.rejected_path.unlink(missing_ok=True)
+        return stats
+
+    @staticmethod
+    def _validate_batch(batch: list, names: set) -> tuple:
+        """
+        Validates a batch of rows column by column and builds the records of
+        the valid rows. Returns the valid records by name and the rejected rows
+        in the columns of the rejected-rows file.
+        'names' holds the folded names already taken and gets the new ones.
+        """
+        phone_rows, phones_column = [], []
+        for position, row in enumerate(batch):
+            phone_rows.extend([position] * len(row[2]))
+            phones_column.extend(row[2])
+        invalid_phones = {phone_rows[index] for index in validate_many('phone', phones_column)}
+        invalid_names = set(validate_many('name', [row[1] for row in batch]))
+        invalid_birthdays = set(validate_many('birthday', [row[4] for row in batch]))
+        invalid_emails = set(validate_many('email', [row[3] for row in batch]))
+        records, rejected = {}, []
+        for position, (row_number, name, phones, email, birthday) in enumerate(batch):
+            errors = []
+            if position in invalid_phones:
+                errors.append("Phone numbers are not valid.")
+            if not name:
+                errors.append("Name is missing.")
+            elif position in invalid_names:
+                errors.append("Name is not valid.")
+            elif fold_name(name) in names:
+                errors.append("A contact with that name already exists.")
+            if position in invalid_birthdays:
+                errors.append("Date of birth is not valid.")
+            if position in invalid_emails:
+                errors.append("Email is not valid.")
+            if errors:
+                rejected.append([row_number, name or '', '; '.join(phones), email or '', birthday or '',
+                                 ' '.join(errors)])
+                continue
+            record = Record(name, None, birthday, email)
+            record.phones = [Phone(phone) for phone in dict.fromkeys(phones)]
+            records[name] = record
+            names.add(fold_name(name))
+        return records, rejected
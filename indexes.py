@@ -0,0 +1,312 @@
+from datetime import date, timedelta
+
+import calendar
+
+
+class NgramIndex:
+    """
+    An inverted index from n-grams to the keys whose texts contain them.
+    Used for substring search: the posting lists of the query's n-grams are
+    intersected to get candidates, which are then verified against the texts.
+    The texts themselves are not kept, so the index holds only the posting
+    lists: removing a text takes the other texts of its key, and searching
+    takes a function that returns the texts of a key.
+    Args:
+        n: The length of the indexed grams.
+    """
+
+    def __init__(self, n: int = 3):
+        self.n = n
+        self._postings = {}
+
+    def _grams(self, text: str) -> set:
+        """
+        Returns the set of n-grams of a text. Texts shorter than n are
+        indexed as a single gram.
+        """
+        if len(text) < self.n:
+            return {text} if text else set()
+        return {text[i:i + self.n] for i in range(len(text) - self.n + 1)}
+
+    def add(self, key: str, text: str) -> None:
+        """
+        Indexes a text under the given key. A key may own several texts.
+        """
+        for gram in self._grams(text):
+            keys = self._postings.get(gram)
+            if keys is None:
+                self._postings[gram] = {key}
+            else:
+                keys.add(key)
+
+    def remove(self, key: str, text: str, others=()) -> None:
+        """
+        Removes a text previously indexed under the given key. 'others' are
+        the texts the key still owns, whose n-grams stay indexed.
+        """
+        remaining_grams = set()
+        for other_text in others:
+            remaining_grams |= self._grams(other_text)
+        for gram in self._grams(text) - remaining_grams:
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+
+    def search(self, query: str, texts: callable) -> set:
+        """
+        Returns the keys owning at least one text that contains the query.
+        'texts' returns the texts of a key, to verify the candidates with.
+        """
+        if not query:
+            return set()
+        if len(query) < self.n:
+            # Every text containing a query shorter than n has a gram containing it
+            candidates = set()
+            for gram, keys in self._postings.items():
+                if query in gram:
+                    candidates |= keys
+            return candidates
+        posting_lists = []
+        for gram in self._grams(query):
+            keys = self._postings.get(gram)
+            if not keys:
+                return set()
+            posting_lists.append(keys)
+        posting_lists.sort(key=len)
+        candidates = set(posting_lists[0])
+        for keys in posting_lists[1:]:
+            candidates &= keys
+            if not candidates:
+                return candidates
+        return {key for key in candidates if any(query in text for text in texts(key))}
+
+
+def edit_distance(first: str, second: str, max_distance: int) -> int:
+    """
+    Returns the Levenshtein distance between two strings, or max_distance + 1
+    as soon as it is known to exceed max_distance.
+    """
+    if abs(len(first) - len(second)) > max_distance:
+        return max_distance + 1
+    if len(first) > len(second):
+        first, second = second, first
+    previous = list(range(len(first) + 1))
+    for row, char in enumerate(second, 1):
+        current = [row]
+        for column, other in enumerate(first, 1):
+            current.append(min(previous[column] + 1, current[column - 1] + 1,
+                               previous[column - 1] + (char != other)))
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return min(previous[-1], max_distance + 1)
+
+
+class DeleteIndex:
+    """
+    A symmetric-delete index for fuzzy search of the words of texts: every
+    word is indexed under the strings left after deleting up to
+    'max_distance' characters from its first 'prefix' characters. Two words
+    within that edit distance share such a string, so the candidates of a
+    query word are found by looking up its own deletes, and only they are
+    compared with it, however many words are indexed.
+    Args:
+        max_distance: The largest edit distance a search may ask for.
+        prefix: The number of leading characters of a word deletes are made from.
+    """
+
+    def __init__(self, max_distance: int = 2, prefix: int = 7):
+        self.max_distance = max_distance
+        self.prefix = prefix
+        self._deletes = {}
+        self._words = {}
+        self._texts = {}
+
+    def _variants(self, word: str, max_distance: int) -> dict:
+        """
+        Returns the strings left after deleting up to max_distance characters
+        from the prefix of a word, with the fewest deletes that leave each.
+        """
+        frontier = {word[:self.prefix]}
+        variants = dict.fromkeys(frontier, 0)
+        for deletes in range(1, max_distance + 1):
+            frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+            for variant in frontier:
+                variants.setdefault(variant, deletes)
+        return variants
+
+    def add(self, key: str, text: str) -> None:
+        """
+        Indexes the words of a text under the given key. A key may own several texts.
+        """
+        texts = self._texts.setdefault(key, [])
+        texts.append(text)
+        for word in set(text.split()):
+            keys = self._words.get(word)
+            if keys is None:
+                keys = self._words[word] = set()
+                for variant, deletes in self._variants(word, self.max_distance).items():
+                    words = self._deletes.get(variant)
+                    if words is None:
+                        self._deletes[variant] = {word: deletes}
+                    else:
+                        words[word] = deletes
+            keys.add(key)
+
+    def remove(self, key: str, text: str) -> None:
+        """
+        Removes a text previously indexed under the given key.
+        """
+        texts = self._texts.get(key)
+        if texts is None or text not in texts:
+            return
+        texts.remove(text)
+        remaining_words = {word for other_text in texts for word in other_text.split()}
+        for word in set(text.split()) - remaining_words:
+            keys = self._words.get(word)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if keys:
+                continue
+            del self._words[word]
+            for variant in self._variants(word, self.max_distance):
+                words = self._deletes.get(variant)
+                if words is not None:
+                    words.pop(word, None)
+                    if not words:
+                        del self._deletes[variant]
+        if not texts:
+            del self._texts[key]
+
+    def similar_words(self, word: str, max_distance: int) -> dict:
+        """
+        Returns the indexed words within max_distance edits of a word, with their distances.
+        """
+        candidates = set()
+        for variant in self._variants(word, max_distance):
+            words = self._deletes.get(variant)
+            if not words:
+                continue
+            if max_distance < self.max_distance:
+                # A word more than max_distance deletes away from the variant cannot be within max_distance edits
+                candidates.update(other for other, deletes in words.items() if deletes <= max_distance)
+            else:
+                candidates.update(words)
+        result = {}
+        for candidate in candidates:
+            distance = edit_distance(word, candidate, max_distance)
+            if distance <= max_distance:
+                result[candidate] = distance
+        return result
+
+    def search(self, query: str, max_distance: int) -> dict:
+        """
+        Returns the keys owning a text in which every word of the query is
+        within max_distance edits of some word, with the sum of those distances.
+        Raises ValueError if max_distance is above the one the index was built for.
+        """
+        if not 0 <= max_distance <= self.max_distance:
+            raise ValueError(f"The edit distance must be between 0 and {self.max_distance}")
+        matches = [self.similar_words(word, max_distance) for word in query.split()]
+        if not matches or not all(matches):
+            return {}
+        # Start from the query word matching the fewest keys and only check those keys against the other words
+        matches.sort(key=lambda words: sum(len(self._words[word]) for word in words))
+        result = {}
+        for word, distance in matches[0].items():
+            for key in self._words[word]:
+                if distance < result.get(key, max_distance + 1):
+                    result[key] = distance
+        for words in matches[1:]:
+            narrowed = {}
+            for key, total in result.items():
+                distance = min((words[word] for text in self._texts[key] for word in text.split() if word in words),
+                               default=None)
+                if distance is not None:
+                    narrowed[key] = total + distance
+            result = narrowed
+        return result
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+
+def birthday_month_day(birthday: str) -> tuple:
+    """
+    Extracts (month, day) from a birthday in 'dd.mm.yyyy' format without parsing the whole date.
+    """
+    day, month, _ = birthday.split('.')
+    return int(month), int(day)
+
+
+def birthday_keys(day: date) -> list:
+    """
+    Returns the (month, day) pairs of the birthdays celebrated on the given date.
+    """
+    keys = [(day.month, day.day)]
+    if day.month == 2 and day.day == 28 and not calendar.isleap(day.year):
+        keys.append((2, 29))
+    return keys
+
+
+def celebration_date(month: int, day: int, year: int) -> date:
+    """
+    Returns the date a birthday is celebrated in the given year.
+    Birthdays on February 29 are celebrated on February 28 in non-leap years.
+    """
+    if month == 2 and day == 29 and not calendar.isleap(year):
+        day = 28
+    return date(year, month, day)
+
+
+class BirthdayIndex:
+    """
+    An index of keys bucketed by the (month, day) of their birthdays.
+    Queries cost proportional to the number of matching keys, not to the number of indexed ones.
+    """
+
+    def __init__(self):
+        self._buckets = {}
+
+    def add(self, key: str, birthday: str) -> None:
+        """
+        Indexes the birthday of the given key.
+        """
+        self._buckets.setdefault(birthday_month_day(birthday), set()).add(key)
+
+    def remove(self, key: str, birthday: str) -> None:
+        """
+        Removes the birthday of the given key from the index.
+        """
+        month_day = birthday_month_day(birthday)
+        keys = self._buckets.get(month_day)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._buckets[month_day]
+
+    def on_date(self, day: date) -> set:
+        """
+        Returns the keys celebrating their birthday on the given date.
+        """
+        keys = set()
+        for month_day in birthday_keys(day):
+            keys |= self._buckets.get(month_day, set())
+        return keys
+
+    def upcoming(self, start: date, days: int) -> dict:
+        """
+        Returns the keys celebrating their birthday during the given number
+        of days beginning with the start date, grouped by date.
+        Dates without birthdays are omitted.
+        """
+        result = {}
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            keys = self.on_date(day)
+            if keys:
+                result[day] = keys
+        return result
@@ -0,0 +1,319 @@
+from functools import partial
+from pathlib import Path
+
+import json
+import os
+import threading
+import time
+
+from classess_ab import AddressBook, AddressBookFileHandler, AddressBookLoadError, LoadStats
+
+
+def apply_entry(address_book: AddressBook, entry: dict) -> None:
+    """
+    Replays one journal entry on an address book.
+    """
+    op = entry.get('op')
+    if op == 'add':
+        record = AddressBookFileHandler._deserialize_record(entry['record'])
+        if record is not None:
+            address_book.add_record(record)
+        return
+    if op == 'remove':
+        address_book.remove_record(entry['name'])
+        return
+    record = address_book.get_record_by_name(entry['name'])
+    if op != 'change' or record is None:
+        return
+    field, old_value, new_value = entry['field'], entry['old'], entry['new']
+    if field == 'phones':
+        if old_value is None:
+            record.add_phone_number(new_value)
+        elif new_value is None:
+            record.remove_phone_number(old_value)
+        else:
+            record.change_phone_number(old_value, new_value)
+    elif field == 'email':
+        if new_value is None:
+            record.remove_email(old_value)
+        elif old_value is None:
+            record.add_email(new_value)
+        else:
+            record.change_email(old_value, new_value)
+    elif field == 'birthday':
+        record.set_birthday(new_value)
+
+
+class JournalFileHandler(AddressBookFileHandler):
+    """
+    A file handler that persists an AddressBook as a snapshot plus an
+    append-only journal of changes, so saving costs proportional to the
+    number of changes instead of the size of the book.
+
+    Every change of the attached book becomes one compact, sequence-numbered
+    journal entry; save_to_file appends the pending entries to the journal.
+    Once the journal grows past 'compact_after' entries it is rotated and a
+    background thread folds the rotated segments into a new snapshot.
+    Loading reads the snapshot and replays the journal entries newer than it.
+    While there is no snapshot yet, the regular JSON file is used as the base.
+
+    Files next to 'file_name':
+        <file_name>.snapshot - one JSON line with the last included sequence
+                               number, followed by one JSON line per record;
+        <file_name>.journal.<seq> - rotated journal segments being compacted;
+        <file_name>.journal - the current journal, one JSON line per change.
+    Args:
+        file_name (str): The name of the regular JSON file of the address book.
+        compact_after (int): The number of journal entries that triggers a compaction.
+        lazy (bool): Whether loading lets the address book build the records on first access.
+    """
+
+    # save_to_file appends the changes of the attached book, so it needs the book itself
+    saves_copies = False
+
+    def __init__(self, file_name: str, compact_after: int = 10000, lazy: bool = True):
+        super().__init__(file_name, lazy)
+        self.snapshot_path = Path(f'{file_name}.snapshot')
+        self.journal_path = Path(f'{file_name}.journal')
+        self.compact_after = compact_after
+        self._address_book = None
+        self._pending = []
+        self._seq = 0
+        self._journal_entries = 0
+        self._compaction = None
+
+    def attach(self, address_book: AddressBook) -> None:
+        """
+        Starts journaling the changes of the given address book.
+        """
+        if self._address_book is address_book:
+            return
+        if self._address_book is not None:
+            self._address_book.unsubscribe(self._on_change)
+        self._address_book = address_book
+        address_book.subscribe(self._on_change)
+
+    def detach(self) -> None:
+        """
+        Stops journaling the changes of the attached address book, if any.
+        """
+        if self._address_book is not None:
+            self._address_book.unsubscribe(self._on_change)
+            self._address_book = None
+
+    def _on_change(self, action: str, name: str, field: str | None, old_value, new_value) -> None:
+        """
+        Turns a change of the attached book into a pending journal entry.
+        """
+        self._seq += 1
+        if action == 'add':
+            entry = {'seq': self._seq, 'op': 'add', 'record': self._serialize_record(new_value)}
+        elif action == 'remove':
+            entry = {'seq': self._seq, 'op': 'remove', 'name': name}
+        else:
+            entry = {'seq': self._seq, 'op': 'change', 'name': name, 'field': field,
+                     'old': old_value, 'new': new_value}
+        self._pending.append(json.dumps(entry, separators=(',', ':')))
+
+    def save_to_file(self, address_book: AddressBook) -> None:
+        """
+        Appends the pending changes to the journal. A book that was not loaded
+        through this handler is written as a new snapshot and attached.
+        """
+        if self._address_book is not address_book:
+            self.wait_for_compaction()
+            self._write_snapshot(address_book, self._seq)
+            for segment in self._segments() + [self.journal_path]:
+                segment.unlink(missing_ok=True)
+            self._pending.clear()
+            self._journal_entries = 0
+            self.attach(address_book)
+            return
+        if self._pending:
+            with open(self.journal_path, 'a') as file:
+                file.write('\n'.join(self._pending) + '\n')
+                file.flush()
+                os.fsync(file.fileno())
+            self._journal_entries += len(self._pending)
+            self._pending.clear()
+        if self._journal_entries >= self.compact_after and not self.is_compacting():
+            self.compact()
+
+    def load_from_file(self, address_book: AddressBook = None, on_error: str = 'skip',
+                       progress: callable = None) -> AddressBook:
+        """
+        Loads the snapshot, replays the newer journal entries and attaches
+        the address book, so that its further changes are journaled.
+        The book is detached while it is loaded, so the loaded records are not
+        journaled again; the unsaved changes of a previously attached other
+        book are dropped. The statistics of loading the snapshot, or the
+        regular JSON file without one, are kept in 'last_load_stats'; see
+        AddressBookFileHandler.load_stream for 'on_error' and 'progress'.
+        """
+        addressbook = address_book if address_book is not None else AddressBook()
+        self.wait_for_compaction()
+        if self._address_book is not addressbook:
+            self._pending.clear()
+        self.detach()
+        started = time.perf_counter()
+        try:
+            snapshot_seq, stats = self._load_base(addressbook, on_error, progress)
+        except AddressBookLoadError as error:
+            self.last_load_stats = error.stats
+            raise
+        self.last_load_stats = stats
+        last_seq, replayed = self._replay(addressbook, self._segments() + [self.journal_path], snapshot_seq)
+        stats.seconds = time.perf_counter() - started
+        self._seq = max(self._seq, last_seq)
+        self._journal_entries = replayed
+        self.attach(addressbook)
+        return addressbook
+
+    def compact(self) -> None:
+        """
+        Rotates the journal and folds the rotated segments into a new snapshot
+        in a background thread.
+        """
+        self.wait_for_compaction()
+        if self.journal_path.exists():
+            os.replace(self.journal_path, f'{self.journal_path}.{self._seq}')
+        self._journal_entries = 0
+        segments = self._segments()
+        self._compaction = threading.Thread(target=self._compact_segments, args=(segments,),
+                                            name='address-book-compaction')
+        self._compaction.start()
+
+    def is_compacting(self) -> bool:
+        """
+        Checks whether a background compaction is running.
+        """
+        return self._compaction is not None and self._compaction.is_alive()
+
+    def wait_for_compaction(self) -> None:
+        """
+        Blocks until the running background compaction, if any, is finished.
+        """
+        if self._compaction is not None:
+            self._compaction.join()
+            self._compaction = None
+
+    def _compact_segments(self, segments: list) -> None:
+        """
+        Builds a separate book from the snapshot and the rotated segments,
+        writes it as the new snapshot and removes the segments.
+        The attached book is not touched, so it can be changed meanwhile.
+        """
+        address_book = AddressBook()
+        snapshot_seq, _ = self._load_base(address_book)
+        last_seq, _ = self._replay(address_book, segments, snapshot_seq)
+        self._write_snapshot(address_book, max(last_seq, snapshot_seq))
+        for segment in segments:
+            segment.unlink(missing_ok=True)
+
+    def _segments(self) -> list:
+        """
+        Returns the rotated journal segments ordered by their last sequence number.
+        """
+        segments = self.journal_path.parent.glob(f'{self.journal_path.name}.*')
+        return sorted((path for path in segments if path.suffix[1:].isdigit()), key=lambda path: int(path.suffix[1:]))
+
+    def _load_base(self, address_book: AddressBook, on_error: str = 'skip', progress: callable = None) -> tuple:
+        """
+        Loads the snapshot, or the regular JSON file when there is no snapshot,
+        into the address book and returns the sequence number it includes and
+        the statistics of the load. Invalid records are handled like
+        AddressBookFileHandler.load_stream handles them.
+        A lazy handler adds the snapshot as a raw source when the book accepts one.
+        """
+        if not self.snapshot_path.exists():
+            # A handler of its own, so a compaction does not replace 'last_load_stats'
+            base = AddressBookFileHandler(self.file_name, self.lazy)
+            return 0, base.load_stream(address_book, on_error, progress)
+        stats = LoadStats()
+        started = time.perf_counter()
+        raw = {} if self.lazy and on_error == 'skip' and address_book.accepts_raw_source() else None
+        if raw is None:
+            address_book.defer_indexes()
+            load = partial(self._load_record, address_book)
+        else:
+            load = partial(self._load_raw, raw)
+            stats.lazy = True
+        try:
+            with open(self.snapshot_path, 'rb') as file:
+                header = file.readline()
+                snapshot_seq = json.loads(header)['seq']
+                offset = len(header)
+                for number, line in enumerate(file, 2):
+                    try:
+                        errors = load(json.loads(line))
+                    except ValueError as error:
+                        stats.aborted = True
+                        stats.add_error(number, offset, f"The snapshot is broken: {error}")
+                        if on_error == 'abort':
+                            raise AddressBookLoadError(f"Broken snapshot at line {number}: {error}", stats)
+                        break
+                    if errors:
+                        stats.skipped += 1
+                        stats.add_error(number, offset, ' '.join(errors))
+                        if on_error == 'abort':
+                            stats.aborted = True
+                            raise AddressBookLoadError(
+                                f"Invalid record at line {number}, offset {offset}: {' '.join(errors)}", stats)
+                    else:
+                        stats.loaded += 1
+                    offset += len(line)
+                    stats.bytes_read = offset
+                    if progress is not None and (stats.loaded + stats.skipped) % self.progress_every == 0:
+                        progress(stats)
+                stats.bytes_read = offset
+        finally:
+            stats.seconds = time.perf_counter() - started
+        if raw:
+            address_book.add_raw_source(raw)
+        if progress is not None:
+            progress(stats)
+        return snapshot_seq, stats
+
+    @staticmethod
+    def _replay(address_book: AddressBook, paths: list, after_seq: int) -> tuple:
+        """
+        Replays the journal entries newer than 'after_seq' from the given files.
+        A torn last line, left by a crash in the middle of an append, ends the
+        file and is cut off, so that the next append starts on a line of its own.
+        Returns the last sequence number seen and the number of replayed entries.
+        """
+        last_seq, replayed = after_seq, 0
+        for path in paths:
+            if not path.exists():
+                continue
+            with open(path, 'rb+') as file:
+                offset = 0
+                for line in file:
+                    try:
+                        entry = json.loads(line) if line.endswith(b'\n') else None
+                    except ValueError:
+                        entry = None
+                    if entry is None:
+                        file.truncate(offset)
+                        break
+                    offset += len(line)
+                    if entry['seq'] <= after_seq:
+                        continue
+                    apply_entry(address_book, entry)
+                    last_seq = max(last_seq, entry['seq'])
+                    replayed += 1
+        return last_seq, replayed
+
+    def _write_snapshot(self, address_book: AddressBook, seq: int) -> None:
+        """
+        Writes the address book as a snapshot including changes up to 'seq'.
+        The snapshot is written to a temporary file which then replaces the old one.
+        """
+        temp_path = f'{self.snapshot_path}.tmp'
+        with open(temp_path, 'w') as file:
+            file.write(json.dumps({'seq': seq}) + '\n')
+            for name, fields in address_book.raw_items():
+                file.write(json.dumps(self._serialize_fields(name, fields), separators=(',', ':')) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.snapshot_path)
@@ -0,0 +1,138 @@
+import codecs
+import json
+
+
+class JsonStreamError(ValueError):
+    """
+    Raised when the streamed document is not a valid JSON object.
+    Args:
+        message: The description of the problem.
+        line: The line number where the problem was found, starting with 1.
+        offset: The character offset where the problem was found, starting with 0.
+    """
+
+    def __init__(self, message: str, line: int, offset: int):
+        super().__init__(f'{message} (line {line}, offset {offset})')
+        self.line = line
+        self.offset = offset
+
+
+class JsonObjectStream:
+    """
+    Parses the members of a top-level JSON object one at a time from a binary
+    file, keeping only a small window of the document in memory.
+    Args:
+        file: A file opened in binary mode.
+        chunk_size: The number of bytes read at once.
+        max_value_size: The largest value, in characters, read before giving up on it.
+    """
+
+    def __init__(self, file, chunk_size: int = 1 << 16, max_value_size: int = 1 << 24):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.max_value_size = max_value_size
+        self.bytes_read = 0
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._dropped = 0
+        self._line = 1
+        self._line_pos = 0
+
+    def _fill(self) -> bool:
+        """
+        Reads the next chunk into the buffer, dropping the consumed part.
+        Returns False at the end of the file.
+        """
+        if self._eof:
+            return False
+        if self._pos > self.chunk_size:
+            self._advance_line()
+            self._buffer = self._buffer[self._pos:]
+            self._dropped += self._pos
+            self._line_pos -= self._pos
+            self._pos = 0
+        chunk = self.file.read(self.chunk_size)
+        self.bytes_read += len(chunk)
+        if not chunk:
+            self._eof = True
+            self._buffer += self._text_decoder.decode(b'', final=True)
+            return False
+        self._buffer += self._text_decoder.decode(chunk)
+        return True
+
+    def _advance_line(self) -> None:
+        self._line += self._buffer.count('\n', self._line_pos, self._pos)
+        self._line_pos = self._pos
+
+    def position(self) -> tuple:
+        """
+        Returns the (line, offset) of the current parsing position.
+        """
+        self._advance_line()
+        return self._line, self._dropped + self._pos
+
+    def _error(self, message: str) -> JsonStreamError:
+        return JsonStreamError(message, *self.position())
+
+    def _peek(self) -> str:
+        """
+        Skips whitespace and returns the next character, or '' at the end of the file.
+        """
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in ' \t\r\n':
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, chars: str) -> str:
+        char = self._peek()
+        if not char or char not in chars:
+            found = repr(char) if char else 'end of file'
+            raise self._error(f"Expected {' or '.join(repr(c) for c in chars)}, found {found}")
+        self._pos += 1
+        return char
+
+    def _value(self):
+        """
+        Decodes the next JSON value, reading more data until it is complete.
+        A value ending exactly at the end of the buffer is only accepted at the
+        end of the file, as a number there may continue in the next chunk.
+        A broken value is reported once the end of the file or 'max_value_size'
+        is reached, so a syntax error does not pull the rest of the file into memory.
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError as error:
+                if self._eof or len(self._buffer) - self._pos > self.max_value_size:
+                    raise self._error(f'Invalid JSON: {error.msg}') from None
+            self._fill()
+
+    def __iter__(self):
+        """
+        Yields (key, value, line, offset) for every member of the object,
+        where line and offset point to the member's key.
+        """
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            if self._peek() != '"':
+                raise self._error('Expected a string key')
+            line, offset = self.position()
+            key = self._value()
+            self._expect(':')
+            value = self._value()
+            yield key, value, line, offset
+            if self._expect(',}') == '}':
+                return
@@ -0,0 +1,250 @@
+from pathlib import Path
+
+import json
+import math
+import os
+import threading
+import time
+
+from classess_ab import AddressBookFileHandler
+
+
+class LatencyHistogram:
+    """
+    Counts latencies in buckets growing by a factor of 'ratio' from one
+    microsecond, so it takes the same little memory however many calls it
+    counts, and percentiles are off by at most that factor.
+    """
+
+    ratio = 2 ** 0.25
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        bucket = max(0, math.ceil(math.log(max(seconds, 1e-6) / 1e-6, self.ratio)))
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, share: float) -> float:
+        """
+        Returns the seconds that 'share' of the latencies do not exceed, as
+        the upper bound of their bucket, but never more than the slowest one.
+        """
+        if not self.count:
+            return 0.0
+        rank = share * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(1e-6 * self.ratio ** bucket, self.max)
+        return self.max
+
+
+class Metrics:
+    """
+    Collects what the commands of the address book cost while it runs:
+    for every command the calls, a latency histogram and the errors, the
+    errors by exception type, and the number, bytes and seconds of the
+    loads and saves of the file handlers it watches. The bytes of a save
+    are what it wrote to the files of the book: the size of the files it
+    created or replaced and what it appended to the others; changes written
+    in place, such as SQLite pages, are not counted. The time a handler waits for
+    the user to answer the prompts of a watched viewer is not counted in its
+    latency. It is safe to record from several threads, such as the autosaver's.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.commands = {}
+        self.errors = {}
+        self.io = {'load': [0, 0, 0.0], 'save': [0, 0, 0.0]}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def call(self, command: str, func: callable):
+        """
+        Runs a command handler, records the call with record_call and returns its result.
+        """
+        local = self._local
+        waited = getattr(local, 'waiting', 0.0)
+        error = None
+        started = time.perf_counter()
+        try:
+            return func()
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            seconds = time.perf_counter() - started - (getattr(local, 'waiting', 0.0) - waited)
+            self.record_call(command, seconds, error)
+
+    def record_call(self, command: str, seconds: float, error: Exception = None) -> None:
+        """
+        Records a call of a command handler and the exception it raised, if any.
+        """
+        with self._lock:
+            stats = self.commands.get(command)
+            if stats is None:
+                stats = self.commands[command] = {'histogram': LatencyHistogram(), 'errors': 0}
+            stats['histogram'].record(seconds)
+            if error is not None:
+                stats['errors'] += 1
+                self._count_error(error)
+
+    def record_error(self, error: Exception) -> None:
+        """
+        Records an exception raised outside a handler, such as for an unknown command.
+        """
+        with self._lock:
+            self._count_error(error)
+
+    def _count_error(self, error: Exception) -> None:
+        name = type(error).__name__
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+    def record_io(self, kind: str, size: int, seconds: float) -> None:
+        """
+        Records a 'load' or a 'save' of 'size' bytes that took 'seconds'.
+        """
+        with self._lock:
+            totals = self.io[kind]
+            totals[0] += 1
+            totals[1] += size
+            totals[2] += seconds
+
+    def watch_input(self, viewer):
+        """
+        Makes the time spent in the prompts of a viewer left out of the latencies and returns the viewer.
+        """
+        get_data_input = viewer.get_data_input
+        local = self._local
+
+        def timed_input(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return get_data_input(*args, **kwargs)
+            finally:
+                local.waiting = getattr(local, 'waiting', 0.0) + time.perf_counter() - started
+
+        viewer.get_data_input = timed_input
+        return viewer
+
+    def watch(self, file_handler: AddressBookFileHandler) -> AddressBookFileHandler:
+        """
+        Makes the loads and saves of a file handler recorded and returns it.
+        """
+        load_from_file, save_to_file = file_handler.load_from_file, file_handler.save_to_file
+
+        def load(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return load_from_file(*args, **kwargs)
+            finally:
+                stats = getattr(file_handler, 'last_load_stats', None)
+                size = stats.bytes_read if stats is not None and stats.bytes_read else stored_size(file_handler)
+                self.record_io('load', size, time.perf_counter() - started)
+
+        def save(*args, **kwargs):
+            before = stored_files(file_handler)
+            started = time.perf_counter()
+            try:
+                return save_to_file(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - started
+                self.record_io('save', written_size(before, stored_files(file_handler)), seconds)
+
+        file_handler.load_from_file, file_handler.save_to_file = load, save
+        return file_handler
+
+    def summary(self) -> dict:
+        """
+        Returns the metrics as a JSON-serializable dict, with latencies in milliseconds.
+        """
+        with self._lock:
+            commands = {}
+            for command, stats in sorted(self.commands.items()):
+                histogram = stats['histogram']
+                commands[command] = {
+                    'calls': histogram.count,
+                    'errors': stats['errors'],
+                    'total_ms': round(histogram.total * 1000, 3),
+                    'p50_ms': round(histogram.percentile(0.5) * 1000, 3),
+                    'p95_ms': round(histogram.percentile(0.95) * 1000, 3),
+                    'p99_ms': round(histogram.percentile(0.99) * 1000, 3),
+                    'max_ms': round(histogram.max * 1000, 3),
+                }
+            return {
+                'started': self.started,
+                'seconds': round(time.time() - self.started, 3),
+                'commands': commands,
+                'errors': dict(sorted(self.errors.items(), key=lambda item: -item[1])),
+                'io': {kind: {'count': count, 'bytes': size, 'seconds': round(seconds, 3)}
+                       for kind, (count, size, seconds) in self.io.items()},
+            }
+
+    def __str__(self) -> str:
+        summary = self.summary()
+        lines = [f"{'command':<24}{'calls':>7}{'errors':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"]
+        for command, stats in summary['commands'].items():
+            lines.append(f"{command:<24}{stats['calls']:>7}{stats['errors']:>7}{stats['p50_ms']:>9}"
+                         f"{stats['p95_ms']:>9}{stats['p99_ms']:>9}{stats['max_ms']:>9}")
+        if summary['errors']:
+            lines.append('Errors: ' + ', '.join(f'{name} {count}' for name, count in summary['errors'].items()))
+        for kind, totals in summary['io'].items():
+            lines.append(f"{kind.capitalize()}s: {totals['count']}, {totals['bytes']} bytes in {totals['seconds']} s")
+        return '\n'.join(lines)
+
+    def dump(self, file_name: str) -> None:
+        """
+        Writes the summary of the metrics to a JSON file.
+        """
+        temp_name = f'{file_name}.tmp'
+        with open(temp_name, 'w') as file:
+            json.dump(self.summary(), file, indent=2)
+        os.replace(temp_name, file_name)
+
+
+def stored_files(file_handler: AddressBookFileHandler) -> dict:
+    """
+    Returns {path: (inode, size)} of the files a handler keeps the book in:
+    its file and the files named after it, such as journals, shards or a SQLite WAL.
+    """
+    path = Path(file_handler.file_name)
+    files = {}
+    for file in path.parent.glob(f'{path.name}*'):
+        if not file.name.endswith('.tmp'):
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            files[file] = stat.st_ino, stat.st_size
+    return files
+
+
+def stored_size(file_handler: AddressBookFileHandler) -> int:
+    """
+    Returns the bytes of the files a handler keeps the book in.
+    """
+    return sum(size for _, size in stored_files(file_handler).values())
+
+
+def written_size(before: dict, after: dict) -> int:
+    """
+    Returns the bytes written between two stored_files() results: the size
+    of every new or replaced file and the growth of every other one.
+    """
+    size = 0
+    for path, (inode, length) in after.items():
+        old = before.get(path)
+        if old is None or old[0] != inode:
+            size += length
+        else:
+            size += max(0, length - old[1])
+    return size
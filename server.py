@@ -0,0 +1,217 @@
+from argparse import ArgumentParser
+
+import asyncio
+import json
+import signal
+import sys
+
+from address_book import BotAdressBook, create_address_book, create_change_feed, create_file_handler
+from batch_viewer import BatchUserViewer, parse_batch_command
+from change_feed import ChangeFeed
+from classess_ab import AddressBook, AddressBookFileHandler
+from commands import SERVER_HOST, SERVER_PORT
+from concurrent_ab import ReadWriteLock
+from metrics import Metrics
+
+# The handlers that only read the address book; every other command is run as a write
+READ_HANDLERS = {'handle_find_records', 'handle_get_all_records', 'handle_days_to_birthday',
+                 'handle_get_birthdays_per_week', 'handle_help', 'handle_stats'}
+
+
+class AddressBookServer:
+    """
+    Shares one in-memory address book between local clients over TCP.
+    A client sends one command per line in the format of the batch mode
+    (see parse_batch_command) and gets one JSON result per line, in order,
+    so it may send many commands without waiting for their results.
+    Every connection runs the commands with its own BotAdressBook and
+    BatchUserViewer. Commands run in worker threads, so a long one does not
+    hold up the other clients: reads as soon as they arrive, holding the
+    reader/writer lock of a ConcurrentAddressBook for reading, so they run
+    at the same time, and writes one at a time, holding it for writing.
+    A save holds it for reading while it writes the book to its file, so
+    reads never wait for the disk. A book that is not a ConcurrentAddressBook
+    is given a lock of its own and read by one command at a time.
+    Changes are saved 'save_delay' seconds after the first change since the
+    last save, and when the server stops; a failed save is retried as many
+    seconds later. 'save' saves at once and 'exit' closes the connection.
+    Args:
+        address_book: The address book to share, a ConcurrentAddressBook for concurrent reads.
+        file_handler: The file handler the book is saved with.
+        save_delay: The seconds changes are collected for before they are saved.
+        change_feed: The change feed the 'changes' command reads, if any.
+        metrics: The metrics the commands of all connections are recorded in, if any.
+    """
+
+    def __init__(self, address_book: AddressBook, file_handler: AddressBookFileHandler, save_delay: float = 1.0,
+                 change_feed: ChangeFeed = None, metrics: Metrics = None):
+        self.address_book = address_book
+        self.file_handler = file_handler
+        self.change_feed = change_feed
+        self.metrics = metrics
+        self.save_delay = save_delay
+        self.requests = 0
+        lock = getattr(address_book, 'lock', None)
+        self.lock = lock if lock is not None else ReadWriteLock()
+        # Only a ConcurrentAddressBook may be read by several threads at once
+        self._reading = self.lock.reading if lock is not None else self.lock.writing
+        self._loop = None
+        self._write_lock = None
+        self._save_task = None
+        self._dirty = False
+
+    async def serve(self, host: str = SERVER_HOST, port: int = SERVER_PORT, started: callable = None) -> None:
+        """
+        Serves clients until cancelled, then saves the unsaved changes.
+        'started', if given, is called with the bound (host, port) once the server listens.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._write_lock = asyncio.Lock()
+        self.address_book.subscribe(self._on_change)
+        server = await asyncio.start_server(self._serve_client, host, port)
+        try:
+            if started is not None:
+                started(server.sockets[0].getsockname()[:2])
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.address_book.unsubscribe(self._on_change)
+            if self._save_task is not None:
+                self._save_task.cancel()
+            if self._dirty:
+                await self.save()
+
+    async def save(self) -> None:
+        """
+        Saves the address book in a worker thread while holding the write lock.
+        The book stays marked as changed if the save fails.
+        """
+        async with self._write_lock:
+            await self._loop.run_in_executor(None, self._locked, self._reading,
+                                             self.file_handler.save_to_file, self.address_book)
+            self._dirty = False
+
+    @staticmethod
+    def _locked(locking: callable, func: callable, *args):
+        """
+        Calls func(*args) in the context of 'locking', in a worker thread.
+        """
+        with locking():
+            return func(*args)
+
+    def _on_change(self, action: str, name: str, field: str | None, old_value, new_value) -> None:
+        """
+        Marks the book as changed and schedules a save, from the worker thread
+        that changed it, unless one is scheduled already.
+        """
+        self._dirty = True
+        self._loop.call_soon_threadsafe(self._schedule_save)
+
+    def _schedule_save(self) -> None:
+        if self._save_task is None or self._save_task.done():
+            self._save_task = self._loop.create_task(self._save_later())
+
+    async def _save_later(self) -> None:
+        """
+        Saves the changes after 'save_delay' seconds, retrying a failed save after as many more.
+        """
+        while self._dirty:
+            await asyncio.sleep(self.save_delay)
+            try:
+                await self.save()
+            except Exception as e:
+                if self.metrics is not None:
+                    self.metrics.record_error(e)
+                print(f"Saving the address book failed: {e}", file=sys.stderr)
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Runs the commands of one connection in order and writes their results.
+        """
+        bot = BotAdressBook(BatchUserViewer(), self.address_book, self.file_handler, change_feed=self.change_feed,
+                            metrics=self.metrics)
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                result = await self.execute(bot, *parse_batch_command(line))
+                writer.write(json.dumps(result, ensure_ascii=False).encode() + b'\n')
+                await writer.drain()
+                if result.get('exit'):
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    async def execute(self, bot: BotAdressBook, command: dict | None, error: str = None) -> dict:
+        """
+        Runs one command with the bot of a connection in a worker thread: a
+        read at once, a write after the writes before it and 'save' as a save.
+        """
+        self.requests += 1
+        resolved = command and bot.dispatcher.resolve(command['command'].strip())
+        if not resolved:
+            return bot.run_command(command, error)
+        if resolved[0].__name__ in READ_HANDLERS:
+            return await self._loop.run_in_executor(None, self._locked, self._reading, bot.run_command,
+                                                    command, error)
+        if resolved[0].__name__ == 'handle_save_to_file':
+            bot.viewer.start_command([])
+            try:
+                await self.save()
+            except Exception as e:
+                return {'id': command.get('id'), 'command': command['command'], 'result': None,
+                        'messages': [], 'errors': [f"The address book could not be saved: {e}"], 'ok': False}
+            return {'id': command.get('id'), 'command': command['command'], 'result': 'Saved',
+                    'messages': [f"The address book has been saved at the following path {self.file_handler.file_name}"],
+                    'errors': [], 'ok': True}
+        async with self._write_lock:
+            return await self._loop.run_in_executor(None, self._locked, self.lock.writing, bot.run_command,
+                                                    command, error)
+
+
+def main(argv: list = None) -> None:
+    """
+    Loads the address book from its storage and serves it until interrupted.
+    """
+    parser = ArgumentParser(description="Serve the address book to local clients")
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT, help='0 picks a free port')
+    parser.add_argument('--save-delay', type=float, default=1.0,
+                        help='seconds changes are collected for before they are saved')
+    parser.add_argument('--metrics', metavar='FILE', help='write the metrics of the commands to FILE on exit')
+    args = parser.parse_args(argv)
+
+    address_book = create_address_book(thread_safe=True)
+    metrics = Metrics()
+    file_handler = metrics.watch(create_file_handler())
+    file_handler.load_from_file(address_book)
+    change_feed = create_change_feed()
+    if change_feed is not None:
+        change_feed.attach(address_book)
+    server = AddressBookServer(address_book, file_handler, args.save_delay, change_feed, metrics)
+
+    async def run():
+        task = asyncio.current_task()
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+        except NotImplementedError:
+            pass
+        await server.serve(args.host, args.port,
+                           lambda address: print(f"Serving on {address[0]}:{address[1]}", flush=True))
+
+    try:
+        asyncio.run(run())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    finally:
+        if change_feed is not None:
+            change_feed.close()
+        if args.metrics:
+            metrics.dump(args.metrics)
+    print(f"Stopped after {server.requests} request(s)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
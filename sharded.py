@@ -0,0 +1,167 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+import json
+import os
+import time
+import zlib
+
+from classess_ab import AddressBook, AddressBookFileHandler, LoadStats, build_valid_record
+
+
+def shard_of(name: str, shards: int) -> int:
+    """
+    Returns the shard of a name. Unlike hash(), the CRC of the name
+    is the same in every process and every run.
+    """
+    return zlib.crc32(name.encode('utf-8')) % shards
+
+
+def load_shard(file_name: str, on_error: str) -> tuple:
+    """
+    Parses and validates one shard, in a worker process, without building
+    the records. Returns the raw (phones, birthday, email) fields of the valid
+    records by name, which are cheaper to send to the main process than
+    records, and the statistics of the load.
+    """
+    handler = AddressBookFileHandler(file_name)
+    fields = handler.load_fields(on_error)
+    return fields, handler.last_load_stats
+
+
+class ShardedFileHandler(AddressBookFileHandler):
+    """
+    A file handler that saves an AddressBook as several JSON shards and loads
+    them in parallel worker processes, so parsing and validating a large book
+    uses all CPU cores. The main process only builds the records, without
+    validating them again, or with a lazy handler adds the validated fields
+    as a raw source of the book, to be built on first access.
+
+    A record goes to the shard chosen by the CRC of its name, so saving the same
+    book always gives the same shards. Loading parses and validates every shard
+    in a ProcessPoolExecutor and merges the results in the order of the manifest.
+    A name found in several shards, which happens only when the shards were
+    written by different tools or edited by hand, is resolved the way a
+    repeated key of one JSON file is: the record of the later shard wins.
+    While there is no manifest yet, the regular JSON file is loaded.
+
+    Files next to 'file_name':
+        <file_name>.shards - the manifest, a JSON object listing the shard files;
+        <file_name>.shard<N> - the shards, in the format of the regular JSON file.
+    Args:
+        file_name (str): The name of the regular JSON file of the address book.
+        shards (int): The number of shards to save, by default the number of CPU cores.
+        max_workers (int): The number of worker processes, by default the number of CPU cores.
+        lazy (bool): Whether loading lets the address book build the records on first access.
+    """
+
+    def __init__(self, file_name: str, shards: int = None, max_workers: int = None, lazy: bool = True):
+        super().__init__(file_name, lazy)
+        self.manifest_path = Path(f'{file_name}.shards')
+        self.shards = shards or os.cpu_count() or 1
+        self.max_workers = max_workers
+
+    def _shard_paths(self) -> list:
+        """
+        Returns the shard files listed in the manifest, or None when there is no manifest.
+        """
+        try:
+            with open(self.manifest_path, 'r') as file:
+                manifest = json.load(file)
+        except FileNotFoundError:
+            return None
+        return [self.manifest_path.parent / name for name in manifest['shards']]
+
+    def save_to_file(self, address_book: AddressBook) -> None:
+        """
+        Writes the records into the shards chosen by their names and then the manifest.
+        Every file is written under a temporary name, synced to disk, and then replaces the old one,
+        and shards of an earlier save with more shards are removed at the end.
+        """
+        items = [[] for _ in range(self.shards)]
+        for name, fields in address_book.raw_items():
+            items[shard_of(name, self.shards)].append((name, fields))
+        old_paths = self._shard_paths() or []
+        paths = [Path(f'{self.file_name}.shard{index}') for index in range(self.shards)]
+        for path, shard_items in zip(paths, items):
+            temp_path = f'{path}.tmp'
+            with open(temp_path, 'w') as file:
+                self._write_json(file, shard_items)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, path)
+        temp_path = f'{self.manifest_path}.tmp'
+        with open(temp_path, 'w') as file:
+            json.dump({'shards': [path.name for path in paths]}, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.manifest_path)
+        for path in old_paths:
+            if path not in paths:
+                path.unlink(missing_ok=True)
+
+    def load_stream(self, address_book: AddressBook, on_error: str = 'skip', progress: callable = None) -> LoadStats:
+        """
+        Loads the shards in worker processes and merges them into the address book.
+        The statistics of the shards are summed up, with the errors prefixed by
+        the shard file; 'progress' is called after every merged shard.
+        A lazy load adds the merged raw fields as a raw source when the book
+        accepts one; otherwise the records are built and added right away.
+        With 'abort', the first invalid record in any shard raises AddressBookLoadError.
+        """
+        paths = self._shard_paths()
+        if paths is None:
+            return super().load_stream(address_book, on_error, progress)
+        stats = LoadStats()
+        self.last_load_stats = stats
+        started = time.perf_counter()
+        merged = {}
+        try:
+            if len(paths) == 1:
+                entries, shard_stats = load_shard(str(paths[0]), on_error)
+                self._merge(merged, stats, paths[0], entries, shard_stats, progress)
+            else:
+                max_workers = min(len(paths), self.max_workers or os.cpu_count() or 1)
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    results = executor.map(load_shard, map(str, paths), repeat(on_error))
+                    for path, (entries, shard_stats) in zip(paths, results):
+                        self._merge(merged, stats, path, entries, shard_stats, progress)
+            self._add_entries(address_book, merged, self.lazy, stats)
+        finally:
+            stats.seconds = time.perf_counter() - started
+        if progress is not None:
+            progress(stats)
+        return stats
+
+    @staticmethod
+    def _merge(merged: dict, stats: LoadStats, path: Path, entries: dict, shard_stats: LoadStats,
+               progress: callable) -> None:
+        """
+        Adds the entries and statistics of one shard to the merged ones.
+        """
+        for name, entry in entries.items():
+            if name in merged:
+                stats.duplicates += 1
+            merged[name] = entry
+        stats.loaded += shard_stats.loaded
+        stats.skipped += shard_stats.skipped
+        stats.bytes_read += shard_stats.bytes_read
+        stats.aborted = stats.aborted or shard_stats.aborted
+        for line, offset, message in shard_stats.errors:
+            stats.add_error(line, offset, f'{path.name}: {message}')
+        if progress is not None:
+            progress(stats)
+
+    @staticmethod
+    def _add_entries(address_book: AddressBook, merged: dict, lazy: bool, stats: LoadStats) -> None:
+        """
+        Adds the merged, validated entries to the address book: as a raw source
+        when 'lazy' and the book accepts one, as built records otherwise.
+        """
+        stats.loaded -= stats.duplicates
+        if not merged:
+            return
+        if lazy and address_book.add_raw_source(merged, validated=True):
+            return
+        address_book.add_records({name: build_valid_record(name, fields) for name, fields in merged.items()})
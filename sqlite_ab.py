@@ -0,0 +1,458 @@
+from collections import OrderedDict
+from collections.abc import Mapping
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import islice
+
+import sqlite3
+import threading
+import weakref
+
+from classess_ab import AddressBook, AddressBookFileHandler, Phone, Record, fold_name, normalize_phone
+from indexes import DeleteIndex, birthday_keys, birthday_month_day
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    name TEXT PRIMARY KEY,
+    name_folded TEXT NOT NULL,
+    email TEXT,
+    birthday TEXT,
+    birthday_md INTEGER
+);
+CREATE INDEX IF NOT EXISTS records_name_folded ON records (name_folded);
+CREATE INDEX IF NOT EXISTS records_email ON records (email COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS records_birthday_md ON records (birthday_md);
+CREATE TABLE IF NOT EXISTS phones (
+    name TEXT NOT NULL REFERENCES records (name) ON DELETE CASCADE,
+    phone TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (name, phone)
+);
+CREATE INDEX IF NOT EXISTS phones_phone ON phones (phone);
+"""
+
+# Trigram full-text tables make LIKE '%...%' use an index; they are kept in sync by triggers.
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS name_search USING fts5 (text, tokenize = 'trigram');
+CREATE VIRTUAL TABLE IF NOT EXISTS phone_search USING fts5 (text, tokenize = 'trigram');
+CREATE TRIGGER IF NOT EXISTS records_search_insert AFTER INSERT ON records BEGIN
+    INSERT INTO name_search (rowid, text) VALUES (new.rowid, new.name_folded);
+END;
+CREATE TRIGGER IF NOT EXISTS records_search_delete AFTER DELETE ON records BEGIN
+    DELETE FROM name_search WHERE rowid = old.rowid;
+END;
+CREATE TRIGGER IF NOT EXISTS phones_search_insert AFTER INSERT ON phones BEGIN
+    INSERT INTO phone_search (rowid, text) VALUES (new.rowid, new.phone);
+END;
+CREATE TRIGGER IF NOT EXISTS phones_search_delete AFTER DELETE ON phones BEGIN
+    DELETE FROM phone_search WHERE rowid = old.rowid;
+END;
+CREATE TRIGGER IF NOT EXISTS phones_search_update AFTER UPDATE OF phone ON phones BEGIN
+    UPDATE phone_search SET text = new.phone WHERE rowid = old.rowid;
+END;
+"""
+
+RECORD_COLUMNS = """
+    r.name, r.email, r.birthday,
+    (SELECT group_concat(phone, ' ') FROM (SELECT phone FROM phones WHERE name = r.name ORDER BY position))
+"""
+
+
+def birthday_key(birthday: str | None) -> int | None:
+    """
+    Returns the month * 100 + day number stored in the birthday_md column.
+    """
+    if birthday is None:
+        return None
+    month, day = birthday_month_day(birthday)
+    return month * 100 + day
+
+
+class SqliteRecords(Mapping):
+    """
+    A read-only name -> Record view of the records stored in a SqliteAddressBook.
+    It takes the place of the 'data' dict of the in-memory AddressBook.
+    """
+
+    def __init__(self, address_book: 'SqliteAddressBook'):
+        self.address_book = address_book
+
+    def __getitem__(self, name: str) -> Record:
+        record = self.address_book._load(name)
+        if record is None:
+            raise KeyError(name)
+        return record
+
+    def __contains__(self, name) -> bool:
+        return bool(self.address_book._execute('SELECT 1 FROM records WHERE name = ?', (name,)))
+
+    def __iter__(self):
+        for rows in self.address_book._batches('SELECT name FROM records ORDER BY rowid'):
+            for (name,) in rows:
+                yield name
+
+    def __len__(self) -> int:
+        return self.address_book._execute('SELECT count(*) FROM records')[0][0]
+
+    def values(self):
+        return self.address_book._select_records('ORDER BY r.rowid')
+
+
+class SqliteAddressBook(AddressBook):
+    """
+    An address book that keeps its records in a local SQLite file with indexed
+    tables for records and phones, so books larger than memory can be used.
+    Lookups by name, phone and email, substring search and birthday queries run
+    in the database. Every change, including the ones made through the Record
+    mutators of the records it returns, is committed in its own transaction.
+    Records are built on demand. The 'cache_size' most recently used ones are
+    kept in memory, and a record stays known while anything else refers to
+    it, so repeated lookups return the same object however large the book is.
+    Args:
+        file_name (str): The name of the SQLite database file.
+        cache_size (int): The number of recently used records kept in memory.
+    """
+
+    def __init__(self, file_name: str, cache_size: int = 10_000):
+        # The records live in the database, so the in-memory dict and indexes of AddressBook are not set up.
+        self.file_name = file_name
+        self._listeners = []
+        self._record_listener = self._on_record_changed
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._live = weakref.WeakValueDictionary()
+        self._indexed = True
+        self._fuzzy_names = None
+        # The book may be used from other threads, such as the autosaver's or
+        # the server's workers; the lock keeps reads and commits out of a
+        # transaction in progress, so they never see a record half written.
+        self._connection = sqlite3.connect(file_name, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._connection.execute('PRAGMA foreign_keys = ON')
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        with self._connection:
+            self._connection.executescript(SCHEMA)
+        try:
+            with self._connection:
+                self._connection.executescript(SEARCH_SCHEMA)
+            self._search_tables = {'name': 'name_search', 'phone': 'phone_search'}
+        except sqlite3.OperationalError:
+            self._search_tables = None
+
+    @property
+    def data(self) -> SqliteRecords:
+        return SqliteRecords(self)
+
+    def accepts_raw_source(self) -> bool:
+        return False
+
+    def defer_indexes(self) -> None:
+        # The database keeps its indexes up to date itself.
+        pass
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Runs the statements of the block in one transaction, committed at its end.
+        """
+        with self._lock, self._connection:
+            yield
+
+    def _execute(self, sql: str, parameters: tuple = ()) -> list:
+        """
+        Runs a query under the lock and returns all its rows.
+        """
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def _batches(self, sql: str, parameters: tuple = ()):
+        """
+        Yields the rows of a query in lists of up to 1000, each fetched under the lock.
+        """
+        with self._lock:
+            cursor = self._connection.execute(sql, parameters)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(1000)
+            if not rows:
+                return
+            yield rows
+
+    def _build_record(self, name: str, email: str | None, birthday: str | None, phones: str | None) -> Record:
+        """
+        Returns the known record with the given name or builds, caches and starts tracking it.
+        """
+        record = self._live.get(name)
+        if record is None:
+            record = Record(name, None, birthday, email)
+            record.phones = [Phone(phone) for phone in phones.split(' ')] if phones else []
+            record.subscribe(self._record_listener)
+            self._live[name] = record
+        self._remember(name, record)
+        return record
+
+    def _remember(self, name: str, record: Record) -> None:
+        """
+        Marks a record as the most recently used one, evicting the least
+        recently used one from the cache once it holds 'cache_size' records.
+        An evicted record goes on tracking its changes for as long as it is used.
+        """
+        with self._lock:
+            self._cache[name] = record
+            self._cache.move_to_end(name)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _forget(self, name: str) -> Record | None:
+        """
+        Removes a record from the cache and stops tracking it. Returns the record, if it was known.
+        """
+        with self._lock:
+            self._cache.pop(name, None)
+            record = self._live.pop(name, None)
+        if record is not None:
+            record.unsubscribe(self._record_listener)
+        return record
+
+    def _select_records(self, where: str, parameters: tuple = ()):
+        """
+        Yields the records selected by the given WHERE/ORDER BY clause over records r.
+        """
+        for rows in self._batches(f'SELECT {RECORD_COLUMNS} FROM records r {where}', parameters):
+            with self._lock:
+                records = [self._build_record(*row) for row in rows]
+            yield from records
+
+    def _load(self, name: str) -> Record | None:
+        with self._lock:
+            record = self._live.get(name)
+            if record is not None:
+                self._remember(name, record)
+                return record
+        return next(self._select_records('WHERE r.name = ?', (name,)), None)
+
+    def __setitem__(self, key: str, record: Record):
+        with self._transaction():
+            self._write_record(key, record)
+        self._track(key, record)
+
+    def add_records(self, records: Mapping) -> None:
+        """
+        Writes all the records in one transaction.
+        """
+        with self._transaction():
+            for key, record in records.items():
+                self._write_record(key, record)
+        for key, record in records.items():
+            self._track(key, record)
+
+    def _write_record(self, key: str, record: Record) -> None:
+        self._connection.execute('DELETE FROM records WHERE name = ?', (key,))
+        self._connection.execute(
+            'INSERT INTO records (name, name_folded, email, birthday, birthday_md) VALUES (?, ?, ?, ?, ?)',
+            (key, fold_name(key), record.email.value if record.email else None,
+             record.birthday.value if record.birthday else None,
+             birthday_key(record.birthday.value if record.birthday else None)))
+        self._connection.executemany(
+            'INSERT OR IGNORE INTO phones (name, phone, position) VALUES (?, ?, ?)',
+            [(key, phone.value, position) for position, phone in enumerate(record.phones)])
+
+    def _track(self, key: str, record: Record) -> None:
+        """
+        Caches a written record, starts tracking its changes and announces it.
+        """
+        self._forget(key)
+        if self._fuzzy_names is not None:
+            self._fuzzy_names.remove(key, fold_name(key))
+            self._fuzzy_names.add(key, fold_name(key))
+        self._live[key] = record
+        self._remember(key, record)
+        record.subscribe(self._record_listener)
+        self._notify('add', key, None, None, record)
+
+    def __delitem__(self, key: str):
+        record = self._load(key)
+        if record is None:
+            raise KeyError(key)
+        with self._transaction():
+            self._connection.execute('DELETE FROM records WHERE name = ?', (key,))
+        self._forget(key)
+        if self._fuzzy_names is not None:
+            self._fuzzy_names.remove(key, fold_name(key))
+        self._notify('remove', key, None, record, None)
+
+    def _reindex_field(self, key: str, field: str, old_value: str | None, new_value: str | None) -> None:
+        """
+        Writes a change made through the Record mutators to the database.
+        """
+        with self._transaction():
+            if field == 'phones':
+                if old_value is None:
+                    self._connection.execute(
+                        'INSERT OR IGNORE INTO phones (name, phone, position) '
+                        'SELECT ?, ?, coalesce(max(position) + 1, 0) FROM phones WHERE name = ?',
+                        (key, new_value, key))
+                elif new_value is None:
+                    self._connection.execute('DELETE FROM phones WHERE name = ? AND phone = ?', (key, old_value))
+                else:
+                    self._connection.execute('UPDATE OR REPLACE phones SET phone = ? WHERE name = ? AND phone = ?',
+                                             (new_value, key, old_value))
+            elif field == 'email':
+                self._connection.execute('UPDATE records SET email = ? WHERE name = ?', (new_value, key))
+            elif field == 'birthday':
+                self._connection.execute('UPDATE records SET birthday = ?, birthday_md = ? WHERE name = ?',
+                                         (new_value, birthday_key(new_value), key))
+
+    def commit(self) -> None:
+        """
+        Commits the pending transaction, if any. Changes are committed as they
+        are made, so this only matters for changes made through the connection directly.
+        """
+        with self._lock:
+            self._connection.commit()
+
+    def close(self) -> None:
+        """
+        Stops tracking the known records and closes the database.
+        """
+        for record in list(self._live.values()):
+            record.unsubscribe(self._record_listener)
+        self._live.clear()
+        self._cache.clear()
+        self._connection.close()
+
+    def has_name(self, name: str) -> bool:
+        return bool(self._execute('SELECT 1 FROM records WHERE name_folded = ? LIMIT 1', (fold_name(name),)))
+
+    def get_records_by_phone(self, number: str) -> list:
+        return list(self._select_records('WHERE r.name IN (SELECT name FROM phones WHERE phone = ?) ORDER BY r.name',
+                                         (normalize_phone(number),)))
+
+    def get_records_by_email(self, email: str) -> list:
+        return list(self._select_records('WHERE r.email = ? COLLATE NOCASE ORDER BY r.name', (email,)))
+
+    def _search(self, kind: str, query: str) -> str:
+        """
+        Returns the subquery selecting names whose name or phone contains the query.
+        """
+        if self._search_tables is not None:
+            table = self._search_tables[kind]
+            if kind == 'name':
+                return f'SELECT name FROM records WHERE rowid IN (SELECT rowid FROM {table} WHERE text LIKE ?)'
+            return f'SELECT name FROM phones WHERE rowid IN (SELECT rowid FROM {table} WHERE text LIKE ?)'
+        if kind == 'name':
+            return 'SELECT name FROM records WHERE name_folded LIKE ?'
+        return 'SELECT name FROM phones WHERE phone LIKE ?'
+
+    def find_records(self, **search_criteria: dict) -> list:
+        subqueries, parameters = [], []
+        if 'name' in search_criteria and len(search_criteria['name']) >= 2:
+            query = search_criteria['name'].casefold()
+            if '%' not in query and '_' not in query:
+                subqueries.append(self._search('name', query))
+                parameters.append(f'%{query}%')
+        if 'phones' in search_criteria and len(search_criteria['phones']) >= 5:
+            query = ''.join(char for char in search_criteria['phones'] if char.isdigit() or char == '+')
+            if query:
+                subqueries.append(self._search('phone', query))
+                parameters.append(f'%{query}%')
+        if not subqueries:
+            return []
+        where = f"WHERE r.name IN ({' UNION '.join(subqueries)}) ORDER BY r.name"
+        return list(self._select_records(where, tuple(parameters)))
+
+    def _fuzzy_index(self) -> DeleteIndex:
+        """
+        Returns the fuzzy index of the names, read from the database on first use and then kept in memory.
+        """
+        if self._fuzzy_names is None:
+            fuzzy_names = DeleteIndex()
+            for rows in self._batches('SELECT name, name_folded FROM records'):
+                for name, folded in rows:
+                    fuzzy_names.add(name, folded)
+            self._fuzzy_names = fuzzy_names
+        return self._fuzzy_names
+
+    def get_all_records(self) -> list:
+        return list(self._select_records('ORDER BY r.rowid'))
+
+    def _celebrants(self, days: list) -> dict:
+        """
+        Returns the names celebrating their birthday on each of the given dates.
+        """
+        dates_by_key = {}
+        for day in days:
+            for month, month_day in birthday_keys(day):
+                dates_by_key.setdefault(month * 100 + month_day, []).append(day)
+        result = {day: [] for day in days}
+        if not dates_by_key:
+            return result
+        placeholders = ', '.join('?' * len(dates_by_key))
+        rows = self._execute(f'SELECT name, birthday_md FROM records WHERE birthday_md IN ({placeholders})',
+                             tuple(dates_by_key))
+        for name, key in rows:
+            for day in dates_by_key[key]:
+                result[day].append(name)
+        return {day: sorted(names) for day, names in result.items()}
+
+    def get_birthdays_per_week(self, num: int) -> list:
+        new_date = datetime.now().date() + timedelta(days=num)
+        return self._celebrants([new_date])[new_date]
+
+    def get_upcoming_birthdays(self, days: int) -> dict:
+        today = datetime.now().date()
+        celebrants = self._celebrants([today + timedelta(days=offset) for offset in range(days)])
+        return {day: names for day, names in celebrants.items() if names}
+
+    def iterator(self, n: int):
+        if n < 1:
+            raise ValueError(f"The chunk size must be at least 1, got {n}")
+        records = self._select_records('ORDER BY r.rowid')
+        return iter(lambda: list(islice(records, n)), [])
+
+    def __iter__(self):
+        """
+        Returns a new iterator over the records, read from the database in batches.
+        Records added or removed during the iteration may or may not be seen.
+        """
+        return self._select_records('ORDER BY r.rowid')
+
+
+class SqliteFileHandler(AddressBookFileHandler):
+    """
+    A file handler for address books kept in a SQLite database.
+    A SqliteAddressBook of the same file commits its changes as they are made,
+    so saving it only commits; any other book is copied into the database.
+    Args:
+        file_name (str): The name of the SQLite database file.
+    """
+
+    saves_copies = False
+
+    def save_to_file(self, address_book: AddressBook) -> None:
+        if isinstance(address_book, SqliteAddressBook) and address_book.file_name == self.file_name:
+            address_book.commit()
+            return
+        database = SqliteAddressBook(self.file_name)
+        try:
+            for name in list(database.data):
+                if name not in address_book.data:
+                    del database[name]
+            for name, record in address_book.data.items():
+                database[name] = record
+        finally:
+            database.close()
+
+    def load_from_file(self, address_book: AddressBook = None, on_error: str = 'skip',
+                       progress: callable = None) -> AddressBook:
+        if address_book is None:
+            return SqliteAddressBook(self.file_name)
+        if isinstance(address_book, SqliteAddressBook) and address_book.file_name == self.file_name:
+            return address_book
+        database = SqliteAddressBook(self.file_name)
+        try:
+            for record in database:
+                address_book.add_record(record)
+        finally:
+            database.close()
+        return address_book
@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pytest
+
+from autosave import Autosaver
+from batch_viewer import BatchUserViewer
+from classess_ab import AddressBook, AddressBookFileHandler, Record
+
+
+class RecordingFileHandler(AddressBookFileHandler):
+    """
+    Keeps the names of every saved book and the time of the save; fails the saves while 'failing' is set.
+    """
+
+    def __init__(self, file_name: str):
+        super().__init__(file_name)
+        self.saves = []
+        self.failing = False
+
+    def save_to_file(self, address_book: AddressBook) -> None:
+        if self.failing:
+            raise OSError("The disk is full")
+        super().save_to_file(address_book)
+        self.saves.append((time.monotonic(), sorted(name for name, _ in address_book.raw_items())))
+
+
+@pytest.fixture
+def autosaver(tmp_path):
+    autosaver = Autosaver(AddressBook(), RecordingFileHandler(str(tmp_path / 'book.json')), delay=0.1, max_delay=0.3)
+    autosaver.start()
+    yield autosaver
+    autosaver.stop()
+
+
+def add(autosaver: Autosaver, name: str) -> None:
+    with autosaver.lock:
+        autosaver.address_book.add_record(Record(name))
+
+
+def test_changes_close_together_are_saved_once(autosaver):
+    for name in ['Anna Smith', 'Bob Ray', 'Carl Fox']:
+        add(autosaver, name)
+        time.sleep(0.02)
+    time.sleep(0.25)
+    assert [names for _, names in autosaver.file_handler.saves] == [['Anna Smith', 'Bob Ray', 'Carl Fox']]
+
+
+def test_a_steady_stream_of_changes_is_saved_after_the_max_delay(autosaver):
+    started = time.monotonic()
+    for index in range(25):
+        add(autosaver, f'Name {chr(65 + index)}')
+        time.sleep(0.02)
+    saves = autosaver.file_handler.saves
+    assert saves and saves[0][0] - started < 0.45
+
+
+def test_save_soon_saves_without_waiting_for_the_delay(autosaver):
+    started = time.monotonic()
+    autosaver.save_soon()
+    deadline = started + 0.08
+    while not autosaver.file_handler.saves and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert autosaver.file_handler.saves
+
+
+def test_a_failed_save_is_retried_and_reported_once(autosaver):
+    autosaver.file_handler.failing = True
+    add(autosaver, 'Anna Smith')
+    time.sleep(0.15)
+    assert isinstance(autosaver.take_error(), OSError)
+    assert autosaver.take_error() is None
+    autosaver.file_handler.failing = False
+    time.sleep(0.2)
+    assert [names for _, names in autosaver.file_handler.saves] == [['Anna Smith']]
+
+
+def test_stop_saves_the_pending_changes(tmp_path):
+    autosaver = Autosaver(AddressBook(), RecordingFileHandler(str(tmp_path / 'book.json')), delay=10, max_delay=10)
+    autosaver.start()
+    add(autosaver, 'Anna Smith')
+    autosaver.stop()
+    assert [names for _, names in autosaver.file_handler.saves] == [['Anna Smith']]
+
+
+def test_prompts_release_the_lock_while_they_wait(autosaver):
+    viewer = BatchUserViewer()
+    answered = threading.Event()
+
+    def get_data_input(prompt):
+        # The save takes the lock, so it can only run while the prompt waits
+        add_thread = threading.Thread(target=lambda: add(autosaver, 'Bob Ray'))
+        add_thread.start()
+        add_thread.join(1)
+        answered.set()
+        return 'Anna Smith'
+
+    viewer.get_data_input = get_data_input
+    autosaver.watch_input(viewer)
+    with autosaver.lock:
+        assert viewer.get_data_input("Enter name:") == 'Anna Smith'
+    assert answered.is_set()
+    assert 'Bob Ray' in autosaver.address_book
+    assert viewer.get_data_input("Enter name:") == 'Anna Smith'
@@ -0,0 +1,74 @@
+import io
+import json
+
+import pytest
+
+import address_book
+from address_book import BotAdressBook, run_batch_file
+from batch_viewer import BatchUserViewer, parse_batch_command, read_batch_commands
+from classess_ab import AddressBook, AddressBookFileHandler
+
+COMMANDS = [
+    {'command': 'add', 'inputs': ['Anna Smith', '+380501234567', '', ''], 'id': 1},
+    'not json',
+    '["add"]',
+    {'command': 'add', 'inputs': 'Bob'},
+    {'command': 'fly away', 'id': 2},
+    {'command': 'add_phone', 'inputs': ['Anna Smith', '123'], 'id': 3},
+    {'command': 'find', 'inputs': ['1', 'anna'], 'id': 4},
+]
+
+
+def batch_lines(commands) -> str:
+    return ''.join((command if isinstance(command, str) else json.dumps(command)) + '\n\n' for command in commands)
+
+
+@pytest.mark.parametrize('line, error', [
+    ('{"command": "all"', "The line is not JSON"),
+    ('["all"]', "Expected an object with a 'command' string"),
+    ('{"command": 7}', "Expected an object with a 'command' string"),
+    ('{"command": "all", "inputs": "x"}', "The 'inputs' must be a list"),
+])
+def test_lines_that_are_not_commands_are_reported(line, error):
+    command, message = parse_batch_command(line)
+    assert command is None and message.startswith(error)
+
+
+def test_a_json_string_is_a_command_without_inputs():
+    assert parse_batch_command('"all"') == ({'command': 'all'}, None)
+
+
+def test_every_line_gets_a_result_and_the_failures_are_counted(tmp_path):
+    file_handler = AddressBookFileHandler(str(tmp_path / 'book.json'))
+    bot = BotAdressBook(BatchUserViewer(), AddressBook(), file_handler)
+    output = io.StringIO()
+    failed = bot.run_batch(read_batch_commands(io.StringIO(batch_lines(COMMANDS))), output)
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert failed == 5
+    assert [result['line'] for result in results] == [1, 3, 5, 7, 9, 11, 13]
+    assert [result['ok'] for result in results] == [True, False, False, False, False, False, True]
+    assert results[0]['added'] == ['Anna Smith']
+    assert results[1]['errors'][0].startswith("The line is not JSON")
+    assert results[4]['id'] == 2 and results[4]['errors'] == ["There is no such command fly"]
+    assert results[6]['messages'][-1] == "Search results: Anna Smith"
+    saved = file_handler.load_from_file(AddressBook())
+    assert [record.name.value for record in saved] == ['Anna Smith']
+
+
+def test_exit_stops_the_batch(tmp_path):
+    bot = BotAdressBook(BatchUserViewer(), AddressBook(), AddressBookFileHandler(str(tmp_path / 'book.json')))
+    output = io.StringIO()
+    lines = batch_lines(['"exit"', {'command': 'add', 'inputs': ['Anna Smith']}])
+    assert bot.run_batch(read_batch_commands(io.StringIO(lines)), output) == 0
+    assert [json.loads(line)['exit'] for line in output.getvalue().splitlines()] == [True]
+
+
+@pytest.mark.parametrize('commands, exit_code', [(COMMANDS[:1], 0), (COMMANDS, 1)])
+def test_the_exit_code_tells_whether_a_command_failed(tmp_path, monkeypatch, capsys, commands, exit_code):
+    monkeypatch.setattr(address_book, 'create_file_handler',
+                        lambda: AddressBookFileHandler(str(tmp_path / 'book.json')))
+    monkeypatch.setattr(address_book, 'create_change_feed', lambda: None)
+    batch = tmp_path / 'commands.ndjson'
+    batch.write_text(batch_lines(commands), encoding='utf-8')
+    assert run_batch_file(str(batch)) == exit_code
+    assert len(capsys.readouterr().out.splitlines()) == len(commands)
@@ -0,0 +1,69 @@
+from datetime import date
+
+import pytest
+
+from binary_snapshot import BinarySnapshotFileHandler, MappedSnapshot
+from classess_ab import AddressBook, Record
+
+
+@pytest.fixture
+def book():
+    book = AddressBook()
+    book.add_record(Record('Ann Lee', '+380501234567', '01.03.1990', 'ann@x.com'))
+    book.add_record(Record('Leap Guy', '+380671112233', '29.02.2000'))
+    book.add_record(Record('ann lee ', '+380501234568'))
+    book.add_record(Record('Old Timer', None, '05.03.0099'))
+    many = Record('Many Phones', '+380000000000')
+    for index in range(1, 300):
+        many.add_phone_number(f'+380{index:09}')
+    book.add_record(many)
+    return book
+
+
+@pytest.mark.parametrize('lazy', [True, False], ids=['lazy', 'eager'])
+def test_snapshot_round_trips_every_record(book, tmp_path, lazy):
+    file_name = str(tmp_path / 'book.snap')
+    BinarySnapshotFileHandler(file_name).save_to_file(book)
+    loaded = BinarySnapshotFileHandler(file_name, lazy).load_from_file(AddressBook())
+    assert sorted(str(record) for record in loaded) == sorted(str(record) for record in book)
+    assert len(loaded.get_record_by_name('Many Phones').phones) == 300
+    assert loaded.get_record_by_name('Old Timer').birthday.value == '05.03.0099'
+
+
+def test_snapshot_answers_lookups_from_its_tables(book, tmp_path):
+    file_name = str(tmp_path / 'book.snap')
+    BinarySnapshotFileHandler(file_name).save_to_file(book)
+    snapshot = MappedSnapshot(file_name)
+    assert len(snapshot) == 5
+    assert list(snapshot) == sorted(snapshot, key=lambda name: name.encode('utf-8'))
+    assert snapshot['Ann Lee'] == (('+380501234567',), '01.03.1990', 'ann@x.com')
+    assert 'Nobody' not in snapshot
+    assert sorted(snapshot.names_with_folded_name('ann lee')) == ['Ann Lee', 'ann lee ']
+    assert snapshot.names_with_birthday(date(2023, 2, 28)) == ['Leap Guy']
+    assert sorted(snapshot.names_with_birthday(date(2024, 3, 5))) == ['Old Timer']
+    snapshot.close()
+
+
+def test_a_record_that_cannot_be_packed_is_skipped_and_reported(book, tmp_path):
+    file_name = str(tmp_path / 'book.snap')
+    handler = BinarySnapshotFileHandler(file_name)
+    book.add_raw_source({'Bad Phone': (('+38050123456789012345',), None, None)}, validated=True)
+    handler.save_to_file(book)
+    assert [name for name, _ in handler.last_save_skipped] == ['Bad Phone']
+    assert len(MappedSnapshot(file_name)) == 5
+    assert not (tmp_path / 'book.snap.tmp').exists()
+
+
+def test_a_lazily_loaded_book_is_saved_over_its_own_snapshot(book, tmp_path):
+    file_name = str(tmp_path / 'book.snap')
+    handler = BinarySnapshotFileHandler(file_name)
+    handler.save_to_file(book)
+    loaded = handler.load_from_file(AddressBook())
+    loaded.get_record_by_name('Ann Lee').add_email('lee@x.com')
+    loaded.remove_record('Leap Guy')
+    handler.save_to_file(loaded)
+    assert not handler.last_save_skipped
+    assert loaded.get_record_by_name('Old Timer').birthday.value == '05.03.0099'
+    assert len(loaded) == 4
+    reloaded = BinarySnapshotFileHandler(file_name).load_from_file(AddressBook())
+    assert sorted(str(record) for record in reloaded) == sorted(str(record) for record in loaded)
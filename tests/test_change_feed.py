@@ -0,0 +1,76 @@
+import pytest
+
+from change_feed import ChangeFeed, CursorExpiredError
+from classess_ab import AddressBook, Record
+
+
+@pytest.fixture
+def feed_name(tmp_path):
+    return str(tmp_path / 'changes.ndjson')
+
+
+def test_changes_of_the_book_become_events(feed_name):
+    feed = ChangeFeed(feed_name)
+    book = AddressBook()
+    feed.attach(book)
+    book.add_record(Record('Ann Lee', '+380501234567'))
+    book.get_record_by_name('Ann Lee').add_email('ann@x.com')
+    book.remove_record('Ann Lee')
+    feed.close()
+    events = ChangeFeed(feed_name).read()
+    assert [(event['seq'], event['op']) for event in events] == [(1, 'add'), (2, 'change'), (3, 'remove')]
+    assert events[1]['field'] == 'email' and events[1]['new'] == 'ann@x.com'
+
+
+def test_consumers_resume_from_their_cursors(feed_name):
+    feed = ChangeFeed(feed_name)
+    for index in range(5):
+        feed.append({'op': 'remove', 'name': f'Name {index}'})
+    feed.commit('crm', 3)
+    feed.close()
+    reopened = ChangeFeed(feed_name)
+    assert [event['seq'] for event in reopened.read_for('crm')] == [4, 5]
+    assert reopened.read_for('new', limit=2)[-1]['seq'] == 2
+    assert reopened.append({'op': 'remove', 'name': 'Another'}) == 6
+    reopened.close()
+
+
+def test_old_events_expire(feed_name):
+    feed = ChangeFeed(feed_name, max_events=2)
+    for index in range(7):
+        feed.append({'op': 'remove', 'name': f'Name {index}'})
+    feed.close()
+    reopened = ChangeFeed(feed_name, max_events=2)
+    assert [event['seq'] for event in reopened.read(5)] == [6, 7]
+    with pytest.raises(CursorExpiredError):
+        reopened.read(1)
+    reopened.close()
+
+
+def test_a_torn_last_line_is_cut_off(feed_name):
+    feed = ChangeFeed(feed_name)
+    feed.append({'op': 'remove', 'name': 'Ann Lee'})
+    feed.close()
+    with open(feed_name, 'a') as file:
+        file.write('{"seq": 2, "op": "rem')
+    reopened = ChangeFeed(feed_name)
+    assert reopened.append({'op': 'remove', 'name': 'Bob Ray'}) == 2
+    reopened.close()
+    assert [event['name'] for event in ChangeFeed(feed_name).read()] == ['Ann Lee', 'Bob Ray']
+
+
+def test_sequence_numbers_go_on_after_the_committed_cursor(feed_name):
+    feed = ChangeFeed(feed_name)
+    for index in range(3):
+        feed.append({'op': 'remove', 'name': f'Name {index}'})
+    feed.commit('crm', 3)
+    feed.close()
+    with open(feed_name, 'w') as file:
+        file.write('{"seq": 1, "time": 0, "op": "remove", "name": "Name 0"}\n')
+    reopened = ChangeFeed(feed_name)
+    assert reopened.last_seq == 3
+    assert reopened.read_for('crm') == []
+    with pytest.raises(CursorExpiredError):
+        reopened.read(0)
+    assert reopened.append({'op': 'remove', 'name': 'Another'}) == 4
+    reopened.close()
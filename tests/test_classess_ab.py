@@ -0,0 +1,35 @@
+import pytest
+
+from classess_ab import AddressBook, Record
+
+
+@pytest.fixture
+def book():
+    book = AddressBook()
+    for letter in 'ABCDE':
+        book.add_record(Record(f'Name {letter}', '+380501234567'))
+    return book
+
+
+def names(records) -> list:
+    return [record.name.value for record in records]
+
+
+def test_iterator_yields_chunks_of_n_records(book):
+    assert [names(chunk) for chunk in book.iterator(2)] == [['Name A', 'Name B'], ['Name C', 'Name D'], ['Name E']]
+    assert [names(chunk) for chunk in book.iterator(5)] == [names(book)]
+    assert list(AddressBook().iterator(3)) == []
+
+
+@pytest.mark.parametrize('n', [0, -1])
+def test_iterator_rejects_a_chunk_size_below_one(book, n):
+    with pytest.raises(ValueError):
+        book.iterator(n)
+
+
+def test_adding_a_record_while_iterating_a_dict_backed_book_raises(book):
+    records = iter(book)
+    next(records)
+    book.add_record(Record('Name F'))
+    with pytest.raises(RuntimeError):
+        next(records)
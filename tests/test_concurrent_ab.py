@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pytest
+
+from classess_ab import Record
+from concurrent_ab import ConcurrentAddressBook, ReadWriteLock
+
+
+def run_in_thread(target: callable) -> threading.Thread:
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_readers_share_the_lock():
+    lock = ReadWriteLock()
+    both_reading = threading.Barrier(2, timeout=2)
+
+    def read():
+        with lock.reading():
+            both_reading.wait()
+
+    threads = [run_in_thread(read) for _ in range(2)]
+    for thread in threads:
+        thread.join()
+    assert not both_reading.broken
+
+
+def test_a_writer_excludes_readers_and_other_writers():
+    lock = ReadWriteLock()
+    events = []
+    with lock.writing():
+        threads = [run_in_thread(lambda: (lock.acquire_read(), events.append('read'), lock.release_read())),
+                   run_in_thread(lambda: (lock.acquire_write(), events.append('write'), lock.release_write()))]
+        time.sleep(0.1)
+        events.append('released')
+    for thread in threads:
+        thread.join(2)
+    assert events[0] == 'released' and sorted(events[1:]) == ['read', 'write']
+
+
+def test_a_waiting_writer_goes_before_new_readers():
+    lock = ReadWriteLock()
+    events = []
+    lock.acquire_read()
+    writer = run_in_thread(lambda: (lock.acquire_write(), events.append('write'), lock.release_write()))
+    time.sleep(0.1)
+    reader = run_in_thread(lambda: (lock.acquire_read(), events.append('read'), lock.release_read()))
+    time.sleep(0.1)
+    assert events == []
+    lock.release_read()
+    writer.join(2)
+    reader.join(2)
+    assert events == ['write', 'read']
+
+
+def test_both_sides_are_reentrant_and_a_writer_may_read():
+    lock = ReadWriteLock()
+    with lock.writing(), lock.writing(), lock.reading(), lock.reading():
+        pass
+    with lock.reading(), lock.reading():
+        pass
+    with lock.writing():
+        pass
+
+
+def test_a_reader_cannot_start_writing():
+    lock = ReadWriteLock()
+    with lock.reading():
+        with pytest.raises(RuntimeError):
+            lock.acquire_write()
+    with lock.writing():
+        pass
+
+
+def test_record_mutators_wait_for_the_readers_of_the_book():
+    book = ConcurrentAddressBook()
+    book.add_record(Record('Anna Smith', '+380501234567'))
+    record = book.get_record_by_name('Anna Smith')
+    changed = threading.Event()
+    with book.lock.reading():
+        thread = run_in_thread(lambda: (record.add_phone_number('+380501230000'), changed.set()))
+        assert not changed.wait(0.1)
+    thread.join(2)
+    assert changed.is_set()
+    assert book.get_records_by_phone('+380501230000') == [record]
+
+
+def test_concurrent_changes_keep_the_indexes_consistent():
+    book = ConcurrentAddressBook()
+    names = [f'Name {chr(65 + index // 26)}{chr(65 + index % 26)}' for index in range(200)]
+
+    def add(part: list):
+        for name in part:
+            book.add_record(Record(name, '+380501234567'))
+            book.find_records(name=name.lower())
+            book.get_record_by_name(name).add_phone_number('+380671112233')
+
+    threads = [run_in_thread(lambda part=names[offset::4]: add(part)) for offset in range(4)]
+    for thread in threads:
+        thread.join()
+    assert len(book) == 200
+    assert len(book.get_records_by_phone('+380671112233')) == 200
+    assert [record.name.value for record in book.find_records(name='name ab')] == ['Name AB']
+
+
+def test_iterator_takes_a_copy_and_rejects_a_chunk_size_below_one():
+    book = ConcurrentAddressBook()
+    for letter in 'ABC':
+        book.add_record(Record(f'Name {letter}'))
+    chunks = book.iterator(2)
+    book.add_record(Record('Name D'))
+    assert [[record.name.value for record in chunk] for chunk in chunks] == [['Name A', 'Name B'], ['Name C']]
+    with pytest.raises(ValueError):
+        book.iterator(0)
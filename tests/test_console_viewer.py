@@ -0,0 +1,44 @@
+import threading
+
+import pytest
+
+pytest.importorskip('colorama')
+pytest.importorskip('prompt_toolkit')
+
+from autosave import Autosaver
+from classess_ab import AddressBook, AddressBookFileHandler
+from console_viewer import ConsoleUserViewer
+
+
+def test_the_pager_prompt_releases_the_autosave_lock(tmp_path, monkeypatch):
+    autosaver = Autosaver(AddressBook(), AddressBookFileHandler(str(tmp_path / 'book.json')))
+    viewer = ConsoleUserViewer(page_size=2)
+    prompts = []
+
+    def get_data_input(prompt):
+        # Another thread can take the lock only if the prompt released it
+        taken = threading.Thread(target=lambda: prompts.append(autosaver.lock.acquire(timeout=1)
+                                                               and autosaver.lock.release() is None))
+        taken.start()
+        taken.join()
+        return 'q' if len(prompts) == 2 else ''
+
+    monkeypatch.setattr(viewer, 'get_data_input', get_data_input)
+    monkeypatch.setattr('sys.stdout.isatty', lambda: True)
+    autosaver.watch_input(viewer)
+    printed = []
+    monkeypatch.setattr('builtins.print', printed.append)
+    with autosaver.lock:
+        viewer.page(f'line {number}' for number in range(10))
+    assert prompts == [True, True]
+    assert printed == ['line 0', 'line 1', 'line 2', 'line 3']
+
+
+@pytest.mark.parametrize('entered, expected', [
+    ('  LOAD ./Books/Old.json ', 'load ./Books/Old.json'),
+    ('Add_Email Anna A@x.com', 'add_email Anna A@x.com'),
+    ('ALL', 'all'),
+])
+def test_only_the_command_is_lowercased(monkeypatch, entered, expected):
+    monkeypatch.setattr('console_viewer.prompt', lambda *args, **kwargs: entered)
+    assert ConsoleUserViewer().get_user_input() == expected
@@ -0,0 +1,48 @@
+import pytest
+
+from commands import COMMANDS
+from dispatcher import CommandDispatcher
+
+
+@pytest.fixture
+def dispatcher():
+    dispatcher = CommandDispatcher()
+    for alias in ['add', 'add_email', 'add phone', 'Remove', 'r']:
+        dispatcher.add(alias, alias)
+    return dispatcher
+
+
+@pytest.mark.parametrize('user_input, expected', [
+    ('add', ('add', '')),
+    ('add Anna Smith', ('add', 'Anna Smith')),
+    ('add_email Anna a@x.com', ('add_email', 'Anna a@x.com')),
+    ('add phone Anna +380501234567', ('add phone', 'Anna +380501234567')),
+    ('add phonebook', ('add', 'phonebook')),
+    ('ADD_Email  Anna ', ('add_email', 'Anna')),
+    ('remove ./Books/Old.json', ('Remove', './Books/Old.json')),
+    ('r x', ('r', 'x')),
+])
+def test_the_longest_alias_followed_by_a_space_wins(dispatcher, user_input, expected):
+    assert dispatcher.resolve(user_input) == expected
+
+
+@pytest.mark.parametrize('user_input', ['', 'ad', 'addx', 'add_', 'add_emails', 'rem', 'removed x', ' add'])
+def test_a_prefix_of_an_alias_or_a_longer_word_resolves_to_nothing(dispatcher, user_input):
+    assert dispatcher.resolve(user_input) is None
+
+
+def test_adding_an_alias_again_replaces_its_handler(dispatcher):
+    dispatcher.add('ADD', 'other')
+    assert dispatcher.resolve('add x') == ('other', 'x')
+    assert dispatcher.aliases.count('add') == 1
+
+
+def test_every_command_resolves_to_its_handler():
+    class Target:
+        def __getattr__(self, name):
+            return name
+
+    dispatcher = CommandDispatcher.from_commands(COMMANDS, Target())
+    for command, aliases in COMMANDS.items():
+        for alias in aliases:
+            assert dispatcher.resolve(f'{alias} argument') == (f'handle_{command}', 'argument')
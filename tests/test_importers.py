@@ -0,0 +1,45 @@
+import csv
+
+from classess_ab import AddressBook, Record
+from importers import REJECTED_COLUMNS, ContactImporter
+
+
+def write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        csv.writer(file).writerows([['Full Name', 'Mobile', 'E-mail', 'Date of Birth'], *rows])
+
+
+def read_rejected(path):
+    with open(path, encoding='utf-8', newline='') as file:
+        return list(csv.reader(file))
+
+
+def test_rejected_rows_are_written_with_their_reasons(tmp_path):
+    book = AddressBook()
+    book.add_record(Record('Anna Smith'))
+    path = tmp_path / 'contacts.csv'
+    write_csv(path, [['Bob Ray', '+38 (067) 111-22-33', 'bob@x.com', '1985-12-01'],
+                     ['anna smith', '', '', ''],
+                     ['Ørjan Åsheim', '+380501234567', 'ørjan@x', '31.02.1990'],
+                     ['Carl Fox', '12', '', '']])
+    stats = ContactImporter(book, batch_size=2).import_file(str(path))
+    assert (stats.rows, stats.imported, stats.rejected) == (4, 1, 3)
+    assert book.get_record_by_name('Bob Ray').birthday.value == '01.12.1985'
+    header, *rejected = read_rejected(stats.rejected_path)
+    assert header == REJECTED_COLUMNS
+    assert [row[:2] for row in rejected] == [['3', 'anna smith'], ['4', 'Ørjan Åsheim'], ['5', 'Carl Fox']]
+    assert rejected[0][-1] == "A contact with that name already exists."
+    assert rejected[1][-1] == "Name is not valid. Date of birth is not valid. Email is not valid."
+    assert rejected[2][-1] == "Phone numbers are not valid."
+
+
+def test_an_import_without_rejected_rows_removes_the_stale_file(tmp_path):
+    path = tmp_path / 'contacts.csv'
+    write_csv(path, [['Carl Fox', '12', '', '']])
+    stats = ContactImporter(AddressBook()).import_file(str(path))
+    assert stats.rejected_path.exists()
+    write_csv(path, [['Carl Fox', '+380501234567', '', '']])
+    stats = ContactImporter(AddressBook()).import_file(str(path))
+    assert stats.rejected == 0
+    assert not stats.rejected_path.exists()
+    assert 'rejected' not in str(stats)
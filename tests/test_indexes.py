@@ -0,0 +1,130 @@
+from datetime import date, timedelta
+
+import random
+
+import pytest
+
+from classess_ab import AddressBook, Record
+from indexes import BirthdayIndex, DeleteIndex, NgramIndex, celebration_date, edit_distance
+
+
+def levenshtein(first: str, second: str) -> int:
+    previous = list(range(len(second) + 1))
+    for row, char in enumerate(first, 1):
+        current = [row]
+        for column, other in enumerate(second, 1):
+            current.append(min(previous[column] + 1, current[column - 1] + 1, previous[column - 1] + (char != other)))
+        previous = current
+    return previous[-1]
+
+
+def random_texts(rng: random.Random, count: int) -> dict:
+    return {f'key{index}': ' '.join(''.join(rng.choice('abcde') for _ in range(rng.randint(1, 8)))
+                                    for _ in range(rng.randint(1, 3)))
+            for index in range(count)}
+
+
+def test_ngram_index_matches_substring_scan():
+    rng = random.Random(1)
+    texts = random_texts(rng, 300)
+    index = NgramIndex()
+    for key, text in texts.items():
+        index.add(key, text)
+    for key in list(texts)[::3]:
+        index.remove(key, texts.pop(key))
+    for query in ['a', 'ab', 'abc', 'dead', 'e a', 'cc', 'bad', 'x', '']:
+        expected = {key for key, text in texts.items() if query and query in text}
+        assert index.search(query, lambda key: [texts[key]]) == expected
+
+
+def test_ngram_index_keeps_grams_shared_by_the_other_texts_of_a_key():
+    texts = {'k': ['abcd', 'bcde']}
+    index = NgramIndex()
+    for text in texts['k']:
+        index.add('k', text)
+    texts['k'].remove('abcd')
+    index.remove('k', 'abcd', texts['k'])
+    assert index.search('bcd', texts.get) == {'k'}
+    assert index.search('abc', texts.get) == set()
+    texts['k'].remove('bcde')
+    index.remove('k', 'bcde', texts['k'])
+    assert index.search('bc', texts.get) == set()
+    assert not index._postings
+
+
+def test_book_substring_search_follows_changes():
+    book = AddressBook()
+    book.add_record(Record('Anna Smith', '+380501234567'))
+    book.add_record(Record('Bob Ray', '+380671112233'))
+    assert [record.name.value for record in book.find_records(phones='1234567')] == ['Anna Smith']
+    anna = book.get_record_by_name('Anna Smith')
+    anna.add_phone_number('+380501230000')
+    anna.change_phone_number('+380501234567', '+380679990000')
+    book.remove_record('Bob Ray')
+    book.add_record(Record('Bobby Lee', '+380671112233'))
+    assert book.find_records(phones='1234567') == []
+    assert [record.name.value for record in book.find_records(phones='0501230')] == ['Anna Smith']
+    assert [record.name.value for record in book.find_records(phones='99900')] == ['Anna Smith']
+    assert [record.name.value for record in book.find_records(name='bob')] == ['Bobby Lee']
+    assert [record.name.value for record in book.find_records(phones='1112233')] == ['Bobby Lee']
+
+
+@pytest.mark.parametrize('first, second', [
+    ('kitten', 'sitting'), ('', 'abc'), ('flaw', 'lawn'), ('same', 'same'), ('abcdef', 'azced')])
+def test_edit_distance_is_levenshtein_up_to_the_limit(first, second):
+    distance = levenshtein(first, second)
+    for max_distance in range(4):
+        assert edit_distance(first, second, max_distance) == min(distance, max_distance + 1)
+
+
+@pytest.mark.parametrize('max_distance', [0, 1, 2])
+def test_delete_index_matches_brute_force(max_distance):
+    rng = random.Random(max_distance)
+    texts = random_texts(rng, 300)
+    index = DeleteIndex(max_distance=2, prefix=4)
+    for key, text in texts.items():
+        index.add(key, text)
+    for key in list(texts)[::4]:
+        index.remove(key, texts.pop(key))
+    for query in ['abcd', 'eeb', 'a dd', 'bacde', 'ca ebd']:
+        expected = {}
+        for key, text in texts.items():
+            distances = [min(levenshtein(word, other) for other in text.split()) for word in query.split()]
+            if max(distances) <= max_distance:
+                expected[key] = sum(distances)
+        assert index.search(query, max_distance) == expected
+
+
+def test_delete_index_rejects_a_larger_distance_than_built_for():
+    with pytest.raises(ValueError):
+        DeleteIndex(max_distance=1).search('abc', 2)
+
+
+def test_birthday_index_groups_upcoming_birthdays_by_date():
+    index = BirthdayIndex()
+    index.add('a', '01.03.1990')
+    index.add('b', '29.02.2000')
+    index.add('c', '28.02.1985')
+    index.add('d', '02.03.1970')
+    index.remove('d', '02.03.1970')
+    upcoming = index.upcoming(date(2023, 2, 27), 4)
+    assert upcoming == {date(2023, 2, 28): {'b', 'c'}, date(2023, 3, 1): {'a'}}
+    assert index.upcoming(date(2024, 2, 28), 2) == {date(2024, 2, 28): {'c'}, date(2024, 2, 29): {'b'}}
+    assert index.on_date(date(2023, 3, 2)) == set()
+
+
+def test_birthday_index_matches_celebration_dates():
+    rng = random.Random(3)
+    start = date(2023, 1, 1)
+    birthdays = {f'key{i}': start + timedelta(days=rng.randrange(1461)) for i in range(200)}
+    index = BirthdayIndex()
+    for key, birthday in birthdays.items():
+        index.add(key, birthday.strftime('%d.%m.%Y'))
+    today = date(2025, 2, 20)
+    expected = {}
+    for key, birthday in birthdays.items():
+        for year in (today.year, today.year + 1):
+            day = celebration_date(birthday.month, birthday.day, year)
+            if today <= day < today + timedelta(days=30):
+                expected.setdefault(day, set()).add(key)
+    assert index.upcoming(today, 30) == expected
@@ -0,0 +1,114 @@
+import pytest
+
+from classess_ab import AddressBook, AddressBookLoadError, Record
+from journal import JournalFileHandler
+
+
+@pytest.fixture(params=[True, False], ids=['lazy', 'eager'])
+def handler(request, tmp_path):
+    return JournalFileHandler(str(tmp_path / 'book.json'), compact_after=3, lazy=request.param)
+
+
+def reload(handler: JournalFileHandler) -> AddressBook:
+    return JournalFileHandler(handler.file_name, handler.compact_after, handler.lazy).load_from_file(AddressBook())
+
+
+def test_changes_are_appended_and_replayed(handler):
+    book = handler.load_from_file(AddressBook())
+    book.add_record(Record('Ann Lee', '+380501234567', '01.02.1990'))
+    book.add_record(Record('Bob Ray', '+380671112233'))
+    handler.save_to_file(book)
+    ann = book.get_record_by_name('Ann Lee')
+    ann.add_email('ann@x.com')
+    ann.change_phone_number('+380501234567', '+380507654321')
+    book.remove_record('Bob Ray')
+    handler.save_to_file(book)
+    handler.wait_for_compaction()
+    assert str(reload(handler)) == str(book)
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(handler):
+    book = handler.load_from_file(AddressBook())
+    for letter in 'ABCDE':
+        book.add_record(Record(f'Name {letter}', '+380501234567'))
+        handler.save_to_file(book)
+    handler.wait_for_compaction()
+    assert handler.snapshot_path.exists()
+    book.get_record_by_name('Name A').add_email('zero@x.com')
+    handler.save_to_file(book)
+    handler.wait_for_compaction()
+    assert str(reload(handler)) == str(book)
+
+
+def test_a_torn_last_line_is_cut_off(handler):
+    book = handler.load_from_file(AddressBook())
+    book.add_record(Record('Ann Lee', '+380501234567'))
+    handler.save_to_file(book)
+    with open(handler.journal_path, 'a') as file:
+        file.write('{"seq": 2, "op": "remo')
+    reloaded_handler = JournalFileHandler(handler.file_name, handler.compact_after, handler.lazy)
+    reloaded = reloaded_handler.load_from_file(AddressBook())
+    assert [record.name.value for record in reloaded] == ['Ann Lee']
+    assert handler.journal_path.read_text().endswith('\n')
+    reloaded.add_record(Record('Bob Ray', '+380671112233'))
+    reloaded_handler.save_to_file(reloaded)
+    assert [record.name.value for record in reload(handler)] == ['Ann Lee', 'Bob Ray']
+
+
+def test_a_book_loaded_elsewhere_is_saved_as_a_snapshot(handler):
+    book = AddressBook()
+    book.add_record(Record('Ann Lee', '+380501234567'))
+    handler.save_to_file(book)
+    assert handler.snapshot_path.exists()
+    assert not handler.journal_path.exists()
+    book.add_record(Record('Bob Ray', '+380671112233'))
+    handler.save_to_file(book)
+    assert str(reload(handler)) == str(book)
+
+
+def test_loading_a_snapshot_keeps_the_statistics(handler):
+    book = AddressBook()
+    for letter in 'ABC':
+        book.add_record(Record(f'Name {letter}', '+380501234567'))
+    handler.save_to_file(book)
+    with open(handler.snapshot_path, 'a') as file:
+        file.write('{"name": "Bad Email", "phones": [], "birthday": null, "email": "not an email"}\n')
+    reports = []
+    reloaded_handler = JournalFileHandler(handler.file_name, handler.compact_after, handler.lazy)
+    reloaded = reloaded_handler.load_from_file(AddressBook(), progress=reports.append)
+    stats = reloaded_handler.last_load_stats
+    assert reports[-1] is stats
+    assert stats.bytes_read == handler.snapshot_path.stat().st_size
+    if handler.lazy:
+        assert (stats.loaded, stats.skipped, stats.lazy) == (4, 0, True)
+    else:
+        assert (stats.loaded, stats.skipped, stats.lazy) == (3, 1, False)
+    assert sorted(reloaded.data) == ['Name A', 'Name B', 'Name C']
+
+
+def test_loading_with_abort_stops_at_an_invalid_record(handler):
+    book = AddressBook()
+    book.add_record(Record('Ann Lee', '+380501234567'))
+    handler.save_to_file(book)
+    with open(handler.snapshot_path, 'a') as file:
+        file.write('{"name": "Bad Email", "phones": [], "birthday": null, "email": "not an email"}\n')
+    reloaded_handler = JournalFileHandler(handler.file_name, handler.compact_after, handler.lazy)
+    with pytest.raises(AddressBookLoadError):
+        reloaded_handler.load_from_file(AddressBook(), on_error='abort')
+    assert reloaded_handler.last_load_stats.aborted
+
+
+def test_reloading_into_a_fresh_book_journals_nothing(handler):
+    book = handler.load_from_file(AddressBook())
+    book.add_record(Record('Ann Lee', '+380501234567'))
+    book.add_record(Record('Bob Ray', '+380671112233'))
+    handler.save_to_file(book)
+    journal_size = handler.journal_path.stat().st_size
+    reloaded = handler.load_from_file(AddressBook())
+    handler.load_from_file(reloaded)
+    handler.save_to_file(reloaded)
+    assert handler.journal_path.stat().st_size == journal_size
+    book.remove_record('Ann Lee')
+    reloaded.remove_record('Bob Ray')
+    handler.save_to_file(reloaded)
+    assert [record.name.value for record in reload(handler)] == ['Ann Lee']
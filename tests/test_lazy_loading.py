@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from binary_snapshot import BinarySnapshotFileHandler
+from classess_ab import AddressBook, AddressBookFileHandler
+
+CONTACTS = {
+    'Anna Smith': {'name': 'Anna Smith', 'phones': ['050-123', '+380501234567', '+380501234567'],
+                   'birthday': '1.2.1990', 'email': None},
+    'Bob Ray': {'name': 'Bob Ray', 'phones': [], 'birthday': '01.12.1985', 'email': 'bob@x.com'},
+    'Bad Date': {'name': 'Bad Date', 'phones': [], 'birthday': '31.02.1990', 'email': None},
+    'Bad Email': {'name': 'Bad Email', 'phones': [], 'birthday': None, 'email': 'not an email'},
+    'X': {'name': 'X', 'phones': [], 'birthday': None, 'email': None},
+}
+
+
+@pytest.fixture
+def file_name(tmp_path):
+    file_name = str(tmp_path / 'book.json')
+    with open(file_name, 'w') as file:
+        json.dump(CONTACTS, file)
+    return file_name
+
+
+@pytest.fixture
+def books(file_name):
+    return (AddressBookFileHandler(file_name, lazy=True).load_from_file(AddressBook()),
+            AddressBookFileHandler(file_name, lazy=False).load_from_file(AddressBook()))
+
+
+@pytest.mark.parametrize('query', [
+    lambda book: sorted(book.data),
+    lambda book: len(book),
+    lambda book: [record.name.value for record in book.find_records(phones='050-123')],
+    lambda book: [record.name.value for record in book.find_records(phones='4567')],
+    lambda book: [record.name.value for record in book.get_records_by_phone('+380501234567')],
+    lambda book: book.get_upcoming_birthdays(366),
+    lambda book: sorted(str(record) for record in book),
+])
+def test_lazy_load_matches_eager_load(books, query):
+    lazy_book, eager_book = books
+    assert query(lazy_book) == query(eager_book)
+
+
+def test_lazy_load_keeps_valid_unpadded_birthdays(books):
+    lazy_book, _ = books
+    assert sorted(lazy_book.data) == ['Anna Smith', 'Bob Ray']
+    assert lazy_book.get_record_by_name('Anna Smith').birthday.value == '01.02.1990'
+
+
+def test_a_lazily_loaded_book_can_be_saved_in_any_format(books, tmp_path):
+    lazy_book, eager_book = books
+    file_name = str(tmp_path / 'book.snap')
+    BinarySnapshotFileHandler(file_name).save_to_file(lazy_book)
+    loaded = BinarySnapshotFileHandler(file_name).load_from_file(AddressBook())
+    assert sorted(str(record) for record in loaded) == sorted(str(record) for record in eager_book)
@@ -0,0 +1,71 @@
+import math
+import random
+
+import pytest
+
+from classess_ab import AddressBook, Record
+from journal import JournalFileHandler
+from metrics import LatencyHistogram, Metrics, written_size
+
+
+def exact_percentile(latencies: list, share: float) -> float:
+    return sorted(latencies)[max(math.ceil(share * len(latencies)), 1) - 1]
+
+
+@pytest.mark.parametrize('share', [0.01, 0.5, 0.9, 0.95, 0.99, 1.0])
+def test_percentiles_are_within_a_bucket_of_the_exact_ones(share):
+    rng = random.Random(24)
+    latencies = [rng.lognormvariate(-7, 1.5) for _ in range(5000)]
+    histogram = LatencyHistogram()
+    for seconds in latencies:
+        histogram.record(seconds)
+    exact = exact_percentile(latencies, share)
+    assert exact <= histogram.percentile(share) <= exact * LatencyHistogram.ratio
+    assert histogram.percentile(share) <= max(latencies)
+
+
+def test_percentiles_of_few_or_tiny_latencies():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(0.5) == 0.0
+    histogram.record(0.0)
+    histogram.record(2e-7)
+    assert histogram.percentile(1.0) == 2e-7
+    histogram.record(0.25)
+    # Latencies up to a microsecond share the first bucket
+    assert histogram.percentile(0.5) == 1e-6
+    assert histogram.percentile(1.0) == 0.25
+    assert (histogram.count, histogram.max) == (3, 0.25)
+
+
+def test_written_size_counts_new_and_replaced_files_whole_and_appends_by_growth():
+    before = {'book.json': (1, 100), 'book.json.journal': (2, 50), 'book.json.old': (3, 10)}
+    after = {'book.json': (4, 120), 'book.json.journal': (2, 80), 'book.json.journal.7': (5, 30)}
+    assert written_size(before, after) == 120 + 30 + 30
+    assert written_size(after, after) == 0
+
+
+def test_watched_handlers_record_their_loads_and_saves(tmp_path):
+    metrics = Metrics()
+    handler = metrics.watch(JournalFileHandler(str(tmp_path / 'book.json')))
+    book = AddressBook()
+    book.add_record(Record('Anna Smith', '+380501234567'))
+    handler.save_to_file(book)
+    snapshot_size = handler.snapshot_path.stat().st_size
+    book.add_record(Record('Bob Ray', '+380671112233'))
+    handler.save_to_file(book)
+    journal_size = handler.journal_path.stat().st_size
+    handler.load_from_file(AddressBook())
+    io = metrics.summary()['io']
+    assert (io['save']['count'], io['save']['bytes']) == (2, snapshot_size + journal_size)
+    assert (io['load']['count'], io['load']['bytes']) == (1, snapshot_size)
+
+
+def test_calls_and_errors_are_counted_per_command():
+    metrics = Metrics()
+    metrics.call('add', lambda: None)
+    with pytest.raises(KeyError):
+        metrics.call('add', lambda: {}['x'])
+    metrics.record_error(ValueError())
+    summary = metrics.summary()
+    assert (summary['commands']['add']['calls'], summary['commands']['add']['errors']) == (2, 1)
+    assert summary['errors'] == {'KeyError': 1, 'ValueError': 1}
@@ -0,0 +1,84 @@
+import asyncio
+import json
+import time
+
+from address_book import BotAdressBook
+from classess_ab import AddressBook, AddressBookFileHandler, Record
+from concurrent_ab import ConcurrentAddressBook
+from server import AddressBookServer
+
+
+async def request(address: tuple, *commands) -> list:
+    reader, writer = await asyncio.open_connection(*address)
+    for command in commands:
+        writer.write(json.dumps(command).encode() + b'\n')
+    await writer.drain()
+    results = [json.loads(await reader.readline()) for _ in commands]
+    writer.close()
+    return results
+
+
+def serve(server: AddressBookServer, client: callable):
+    """
+    Runs the server on a free port, awaits client(address) and stops the server.
+    """
+    async def run():
+        started = asyncio.get_running_loop().create_future()
+        task = asyncio.create_task(server.serve('127.0.0.1', 0, started.set_result))
+        try:
+            return await client(await started)
+        finally:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    return asyncio.run(run())
+
+
+def make_server(tmp_path, address_book: AddressBook = None, save_delay: float = 0.05) -> AddressBookServer:
+    if address_book is None:
+        address_book = ConcurrentAddressBook()
+        address_book.add_record(Record('Anna Smith', '+380501234567'))
+    return AddressBookServer(address_book, AddressBookFileHandler(str(tmp_path / 'book.json')), save_delay)
+
+
+def test_a_slow_read_does_not_hold_up_other_clients(tmp_path, monkeypatch):
+    def handle_get_all_records(self):
+        time.sleep(0.5)
+        return 'slow'
+
+    monkeypatch.setattr(BotAdressBook, 'handle_get_all_records', handle_get_all_records)
+
+    async def client(address):
+        started = time.perf_counter()
+        slow = asyncio.create_task(request(address, {'command': 'all'}))
+        await asyncio.sleep(0.1)
+        [fast] = await request(address, {'command': 'find', 'inputs': ['1', 'anna']})
+        seconds = time.perf_counter() - started
+        return fast, seconds, await slow
+
+    fast, seconds, [slow] = serve(make_server(tmp_path), client)
+    assert fast['ok'] and seconds < 0.4
+    assert slow['result'] == 'slow'
+
+
+def test_writes_are_applied_in_order_and_saved(tmp_path):
+    server = make_server(tmp_path)
+
+    async def client(address):
+        results = await request(address,
+                                {'command': 'add', 'inputs': ['Bob Ray', '+380671112233', '', ''], 'id': 1},
+                                {'command': 'add_phone', 'inputs': ['Bob Ray', '+380671112234'], 'id': 2},
+                                {'command': 'remove', 'inputs': ['Anna Smith'], 'id': 3})
+        await asyncio.sleep(0.3)
+        return results
+
+    results = serve(server, client)
+    assert [result['id'] for result in results] == [1, 2, 3]
+    assert all(result['ok'] for result in results)
+    saved = AddressBookFileHandler(server.file_handler.file_name).load_from_file(AddressBook())
+    assert [record.name.value for record in saved] == ['Bob Ray']
+    assert [phone.value for phone in saved.get_record_by_name('Bob Ray').phones] == ['+380671112233',
+                                                                                     '+380671112234']
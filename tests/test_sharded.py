@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from classess_ab import AddressBook, Record
+from sharded import ShardedFileHandler
+
+
+@pytest.fixture
+def book():
+    book = AddressBook()
+    for letter in 'ABCDEFGHIJ':
+        book.add_record(Record(f'Name {letter}', '+380501234567', '01.03.1990', f'{letter.lower()}@x.com'))
+    return book
+
+
+@pytest.mark.parametrize('lazy', [True, False], ids=['lazy', 'eager'])
+def test_shards_round_trip_every_record(book, tmp_path, lazy):
+    file_name = str(tmp_path / 'book.json')
+    ShardedFileHandler(file_name, shards=3, max_workers=2).save_to_file(book)
+    loaded = ShardedFileHandler(file_name, shards=3, max_workers=2, lazy=lazy).load_from_file(AddressBook())
+    assert sorted(str(record) for record in loaded) == sorted(str(record) for record in book)
+
+
+@pytest.mark.parametrize('lazy', [True, False], ids=['lazy', 'eager'])
+def test_invalid_entries_of_a_shard_are_skipped(book, tmp_path, lazy):
+    file_name = str(tmp_path / 'book.json')
+    handler = ShardedFileHandler(file_name, shards=2, max_workers=1, lazy=lazy)
+    handler.save_to_file(book)
+    shard = handler._shard_paths()[0]
+    with open(shard) as file:
+        entries = json.load(file)
+    entries['Bad Email'] = {'name': 'Bad Email', 'phones': [], 'birthday': None, 'email': 'not an email'}
+    entries['Bad Phone'] = {'name': 'Bad Phone', 'phones': ['not a phone'], 'birthday': None, 'email': None}
+    with open(shard, 'w') as file:
+        json.dump(entries, file)
+    loaded = ShardedFileHandler(file_name, shards=2, max_workers=1, lazy=lazy).load_from_file(AddressBook())
+    assert 'Bad Email' not in loaded
+    assert loaded.get_record_by_name('Bad Phone').phones == []
+    assert len(loaded) == 11
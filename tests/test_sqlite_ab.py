@@ -0,0 +1,136 @@
+from datetime import date, timedelta
+
+import sys
+import threading
+
+import pytest
+
+from classess_ab import AddressBook, AddressBookFileHandler, Record
+from sqlite_ab import SqliteAddressBook, SqliteFileHandler
+
+
+def fill(book: AddressBook) -> None:
+    today = date.today()
+    book.add_record(Record('John Doe', '+380501234567', (today + timedelta(days=2)).strftime('%d.%m.1990'), 'j@x.com'))
+    book.add_record(Record('Anna Smith', '+380671112233'))
+    book.add_record(Record('Leap Guy', None, '29.02.2000'))
+    john = book.get_record_by_name('John Doe')
+    john.add_phone_number('+380501234568')
+    john.change_email('j@x.com', 'k@y.com')
+    anna = book.get_record_by_name('Anna Smith')
+    anna.change_phone_number('+380671112233', '+380679998877')
+    anna.set_birthday((today + timedelta(days=1)).strftime('%d.%m.1991'))
+
+
+def names(records: list) -> list:
+    return [record.name.value for record in records]
+
+
+@pytest.fixture
+def books(tmp_path):
+    memory_book, sqlite_book = AddressBook(), SqliteAddressBook(str(tmp_path / 'book.db'))
+    fill(memory_book)
+    fill(sqlite_book)
+    yield memory_book, sqlite_book
+    sqlite_book.close()
+
+
+@pytest.mark.parametrize('query', [
+    lambda book: book.has_name(' john doe '),
+    lambda book: names(book.find_records(name='OH')),
+    lambda book: names(book.find_records(phones='99988')),
+    lambda book: names(book.find_records(phones='1122')),
+    lambda book: names(book.find_records(name='an', phones='4567')),
+    lambda book: book.get_birthdays_per_week(2),
+    lambda book: book.get_upcoming_birthdays(5),
+    lambda book: len(book),
+    lambda book: 'Leap Guy' in book,
+    lambda book: [str(record) for record in book],
+    lambda book: [names(chunk) for chunk in book.iterator(2)],
+    lambda book: names(book.get_records_by_phone('+380501234568')),
+    lambda book: names(book.get_records_by_email('K@y.com')),
+    lambda book: [(record.name.value, distance) for record, distance in book.find_similar('Jonh Deo', 1)],
+    lambda book: str(book),
+])
+def test_queries_match_the_in_memory_book(books, query):
+    memory_book, sqlite_book = books
+    assert query(sqlite_book) == query(memory_book)
+
+
+@pytest.mark.parametrize('n', [0, -1])
+def test_iterator_rejects_a_chunk_size_below_one(books, n):
+    for book in books:
+        with pytest.raises(ValueError):
+            book.iterator(n)
+
+
+def test_changes_match_the_in_memory_book(books):
+    for book in books:
+        assert book.remove_record('Leap Guy')
+        assert not book.remove_record('Nobody')
+        assert not book.get_record_by_name('John Doe').change_phone_number('+380501234567', 'not a phone')
+        book.get_record_by_name('John Doe').remove_phone_number('+380501234567')
+    memory_book, sqlite_book = books
+    assert str(sqlite_book) == str(memory_book)
+
+
+def test_changes_are_stored(books):
+    memory_book, sqlite_book = books
+    sqlite_book.get_record_by_name('Anna Smith').add_email('anna@x.com')
+    memory_book.get_record_by_name('Anna Smith').add_email('anna@x.com')
+    reopened = SqliteAddressBook(sqlite_book.file_name)
+    assert str(reopened) == str(memory_book)
+    reopened.close()
+
+
+def test_file_handlers_round_trip(books, tmp_path):
+    memory_book, _ = books
+    file_name = str(tmp_path / 'copy.db')
+    SqliteFileHandler(file_name).save_to_file(memory_book)
+    loaded = SqliteFileHandler(file_name).load_from_file(AddressBook())
+    assert str(loaded) == str(memory_book)
+    json_name = str(tmp_path / 'copy.json')
+    AddressBookFileHandler(json_name).save_to_file(memory_book)
+    assert str(AddressBookFileHandler(json_name).load_from_file(AddressBook())) == str(memory_book)
+
+
+def test_cache_is_bounded_and_keeps_records_in_use(tmp_path):
+    book = SqliteAddressBook(str(tmp_path / 'book.db'), cache_size=10)
+    book.add_records({f'Name {letter}{other}': Record(f'Name {letter}{other}', '+380501234567')
+                      for letter in 'ABCDEFGHIJ' for other in 'ABCDEFGHIJ'})
+    held = book.get_record_by_name('Name AA')
+    assert sum(1 for _ in book) == 100
+    assert len(book._cache) == 10
+    assert book.get_record_by_name('Name AA') is held
+    held.add_phone_number('+380501234568')
+    reopened = SqliteAddressBook(book.file_name)
+    assert [phone.value for phone in reopened.get_record_by_name('Name AA').phones] == ['+380501234567',
+                                                                                        '+380501234568']
+    reopened.close()
+    book.close()
+
+
+def test_reads_from_another_thread_never_see_a_record_half_written(tmp_path):
+    book = SqliteAddressBook(str(tmp_path / 'book.db'))
+    book.add_record(Record('Anna Smith', '+380501234567'))
+    missing, stop = [], threading.Event()
+
+    def read():
+        while not stop.is_set():
+            if 'Anna Smith' not in book.data or len(book) != 1:
+                missing.append(True)
+
+    switch_interval = sys.getswitchinterval()
+    # Switching threads as often as possible lets reads fall between the statements of a write
+    sys.setswitchinterval(1e-6)
+    reader = threading.Thread(target=read)
+    reader.start()
+    try:
+        for _ in range(500):
+            book['Anna Smith'] = Record('Anna Smith', '+380501234567')
+    finally:
+        stop.set()
+        reader.join()
+        sys.setswitchinterval(switch_interval)
+        book.close()
+    assert not missing
@@ -0,0 +1,51 @@
+from classess_ab import AddressBook, Record
+from user_interfaces import ContactListModel
+
+
+def row_values(record) -> tuple:
+    return (record.name.value, ', '.join(phone.value for phone in record.phones),
+            record.birthday.value if record.birthday else '-', record.email.value if record.email else '-')
+
+
+def lazy_book(count: int) -> AddressBook:
+    book = AddressBook()
+    book.add_raw_source({f'Name {chr(65 + index // 26)}{chr(65 + index % 26)}':
+                         ((f'+380501234{index:03}',), f'{index % 28 + 1:02}.01.1990', None)
+                         for index in range(count)})
+    return book
+
+
+def test_a_book_is_shown_without_building_the_records_out_of_view():
+    book = lazy_book(200)
+    model = ContactListModel(row_values)
+    model.set_records(book)
+    model.filter('2341')
+    model.sort('birthday')
+    assert not book.data._records
+    assert len(model) == 100
+    rows = model.rows(0, 3)
+    assert [values[2] for values, _ in rows] == ['01.01.1990'] * 3
+    assert all('2341' in values[1] for values, _ in rows)
+    assert len(book.data._records) == 3
+
+
+def test_filter_and_order_match_the_formatted_rows():
+    book = lazy_book(60)
+    model = ContactListModel(row_values)
+    model.set_records(book)
+    model.filter('name b')
+    model.sort('name')
+    model.sort('name')
+    expected = sorted((row_values(record) for record in book if 'name b' in record.name.value.casefold()),
+                      key=lambda values: values[0].casefold(), reverse=True)
+    assert [values for values, _ in model.rows(0, len(model))] == expected
+
+
+def test_a_list_of_records_keeps_its_marks():
+    added, removed = Record('Anna Smith', '+380501234567'), Record('Bob Ray')
+    model = ContactListModel(row_values)
+    model.set_records([added, removed], {id(added): '+', id(removed): '-'})
+    model.sort('name')
+    assert model.rows(0, 10) == [(row_values(added), '+'), (row_values(removed), '-')]
+    model.filter('bob')
+    assert model.rows(0, 10) == [(row_values(removed), '-')]
@@ -0,0 +1,47 @@
+from datetime import date, datetime
+
+import itertools
+import random
+
+import pytest
+
+from validators import is_valid_birthday, parse_birthday, validate_many
+
+TODAY = date(2024, 3, 1)
+DAYS = ['0', '00', '1', '01', ' 1', '001', '9', '28', '29', '30', '31', '32', '1 ', 'a']
+MONTHS = ['0', '00', '1', '01', ' 1', '2', '02', '4', '12', '13', '012', '']
+YEARS = ['1990', '2000', '1900', '2023', '2024', '2025', '0000', '0001', '990', '19900', '+990', ' 990']
+
+
+def strptime_birthday(birthday: str, today: date) -> tuple | None:
+    try:
+        parsed = datetime.strptime(birthday, '%d.%m.%Y').date()
+    except ValueError:
+        return None
+    return None if parsed > today else (parsed.year, parsed.month, parsed.day)
+
+
+def birthdays() -> list:
+    values = ['.'.join(parts) for parts in itertools.product(DAYS, MONTHS, YEARS)]
+    values += ['29.02.2024', '01.03.2024', '02.03.2024', '1.2.1990 ', '1-2-1990', '01.02.1990.', '']
+    rng = random.Random(13)
+    values += [''.join(rng.choice('0123 .9') for _ in range(rng.randint(5, 11))) for _ in range(5000)]
+    return values
+
+
+def test_parse_birthday_accepts_what_strptime_accepts():
+    for birthday in birthdays():
+        assert parse_birthday(birthday, TODAY) == strptime_birthday(birthday, TODAY), birthday
+
+
+@pytest.mark.parametrize('birthday', [None, 1990, ['01.01.1990']])
+def test_parse_birthday_rejects_values_that_are_not_strings(birthday):
+    assert parse_birthday(birthday) is None
+    assert not is_valid_birthday(birthday)
+
+
+def test_validate_many_matches_the_single_value_check():
+    values = [None, *birthdays()[:500]]
+    today = date.today()
+    assert validate_many('birthday', values) == [index for index, value in enumerate(values)
+                                                 if value is not None and strptime_birthday(value, today) is None]
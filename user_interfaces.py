@@ -1,12 +1,144 @@
 from abc import ABC, abstractmethod
-import tkinter as tk
-from tkinter import simpledialog
-
-from colorama import Fore
-from prompt_toolkit.completion import NestedCompleter
-from prompt_toolkit import prompt
-
-from commands import COMMANDS, COMMAND_DESCRIPTIONS
+from collections.abc import Mapping
+from importlib import import_module
+
+
+class RowCache:
+    """
+    Caches the formatted rows of records. A record's row is dropped when the
+    record is changed through its mutators, which the cache listens to, so a
+    row is formatted again only after a change. At most 'max_size' rows are
+    kept; once the cache is full, the rows of further records are formatted
+    without being cached, so paging through a large book does not push out
+    the rows of the first pages.
+    Args:
+        format_row: Formats the row of a record.
+        max_size: The largest number of rows kept.
+    """
+
+    def __init__(self, format_row: callable, max_size: int = 10000):
+        self.format_row = format_row
+        self.max_size = max_size
+        self._rows = {}
+        self._listener = self._on_record_changed
+
+    def row(self, record) -> str:
+        """
+        Returns the formatted row of a record, formatting it if it is not cached.
+        """
+        # The entry keeps the record alive, so its id is not reused while it is cached.
+        entry = self._rows.get(id(record))
+        if entry is not None:
+            return entry[1]
+        row = self.format_row(record)
+        if len(self._rows) < self.max_size:
+            record.subscribe(self._listener)
+            self._rows[id(record)] = (record, row)
+        return row
+
+    def _on_record_changed(self, record, field, old_value, new_value) -> None:
+        if self._rows.pop(id(record), None) is not None:
+            record.unsubscribe(self._listener)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+class ContactListModel:
+    """
+    The contacts shown by a list view: the records, narrowed by a filter
+    and ordered by a column on the model side, so a view asks only for the
+    rows of its visible window and never holds more than that.
+    Of an address book, the model keeps only the names: the filter and the
+    order are worked out from the raw fields of the records, and a record
+    is built and its row formatted only when its row is asked for.
+    Args:
+        row_values: Returns the (name, phones, birthday, email) column values of a record.
+    """
+
+    columns = ('name', 'phones', 'birthday', 'email')
+
+    def __init__(self, row_values: callable):
+        self.row_values = row_values
+        self.query = ''
+        self.sort_column = None
+        self.sort_reverse = False
+        self._book = None
+        self._raw_items = None
+        self._records = []
+        self._marks = {}
+        self._shown = []
+
+    def set_records(self, records, marks: dict = None) -> None:
+        """
+        Replaces the records, an address book or a list of records, keeping the filter and the order.
+        'marks' maps the ids of records to a mark shown with their rows.
+        """
+        data = getattr(records, 'data', None)
+        if isinstance(data, Mapping) and hasattr(records, 'raw_items'):
+            self._book, self._raw_items, self._records = data, records.raw_items, []
+        else:
+            self._book, self._raw_items, self._records = None, None, list(records)
+        self._marks = marks or {}
+        self._refresh()
+
+    def filter(self, query: str) -> None:
+        """
+        Shows only the records with a column containing the query, ignoring case.
+        """
+        self.query = query.strip().casefold()
+        self._refresh()
+
+    def sort(self, column: str) -> None:
+        """
+        Orders the records by a column; sorting by the same column again reverses the order.
+        """
+        self.sort_reverse = not self.sort_reverse if column == self.sort_column else False
+        self.sort_column = column
+        self._refresh()
+
+    def _sort_key(self, values: tuple):
+        value = values[self.columns.index(self.sort_column)]
+        if self.sort_column == 'birthday' and value != '-':
+            day, month, year = value.split('.')
+            return f'{year}{month}{day}'
+        return value.casefold()
+
+    def _items(self):
+        """
+        Yields (name or record, column values) of all the records; the values
+        of the records of a book come from their raw fields, without building them.
+        """
+        if self._book is None:
+            for record in self._records:
+                yield record, self.row_values(record)
+            return
+        for name, (phones, birthday, email) in self._raw_items():
+            yield name, (name, ', '.join(phones), birthday or '-', email or '-')
+
+    def _refresh(self) -> None:
+        if not self.query and self.sort_column is None:
+            self._shown = list(self._book) if self._book is not None else self._records
+            return
+        items = self._items()
+        if self.query:
+            items = [(item, values) for item, values in items
+                     if any(self.query in value.casefold() for value in values)]
+        if self.sort_column is not None:
+            items = sorted(items, key=lambda item: self._sort_key(item[1]), reverse=self.sort_reverse)
+        self._shown = [item for item, _ in items]
+
+    def rows(self, start: int, count: int) -> list:
+        """
+        Returns (column values, mark) of the shown records from 'start', at most 'count' of them.
+        """
+        shown = self._shown[start:start + count]
+        if self._book is not None:
+            shown = [record for record in map(self._book.get, shown) if record is not None]
+        return [(self.row_values(record), self._marks.get(id(record), '')) for record in shown]
+
+    def __len__(self) -> int:
+        return len(self._shown)
 
 
 class UserViewer(ABC):
@@ -14,6 +146,10 @@ class UserViewer(ABC):
     def display_contacts(self, contacts):
         pass
 
+    @abstractmethod
+    def display_changes(self, added=(), changed=(), removed=()):
+        pass
+
     @abstractmethod
     def display_commands(self):
         pass
@@ -35,143 +171,11 @@ class UserViewer(ABC):
         pass
 
 
-class ConsoleUserViewer(UserViewer):
-    def display_contacts(self, contacts):
-        formatted_contacts = self.format_contacts(contacts)
-        print(formatted_contacts)
-
-    def format_contacts(self, contacts):
-        all_contacts = []
-        header = '{:<20} {:<30} {:<20} {:<20}'.format('Name', 'Phone', 'Birthday', 'Email')
-        separator = '-' * len(header)
-        all_contacts.append(header)
-        all_contacts.append(separator)
-        if contacts:
-            for record in contacts:
-                phones = ', '.join([f'{phone.value}' for phone in record.phones])
-                birthday_str = record.birthday.value if record.birthday else '-'
-                email_str = record.email.value if record.email else '-'
-                record_str = '{:<20} {:<30} {:<20} {:<20}'.format(
-                    record.name.value,
-                    phones,
-                    birthday_str,
-                    email_str
-                )
-                all_contacts.append(record_str)
-        else:
-            all_contacts.append("The address book is empty.")
-
-        return '\n'.join(all_contacts)
-
-    def display_commands(self):
-        print(Fore.GREEN, "Available commands:")
-        separator = '|----------------------|--------------------------------------------|'
-        print(separator, f'\n|  Commands            |  Description {" ":30}|\n', separator, sep='')
-        for description, commands in COMMAND_DESCRIPTIONS.items():
-            print(f"| {Fore.WHITE} {', '.join(commands):<20}{Fore.GREEN}| {description:<43}|")
-        print(separator, '\n')
-
-    def get_user_input(self):
-        completer = NestedCompleter.from_nested_dict({command[0]: None for command in COMMANDS.values()})
-        user_input = prompt('>>>', completer=completer, lexer=None).strip().lower()
-        return user_input
-
-    def get_data_input(self, prompt):
-        return input(prompt)
-
-    def display_message(self, message):
-        print(message)
-
-    def display_error(self, message):
-        print(message)
-
-
-class GuiUserViewer(UserViewer):
-    def __init__(self):
-        super().__init__()
-        self.window = tk.Tk()
-        screen_width = self.window.winfo_screenwidth()
-        screen_height = self.window.winfo_screenheight()
-        self.window.title("Address Book")
-        self.window.geometry(f"{screen_width // 2}x{screen_height // 2}+0+0")
-        self.command_text = tk.Text(self.window, wrap=tk.WORD, width=65, height=22)
-        self.command_text.pack()
-
-        self.contacts_window = tk.Toplevel(self.window)
-        self.contacts_window.title("Contacts Window")
-        self.contacts_window.geometry(f"{screen_width // 2}x{screen_height // 2}+{screen_width - screen_width // 2}+0")
-        self.contacts_text = tk.Text(self.contacts_window, wrap=tk.WORD, width=80, height=30)
-        self.contacts_text.pack()
-        self.contacts_window.withdraw()
-
-        self.message_window = tk.Toplevel(self.window)
-        self.message_window.geometry(
-            f"{screen_width // 3}x{screen_height // 10}+{(screen_width - screen_width // 3) // 2}"
-            f"+{(screen_height + screen_height // 10) // 2}")
-        custom_font = ("Helvetica", 13)
-        self.message_label = tk.Label(self.message_window, text="", width=50, height=5, font=custom_font,
-                                      wraplength=380)
-        self.message_label.pack()
-        self.message_window.withdraw()
-
-    def display_contacts(self, contacts):
-        self.contacts_window.deiconify()
-        self.contacts_text.delete(1.0, tk.END)
-        if contacts:
-            formatted_contacts = []
-            header = '{:<20} {:<30} {:<15} {:<15}'.format('Name', 'Phone', 'Birthday', 'Email')
-            separator = '-' * len(header)
-            formatted_contacts.append(header)
-            formatted_contacts.append(separator)
-
-            for record in contacts:
-                phones = ', '.join([f'{phone.value}' for phone in record.phones])
-                birthday_str = record.birthday.value if record.birthday else '-'
-                email_str = record.email.value if record.email else '-'
-                record_str = '{:<20} {:<30} {:<15} {:<15}'.format(
-                    record.name.value,
-                    phones,
-                    birthday_str,
-                    email_str
-                )
-                formatted_contacts.append(record_str)
-
-            self.contacts_text.insert(1.0, '\n'.join(formatted_contacts))
-            self.window.after(10000, self.contacts_window.withdraw)
-        else:
-            self.contacts_text.insert(tk.END, "The address book is empty.")
-            self.window.after(10000, self.contacts_window.withdraw)
+# The viewers are imported with their UI libraries only when one is used
+VIEWER_MODULES = {'ConsoleUserViewer': 'console_viewer', 'GuiUserViewer': 'gui_viewer'}
 
-    def display_commands(self):
-        self.command_text.delete(1.0, tk.END)
-        separator = '|------------------|--------------------------------------------|\n'
-        self.command_text.insert(tk.END, separator)
-        self.command_text.insert(tk.END, f'\n|  Commands        |  Description {" ":30}|\n')
-        self.command_text.insert(tk.END, separator)
-        for description, commands in COMMAND_DESCRIPTIONS.items():
-            self.command_text.insert(tk.END, f"| {', '.join(commands):<17}| {description:<43}|\n")
-        self.command_text.insert(tk.END, separator)
 
-    def get_user_input(self):
-        self.window.deiconify()
-        self.command_text.pack()
-        user_input = tk.simpledialog.askstring("User Input", "Enter a command:")
-        return user_input
-
-    def get_data_input(self, prompt):
-        self.command_text.forget()
-        self.window.withdraw()
-        data_input = simpledialog.askstring("Data Input", prompt)
-        return data_input
-
-    def display_message(self, message):
-        self.message_window.deiconify()
-        self.message_label.config(text=message)
-        self.window.after(7000, self.message_window.withdraw)
-        return message
-
-    def display_error(self, message):
-        self.message_window.deiconify()
-        self.message_label.config(text=message)
-        self.window.after(7000, self.message_window.withdraw)
-        return message
+def __getattr__(name: str):
+    if name in VIEWER_MODULES:
+        return getattr(import_module(VIEWER_MODULES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,94 @@
+from datetime import date
+
+import re
+
+PHONE_PATTERN = re.compile(r'^\+\d{1,3}\d{9}$')
+EMAIL_PATTERN = re.compile(r'\b(?![A-Za-z0-9._%+-]*a@t[A-Za-z0-9._%+-]*)\b'
+                           r'(?![0-9]{2})[A-Za-z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b')
+NAME_PATTERN = re.compile(r'^[A-Za-zА-Яа-я\s]+$')
+# The same day, month and year forms datetime.strptime accepts for '%d.%m.%Y'
+BIRTHDAY_PATTERN = re.compile(r'(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])\.(1[0-2]|0[1-9]|[1-9])\.(\d\d\d\d)')
+DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def is_valid_phone(number: str) -> bool:
+    """
+    Checks a phone number in the '+<country code><9 digits>' format.
+    """
+    return number is not None and PHONE_PATTERN.match(number) is not None
+
+
+def is_valid_email(email: str) -> bool:
+    """
+    Checks an email address.
+    """
+    return email is not None and EMAIL_PATTERN.match(email) is not None
+
+
+def is_valid_name(name: str) -> bool:
+    """
+    Checks a name of more than one character made of letters and spaces.
+    """
+    return name is not None and len(name) > 1 and NAME_PATTERN.match(name) is not None
+
+
+def parse_birthday(birthday: str, today: date = None) -> tuple | None:
+    """
+    Parses a birthday in 'dd.mm.yyyy' format into (year, month, day) without
+    datetime.strptime, accepting the same strings it does.
+    Returns None if the value is not a date or is after 'today', the current date by default.
+    """
+    if not isinstance(birthday, str):
+        return None
+    match = BIRTHDAY_PATTERN.fullmatch(birthday)
+    if match is None:
+        return None
+    day, month, year = int(match[1]), int(match[2]), int(match[3])
+    if day > DAYS_IN_MONTH[month] and not (month == 2 and day == 29 and year % 4 == 0
+                                           and (year % 100 != 0 or year % 400 == 0)):
+        return None
+    if year == 0:
+        return None
+    if today is None:
+        today = date.today()
+    if (year, month, day) > (today.year, today.month, today.day):
+        return None
+    return year, month, day
+
+
+def is_valid_birthday(birthday: str, today: date = None) -> bool:
+    """
+    Checks a birthday in 'dd.mm.yyyy' format that is not in the future.
+    """
+    return parse_birthday(birthday, today) is not None
+
+
+# The patterns of the fields for whole columns; the name pattern includes the length check
+COLUMN_PATTERNS = {
+    'phone': PHONE_PATTERN,
+    'email': EMAIL_PATTERN,
+    'name': re.compile(r'^[A-Za-zА-Яа-я\s]{2,}$'),
+}
+
+VALIDATORS = {
+    'phone': is_valid_phone,
+    'email': is_valid_email,
+    'name': is_valid_name,
+    'birthday': is_valid_birthday,
+}
+
+
+def validate_many(field: str, values) -> list:
+    """
+    Validates a whole column of values of one field ('phone', 'email', 'name'
+    or 'birthday') at once and returns the positions of the invalid ones.
+    None values are skipped, as they stand for a field that is not set.
+    The patterns are matched inline, without a validator call per value,
+    and birthdays are all compared with the date of the call.
+    """
+    if field == 'birthday':
+        today = date.today()
+        return [index for index, value in enumerate(values)
+                if value is not None and parse_birthday(value, today) is None]
+    match = COLUMN_PATTERNS[field].match
+    return [index for index, value in enumerate(values) if value is not None and match(value) is None]